@@ -0,0 +1,13 @@
+"""
+Benchmarks das páginas públicas e da API - LANGUE UFRPE
+
+Executa cada rota de benchmarks.rotas com o cliente de testes do Django,
+dentro do mesmo processo, contra o banco configurado (normalmente gerado com
+`manage.py generate_dataset`). Para cada rota são medidos a latência
+(p50/p95/p99), o número de consultas SQL e o tamanho da resposta.
+
+Uso:
+    python manage.py generate_dataset --scale 0.1 --limpar
+    python manage.py benchmark --iteracoes 50
+    python manage.py benchmark --comparar benchmarks/resultados/anterior.json
+"""
@@ -0,0 +1,181 @@
+"""
+Execução e registro dos benchmarks
+
+executar() mede as rotas e devolve um dicionário pronto para ser salvo em
+JSON; comparar() cruza dois resultados salvos para acompanhar a evolução.
+"""
+import json
+import platform
+import subprocess
+import time
+from statistics import mean, median
+
+import django
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client
+from django.utils import timezone
+
+from galeria.models import Foto
+from producoes_bibliograficas.models import Autor, ProducaoBibliografica
+from publicacoes.models import PublicacaoPDF
+
+from .rotas import ROTAS, montar_url, objetos_de_referencia
+
+
+def percentil(valores, p):
+    """Percentil p (0-100) com interpolação linear entre as amostras"""
+    ordenados = sorted(valores)
+    if not ordenados:
+        return None
+    posicao = (len(ordenados) - 1) * p / 100
+    inferior = int(posicao)
+    superior = min(inferior + 1, len(ordenados) - 1)
+    return ordenados[inferior] + (ordenados[superior] - ordenados[inferior]) * (posicao - inferior)
+
+
+class ContadorConsultas:
+    """
+    Conta as consultas executadas. Diferente de connection.queries, não
+    guarda o SQL e não tem o limite de 9000 consultas do log do Django.
+    """
+
+    def __init__(self):
+        self.total = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.total += 1
+        return execute(sql, params, many, context)
+
+
+def requisitar(cliente, url, params, ajax):
+    """Faz uma requisição e retorna (resposta, segundos, consultas, bytes)"""
+    cabecalhos = {'HTTP_X_REQUESTED_WITH': 'XMLHttpRequest'} if ajax else {}
+    contador = ContadorConsultas()
+    with connection.execute_wrapper(contador):
+        inicio = time.perf_counter()
+        resposta = cliente.get(url, params, **cabecalhos)
+        # Respostas em streaming só são geradas quando o conteúdo é consumido
+        conteudo = resposta.getvalue()
+        duracao = time.perf_counter() - inicio
+    return resposta, duracao, contador.total, len(conteudo)
+
+
+def medir_rota(cliente, rota, url, iteracoes, aquecimento, sem_cache):
+    """Mede uma rota e resume latência (ms), consultas e bytes"""
+    for _ in range(aquecimento):
+        if sem_cache:
+            cache.clear()
+        requisitar(cliente, url, rota.params, rota.ajax)
+
+    latencias, consultas, tamanhos, status = [], [], [], set()
+    for _ in range(iteracoes):
+        if sem_cache:
+            cache.clear()
+        resposta, duracao, total_consultas, tamanho = requisitar(cliente, url, rota.params, rota.ajax)
+        latencias.append(duracao * 1000)
+        consultas.append(total_consultas)
+        tamanhos.append(tamanho)
+        status.add(resposta.status_code)
+
+    return {
+        'url': url,
+        'params': rota.params,
+        'status': sorted(status),
+        'iteracoes': iteracoes,
+        'latencia_ms': {
+            'p50': round(percentil(latencias, 50), 3),
+            'p95': round(percentil(latencias, 95), 3),
+            'p99': round(percentil(latencias, 99), 3),
+            'media': round(mean(latencias), 3),
+            'min': round(min(latencias), 3),
+            'max': round(max(latencias), 3),
+        },
+        'requisicoes_por_segundo': round(1000 / mean(latencias), 1),
+        'consultas': {'mediana': median(consultas), 'max': max(consultas)},
+        'bytes': {'mediana': median(tamanhos), 'max': max(tamanhos)},
+    }
+
+
+def commit_atual():
+    """Hash do commit em que o benchmark rodou, quando disponível"""
+    try:
+        saida = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, timeout=5,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return ''
+    return saida.stdout.strip()
+
+
+def executar(iteracoes=20, aquecimento=2, filtro='', sem_cache=False, progresso=None):
+    """
+    Mede todas as rotas (ou as que contêm `filtro` no nome) e retorna o
+    resultado completo, com a descrição do ambiente e do volume de dados.
+    """
+    cliente = Client()
+    objetos = objetos_de_referencia()
+    rotas = {}
+
+    for rota in ROTAS:
+        if rota.metodo != 'get' or (filtro and filtro not in rota.nome):
+            continue
+        url = montar_url(rota, objetos)
+        if url is None:
+            if progresso:
+                progresso(rota.nome, None)
+            continue
+        rotas[rota.nome] = medir_rota(cliente, rota, url, iteracoes, aquecimento, sem_cache)
+        if progresso:
+            progresso(rota.nome, rotas[rota.nome])
+
+    return {
+        'data': timezone.now().isoformat(),
+        'commit': commit_atual(),
+        'ambiente': {
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'banco': connection.vendor,
+            'cache': settings.CACHES['default']['BACKEND'],
+            'debug': settings.DEBUG,
+        },
+        'configuracao': {'iteracoes': iteracoes, 'aquecimento': aquecimento, 'sem_cache': sem_cache},
+        'volume': {
+            'producoes': ProducaoBibliografica.objects.count(),
+            'autores': Autor.objects.count(),
+            'publicacoes': PublicacaoPDF.objects.count(),
+            'fotos': Foto.objects.count(),
+        },
+        'rotas': rotas,
+    }
+
+
+def salvar(resultado, caminho):
+    with open(caminho, 'w', encoding='utf-8') as arquivo:
+        json.dump(resultado, arquivo, ensure_ascii=False, indent=2)
+
+
+def carregar(caminho):
+    with open(caminho, encoding='utf-8') as arquivo:
+        return json.load(arquivo)
+
+
+def comparar(anterior, atual):
+    """
+    Diferença do p95 e das consultas entre dois resultados, por rota.
+    Retorna tuplas (rota, p95 anterior, p95 atual, variação %, consultas anterior, consultas atual).
+    """
+    comparacao = []
+    for nome, medicao in atual['rotas'].items():
+        antes = anterior['rotas'].get(nome)
+        if antes is None:
+            continue
+        p95_antes, p95_agora = antes['latencia_ms']['p95'], medicao['latencia_ms']['p95']
+        variacao = (p95_agora - p95_antes) / p95_antes * 100 if p95_antes else 0.0
+        comparacao.append((
+            nome, p95_antes, p95_agora, variacao,
+            antes['consultas']['mediana'], medicao['consultas']['mediana'],
+        ))
+    return comparacao
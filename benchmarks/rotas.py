@@ -0,0 +1,88 @@
+"""
+Rotas do site, com o orçamento de consultas de cada uma
+
+A mesma lista é usada pelo benchmark (benchmarks/executor.py), que mede só
+as rotas GET (os POST de download alteram os contadores), e pelo teste de
+orçamento de consultas (OrcamentoConsultasTest em langue/tests.py). Os
+argumentos são nomes de objetos de objetos_de_referencia(), resolvidos
+contra o banco no momento da execução.
+"""
+from collections import namedtuple
+
+from django.urls import reverse
+
+from galeria.models import Album
+from producoes_bibliograficas.models import Autor, ProducaoBibliografica
+from publicacoes.models import Organizador, PublicacaoPDF
+
+
+# orcamento: máximo de consultas; args: nomes dos objetos da massa de dados
+# cujos pks entram na URL. Os comentários "N+1" marcam orçamentos que ainda
+# crescem com o volume de dados e devem baixar quando a consulta for corrigida.
+Rota = namedtuple('Rota', ['nome', 'orcamento', 'args', 'params', 'metodo', 'ajax'])
+
+
+def rota(nome, orcamento, args=(), params=None, metodo='get', ajax=False):
+    return Rota(nome, orcamento, args, params or {}, metodo, ajax)
+
+
+ROTAS = [
+    # Páginas
+    rota('home', 4),
+    rota('search:search_results', 4, params={'q': 'linguagem'}),
+    rota('linhas_pesquisa:linhas_pesquisa', 8),
+    rota('producoes_bibliograficas:producoes_e_publicacoes', 6),
+    rota('producoes_bibliograficas:lista', 7),
+    rota('publicacoes:lista', 5),
+    rota('galeria:album_list', 1),
+    rota('galeria:album_detail', 2, args=['album']),
+    rota('galeria:detalhe', 2, args=['album']),
+
+    # AJAX
+    rota('linhas_pesquisa:pesquisadores_ajax', 1, params={'search': 'a'}, ajax=True),
+    rota('linhas_pesquisa:estudantes_ajax', 1, params={'search': 'a'}, ajax=True),
+    rota('linhas_pesquisa:estatisticas_ajax', 4, ajax=True),
+    rota('producoes_bibliograficas:autores_ajax', 1, params={'search': 'a'}, ajax=True),
+    rota('producoes_bibliograficas:producoes_por_ano_ajax', 2, params={'ano': 2023}, ajax=True),
+    rota('producoes_bibliograficas:estatisticas_ajax', 5, ajax=True),
+    rota('publicacoes:buscar_ajax', 1, params={'q': 'publicação'}),
+    rota('publicacoes:incrementar_download', 1, args=['publicacao'], metodo='post'),
+    rota('galeria:album_photos_json', 2, args=['album']),
+
+    # API REST
+    rota('producoes_bibliograficas:api-root', 0),
+    rota('producoes_bibliograficas:producaobibliografica-list', 2),
+    rota('producoes_bibliograficas:producaobibliografica-detail', 2, args=['producao']),
+    rota('producoes_bibliograficas:producaobibliografica-por-ano', 2),
+    rota('producoes_bibliograficas:producaobibliografica-estatisticas', 4),
+    rota('producoes_bibliograficas:autor-list', 1),
+    rota('producoes_bibliograficas:autor-detail', 1, args=['autor']),
+    rota('producoes_bibliograficas:autor-producoes', 3, args=['autor']),
+    rota('publicacoes:api-root', 0),
+    rota('publicacoes:publicacaopdf-list', 2),
+    rota('publicacoes:publicacaopdf-detail', 2, args=['publicacao']),
+    rota('publicacoes:publicacaopdf-estatisticas', 1),
+    rota('publicacoes:publicacaopdf-por-ano', 2),
+    rota('publicacoes:publicacaopdf-incrementar-download', 1, args=['publicacao'], metodo='post'),
+    rota('publicacoes:organizador-list', 1),
+    rota('publicacoes:organizador-detail', 1, args=['organizador']),
+    rota('publicacoes:organizador-publicacoes', 3, args=['organizador']),
+]
+
+
+def objetos_de_referencia():
+    """Objetos usados nas URLs de detalhe (o primeiro de cada tabela)"""
+    return {
+        'album': Album.objects.order_by('pk').first(),
+        'producao': ProducaoBibliografica.objects.order_by('pk').first(),
+        'autor': Autor.objects.order_by('pk').first(),
+        'publicacao': PublicacaoPDF.objects.filter(ativa=True).order_by('pk').first(),
+        'organizador': Organizador.objects.order_by('pk').first(),
+    }
+
+
+def montar_url(rota, objetos):
+    """URL da rota, ou None se faltar algum objeto no banco"""
+    if any(objetos.get(nome) is None for nome in rota.args):
+        return None
+    return reverse(rota.nome, args=[objetos[nome].pk for nome in rota.args])
@@ -1,6 +1,14 @@
 from django.contrib import admin
 from .models import Album, Foto
 
+
+@admin.action(description="Gerar novamente as versões reduzidas")
+def regerar_derivadas(modeladmin, request, queryset):
+    """Coloca as imagens selecionadas de volta na fila do worker (manage.py image_worker)"""
+    count = queryset.update(derivadas_status='PENDENTE', derivadas_erro='', derivadas_hash='')
+    modeladmin.message_user(request, f'{count} imagem(ns) adicionada(s) à fila de processamento.')
+
+
 class FotoInline(admin.TabularInline):
     """
     Permite adicionar fotos diretamente na página de edição do Álbum.
@@ -14,7 +22,7 @@ class FotoInline(admin.TabularInline):
         # Exibe uma miniatura da imagem no admin
         from django.utils.html import format_html
         if obj.image:
-            return format_html('<img src="{}" width="150" height="auto" />', obj.image.url)
+            return format_html('<img src="{}" width="150" height="auto" />', obj.url_imagem(320))
         return "(Nenhuma imagem)"
     image_preview.short_description = "Pré-visualização"
 
@@ -23,11 +31,16 @@ class AlbumAdmin(admin.ModelAdmin):
     """
     Configuração do admin para o modelo Album.
     """
-    list_display = ('title', 'event_date', 'photo_count', 'created_at')
-    list_filter = ('event_date',)
+    list_display = ('title', 'event_date', 'photo_count', 'derivadas_status', 'created_at')
+    list_filter = ('event_date', 'derivadas_status')
+    actions = [regerar_derivadas]
     search_fields = ('title', 'description')
     inlines = [FotoInline]
     
+    def get_queryset(self, request):
+        # Contagem de fotos anotada na listagem, em vez de um COUNT por linha
+        return super().get_queryset(request).com_contagem_fotos()
+    
     fieldsets = (
         (None, {
             'fields': ('title', 'description', 'event_date', 'cover_image')
@@ -39,14 +52,15 @@ class FotoAdmin(admin.ModelAdmin):
     """
     Configuração do admin para o modelo Foto (gerenciamento individual).
     """
-    list_display = ('id', 'album', 'caption', 'uploaded_at', 'image_preview')
-    list_filter = ('album', 'uploaded_at')
+    list_display = ('id', 'album', 'caption', 'uploaded_at', 'derivadas_status', 'image_preview')
+    list_filter = ('album', 'uploaded_at', 'derivadas_status')
+    actions = [regerar_derivadas]
     search_fields = ('caption', 'album__title')
     readonly_fields = ('image_preview',)
 
     def image_preview(self, obj):
         from django.utils.html import format_html
         if obj.image:
-            return format_html('<img src="{}" width="150" height="auto" />', obj.image.url)
+            return format_html('<img src="{}" width="150" height="auto" />', obj.url_imagem(320))
         return "(Nenhuma imagem)"
     image_preview.short_description = "Pré-visualização"
@@ -0,0 +1,88 @@
+"""
+Versões redimensionadas (derivadas) das imagens da galeria
+
+Cada imagem original gera cópias em algumas larguras fixas, em AVIF (quando o
+Pillow tem suporte), WebP e JPEG. Os arquivos ficam em
+galeria/derivadas/<hash>/<largura>.<formato>, onde <hash> é o SHA-256 do
+conteúdo original: a mesma imagem enviada duas vezes é processada uma vez só.
+
+As funções de renderização não acessam o banco de dados; quem grava o
+resultado nos modelos é o worker (galeria/tarefas.py).
+"""
+import hashlib
+from io import BytesIO
+
+from PIL import Image, ImageOps, features
+
+
+LARGURAS = (320, 640, 1024, 1600)
+
+# Ordem de preferência no <picture>; o último formato é o fallback do <img>
+FORMATOS = tuple(
+    formato for formato, disponivel in (
+        ('avif', features.check('avif')),
+        ('webp', features.check('webp')),
+        ('jpeg', True),
+    )
+    if disponivel
+)
+
+OPCOES_FORMATO = {
+    'avif': {'format': 'AVIF', 'quality': 55},
+    'webp': {'format': 'WEBP', 'quality': 80, 'method': 4},
+    'jpeg': {'format': 'JPEG', 'quality': 82, 'optimize': True, 'progressive': True},
+}
+
+TIPOS_MIME = {
+    'avif': 'image/avif',
+    'webp': 'image/webp',
+    'jpeg': 'image/jpeg',
+}
+
+
+def calcular_hash(arquivo):
+    """Retorna o SHA-256 do conteúdo de um arquivo aberto"""
+    sha256 = hashlib.sha256()
+    arquivo.seek(0)
+    for bloco in iter(lambda: arquivo.read(1024 * 1024), b''):
+        sha256.update(bloco)
+    arquivo.seek(0)
+    return sha256.hexdigest()
+
+
+def nome_derivada(hash_imagem, largura, formato):
+    """Caminho (relativo ao MEDIA_ROOT) de uma derivada"""
+    return f'galeria/derivadas/{hash_imagem}/{largura}.{formato}'
+
+
+def larguras_para(largura_original):
+    """Larguras a gerar para uma imagem, sem ampliar além do original"""
+    larguras = [largura for largura in LARGURAS if largura < largura_original]
+    if not larguras or largura_original <= LARGURAS[-1]:
+        larguras.append(min(largura_original, LARGURAS[-1]))
+    return sorted(set(larguras))
+
+
+def renderizar_derivadas(arquivo):
+    """
+    Gera as derivadas de uma imagem aberta.
+    Retorna uma lista de tuplas (largura, formato, bytes).
+    """
+    with Image.open(arquivo) as original:
+        # Aplica a rotação do EXIF antes de redimensionar (fotos de celular)
+        imagem = ImageOps.exif_transpose(original)
+        if imagem.mode not in ('RGB', 'RGBA'):
+            imagem = imagem.convert('RGBA' if 'transparency' in imagem.info else 'RGB')
+
+        derivadas = []
+        for largura in larguras_para(imagem.width):
+            altura = max(round(imagem.height * largura / imagem.width), 1)
+            redimensionada = imagem.resize((largura, altura), Image.Resampling.LANCZOS)
+            for formato in FORMATOS:
+                copia = redimensionada
+                if formato == 'jpeg' and copia.mode != 'RGB':
+                    copia = copia.convert('RGB')
+                buffer = BytesIO()
+                copia.save(buffer, **OPCOES_FORMATO[formato])
+                derivadas.append((largura, formato, buffer.getvalue()))
+    return derivadas
@@ -0,0 +1,10 @@
+from galeria import tarefas
+from langue.filas import ComandoWorker
+
+
+class Command(ComandoWorker):
+    help = "Processa a fila de geração das versões reduzidas (derivadas) das imagens da galeria"
+    fila = tarefas.fila
+    nome = "Worker de imagens da galeria"
+    mensagem_lote = "{sucessos} imagem(ns) processada(s), {erros} erro(s)."
+    ajuda_threads = 'Número de imagens processadas em paralelo (padrão: 2)'
@@ -0,0 +1,63 @@
+# Generated by Django 5.2 on 2026-10-17 10:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('galeria', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='album',
+            name='derivadas_formatos',
+            field=models.JSONField(blank=True, default=list, verbose_name='Formatos Gerados'),
+        ),
+        migrations.AddField(
+            model_name='album',
+            name='derivadas_hash',
+            field=models.CharField(blank=True, default='', max_length=64, verbose_name='Hash da Imagem'),
+        ),
+        migrations.AddField(
+            model_name='album',
+            name='derivadas_larguras',
+            field=models.JSONField(blank=True, default=list, verbose_name='Larguras Geradas'),
+        ),
+        migrations.AddField(
+            model_name='album',
+            name='derivadas_processado_em',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Status Alterado em'),
+        ),
+        migrations.AddField(
+            model_name='album',
+            name='derivadas_status',
+            field=models.CharField(choices=[('PENDENTE', 'Pendente'), ('PROCESSANDO', 'Processando'), ('CONCLUIDO', 'Concluído'), ('ERRO', 'Erro')], db_index=True, default='PENDENTE', max_length=20, verbose_name='Status das Versões Reduzidas'),
+        ),
+        migrations.AddField(
+            model_name='foto',
+            name='derivadas_formatos',
+            field=models.JSONField(blank=True, default=list, verbose_name='Formatos Gerados'),
+        ),
+        migrations.AddField(
+            model_name='foto',
+            name='derivadas_hash',
+            field=models.CharField(blank=True, default='', max_length=64, verbose_name='Hash da Imagem'),
+        ),
+        migrations.AddField(
+            model_name='foto',
+            name='derivadas_larguras',
+            field=models.JSONField(blank=True, default=list, verbose_name='Larguras Geradas'),
+        ),
+        migrations.AddField(
+            model_name='foto',
+            name='derivadas_processado_em',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Status Alterado em'),
+        ),
+        migrations.AddField(
+            model_name='foto',
+            name='derivadas_status',
+            field=models.CharField(choices=[('PENDENTE', 'Pendente'), ('PROCESSANDO', 'Processando'), ('CONCLUIDO', 'Concluído'), ('ERRO', 'Erro')], db_index=True, default='PENDENTE', max_length=20, verbose_name='Status das Versões Reduzidas'),
+        ),
+    ]
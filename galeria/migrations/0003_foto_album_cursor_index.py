@@ -0,0 +1,17 @@
+# Generated by Django 5.2 on 2026-10-17 10:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('galeria', '0002_derivadas'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='foto',
+            index=models.Index(fields=['album', 'uploaded_at', 'id'], name='galeria_foto_album_cursor'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2 on 2026-10-17 11:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('galeria', '0003_foto_album_cursor_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='album',
+            index=models.Index(fields=['-event_date'], name='galeria_album_data_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='album',
+            index=models.Index(fields=['created_at'], name='galeria_album_criado_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-17 11:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('galeria', '0004_indices_ativos'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='album',
+            name='derivadas_erro',
+            field=models.TextField(blank=True, default='', verbose_name='Erro das Versões Reduzidas'),
+        ),
+        migrations.AddField(
+            model_name='foto',
+            name='derivadas_erro',
+            field=models.TextField(blank=True, default='', verbose_name='Erro das Versões Reduzidas'),
+        ),
+    ]
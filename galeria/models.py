@@ -1,8 +1,171 @@
+import logging
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
 from django.db import models
 from django.utils import timezone
 from django.urls import reverse
 
-class Album(models.Model):
+from . import derivadas as derivadas_imagem
+
+
+logger = logging.getLogger(__name__)
+
+
+DERIVADAS_STATUS_CHOICES = [
+    ('PENDENTE', 'Pendente'),
+    ('PROCESSANDO', 'Processando'),
+    ('CONCLUIDO', 'Concluído'),
+    ('ERRO', 'Erro'),
+]
+
+
+class ImagemResponsiva(models.Model):
+    """
+    Campos e métodos comuns às imagens que têm versões redimensionadas
+    (ver galeria/derivadas.py). As subclasses indicam o campo da imagem
+    original em CAMPO_IMAGEM.
+    """
+    CAMPO_IMAGEM = None
+
+    derivadas_status = models.CharField(
+        max_length=20,
+        choices=DERIVADAS_STATUS_CHOICES,
+        default='PENDENTE',
+        db_index=True,
+        verbose_name="Status das Versões Reduzidas"
+    )
+    derivadas_hash = models.CharField(max_length=64, blank=True, default='', verbose_name="Hash da Imagem")
+    derivadas_larguras = models.JSONField(default=list, blank=True, verbose_name="Larguras Geradas")
+    derivadas_formatos = models.JSONField(default=list, blank=True, verbose_name="Formatos Gerados")
+    derivadas_erro = models.TextField(blank=True, default='', verbose_name="Erro das Versões Reduzidas")
+    derivadas_processado_em = models.DateTimeField(blank=True, null=True, verbose_name="Status Alterado em")
+
+    class Meta:
+        abstract = True
+
+    @property
+    def imagem_original(self):
+        return getattr(self, self.CAMPO_IMAGEM)
+
+    def save(self, *args, **kwargs):
+        """Coloca a imagem na fila de derivadas quando ela é criada ou trocada"""
+        if self.pk:
+            anterior = type(self).objects.filter(pk=self.pk).values_list(self.CAMPO_IMAGEM, flat=True).first()
+            if anterior != self.imagem_original.name:
+                self.limpar_derivadas()
+        super().save(*args, **kwargs)
+
+    def limpar_derivadas(self):
+        """Esquece as derivadas atuais e volta para a fila"""
+        self.derivadas_status = 'PENDENTE'
+        self.derivadas_erro = ''
+        self.derivadas_hash = ''
+        self.derivadas_larguras = []
+        self.derivadas_formatos = []
+
+    @property
+    def tem_derivadas(self):
+        return self.derivadas_status == 'CONCLUIDO' and bool(self.derivadas_larguras)
+
+    def url_derivada(self, largura, formato):
+        return default_storage.url(derivadas_imagem.nome_derivada(self.derivadas_hash, largura, formato))
+
+    def srcset(self, formato):
+        """Valor do atributo srcset para um formato ('' se ainda não há derivadas)"""
+        if not self.tem_derivadas or formato not in self.derivadas_formatos:
+            return ''
+        return ', '.join(
+            f'{self.url_derivada(largura, formato)} {largura}w'
+            for largura in self.derivadas_larguras
+        )
+
+    def url_imagem(self, largura_maxima=None):
+        """
+        URL da maior derivada em JPEG até `largura_maxima`; enquanto as
+        derivadas não existem, devolve a imagem original.
+        """
+        if not self.tem_derivadas or 'jpeg' not in self.derivadas_formatos:
+            return self.imagem_original.url if self.imagem_original else ''
+        larguras = [
+            largura for largura in self.derivadas_larguras
+            if largura_maxima is None or largura <= largura_maxima
+        ] or self.derivadas_larguras[:1]
+        return self.url_derivada(larguras[-1], 'jpeg')
+
+    def gerar_derivadas(self):
+        """Gera (ou reaproveita) as derivadas da imagem e registra o status"""
+        imagem = self.imagem_original
+        try:
+            with imagem.open('rb') as arquivo:
+                hash_imagem = derivadas_imagem.calcular_hash(arquivo)
+                existente = _derivadas_existentes(hash_imagem)
+                if existente:
+                    larguras, formatos = existente
+                else:
+                    larguras, formatos = [], []
+                    for largura, formato, conteudo in derivadas_imagem.renderizar_derivadas(arquivo):
+                        nome = derivadas_imagem.nome_derivada(hash_imagem, largura, formato)
+                        if not default_storage.exists(nome):
+                            default_storage.save(nome, ContentFile(conteudo))
+                        if largura not in larguras:
+                            larguras.append(largura)
+                        if formato not in formatos:
+                            formatos.append(formato)
+        except Exception as e:
+            logger.exception("Erro ao gerar derivadas para %s", self)
+            self.registrar_derivadas(
+                imagem.name,
+                derivadas_status='ERRO',
+                derivadas_erro=str(e),
+                derivadas_processado_em=timezone.now(),
+            )
+            return False
+
+        return self.registrar_derivadas(
+            imagem.name,
+            derivadas_status='CONCLUIDO',
+            derivadas_erro='',
+            derivadas_hash=hash_imagem,
+            derivadas_larguras=larguras,
+            derivadas_formatos=formatos,
+            derivadas_processado_em=timezone.now(),
+        )
+
+    def registrar_derivadas(self, nome_imagem, **campos):
+        """
+        Grava o resultado do worker se a imagem continua reservada e é a mesma
+        que foi processada. Se foi trocada no meio do processamento, save() a
+        devolveu para a fila e o resultado é descartado. Retorna True se gravou.
+        """
+        gravadas = type(self).objects.filter(
+            pk=self.pk, derivadas_status='PROCESSANDO', **{self.CAMPO_IMAGEM: nome_imagem}
+        ).update(**campos)
+        if not gravadas:
+            return False
+        for campo, valor in campos.items():
+            setattr(self, campo, valor)
+        return True
+
+
+def _derivadas_existentes(hash_imagem):
+    """Larguras e formatos já gerados para este conteúdo por outra foto ou capa"""
+    for modelo in (Foto, Album):
+        registro = modelo.objects.filter(
+            derivadas_hash=hash_imagem, derivadas_status='CONCLUIDO'
+        ).values_list('derivadas_larguras', 'derivadas_formatos').first()
+        if registro:
+            return registro
+    return None
+
+
+class AlbumQuerySet(models.QuerySet):
+    def com_contagem_fotos(self):
+        """Anota `num_fotos` em cada álbum, com uma única consulta"""
+        return self.annotate(num_fotos=models.Count('photos'))
+
+
+class Album(ImagemResponsiva):
     """
     Representa um álbum de fotos, como um evento ou congresso.
     """
@@ -12,10 +175,19 @@ class Album(models.Model):
     event_date = models.DateField(default=timezone.now, verbose_name="Data do Evento")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Criado em")
     
+    CAMPO_IMAGEM = 'cover_image'
+    
+    objects = AlbumQuerySet.as_manager()
+    
     class Meta:
         verbose_name = "Álbum"
         verbose_name_plural = "Álbuns"
         ordering = ['-event_date']
+        indexes = [
+            # Lista de álbuns e álbum mais recente da página inicial
+            models.Index(fields=['-event_date'], name='galeria_album_data_idx'),
+            models.Index(fields=['created_at'], name='galeria_album_criado_idx'),
+        ]
 
     def __str__(self):
         return self.title
@@ -23,13 +195,18 @@ class Album(models.Model):
     def photo_count(self):
         """
         Retorna a contagem de fotos neste álbum.
+        Usa a anotação de Album.objects.com_contagem_fotos() quando disponível.
         """
+        if hasattr(self, 'num_fotos'):
+            return self.num_fotos
         return self.photos.count()
+    photo_count.short_description = "Fotos"
+    photo_count.admin_order_field = 'num_fotos'
 
     def get_absolute_url(self):
         return reverse('galeria:detalhe', args=[str(self.id)])
 
-class Foto(models.Model):
+class Foto(ImagemResponsiva):
     """
     Representa uma única foto, que pertence a um Álbum.
     """
@@ -38,10 +215,16 @@ class Foto(models.Model):
     caption = models.CharField(max_length=255, blank=True, null=True, verbose_name="Legenda")
     uploaded_at = models.DateTimeField(auto_now_add=True, verbose_name="Enviado em")
 
+    CAMPO_IMAGEM = 'image'
+
     class Meta:
         verbose_name = "Foto"
         verbose_name_plural = "Fotos"
         ordering = ['uploaded_at']
+        indexes = [
+            # Paginação por cursor das fotos de um álbum (galeria.views.pagina_fotos)
+            models.Index(fields=['album', 'uploaded_at', 'id'], name='galeria_foto_album_cursor'),
+        ]
 
     def __str__(self):
         return f"Foto de {self.album.title} - {self.id}"
@@ -0,0 +1,29 @@
+"""
+Fila de geração das derivadas das imagens da galeria
+
+Como em publicacoes/tarefas.py, a fila é a própria tabela (langue/filas.py):
+o campo derivadas_status indica o que está pendente, e cada worker reserva as
+imagens com um UPDATE condicional (PENDENTE -> PROCESSANDO).
+"""
+from django.utils import timezone
+
+from langue.filas import Fila
+from .models import Album, Foto
+
+
+def processar_imagem(objeto):
+    """Gera as derivadas de uma imagem reservada. Retorna True em caso de sucesso"""
+    if not objeto.imagem_original:
+        type(objeto).objects.filter(pk=objeto.pk).update(
+            derivadas_status='ERRO',
+            derivadas_erro='Imagem sem arquivo',
+            derivadas_processado_em=timezone.now()
+        )
+        return False
+    return objeto.gerar_derivadas()
+
+
+fila = Fila((Album, Foto), processar_imagem, 'derivadas_status', 'derivadas_processado_em')
+reservar_pendentes = fila.reservar_pendentes
+liberar_travados = fila.liberar_travados
+processar_pendentes = fila.processar_pendentes
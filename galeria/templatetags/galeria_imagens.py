@@ -0,0 +1,37 @@
+from django import template
+from django.utils.html import format_html, format_html_join
+
+from galeria.derivadas import TIPOS_MIME
+
+register = template.Library()
+
+
+@register.filter
+def srcset(objeto, formato='jpeg'):
+    """Atributo srcset de uma Foto ou Album: {{ photo|srcset:"webp" }}"""
+    return objeto.srcset(formato)
+
+
+@register.simple_tag
+def imagem_responsiva(objeto, sizes='100vw', alt='', css_class='', largura_maxima=None, loading='lazy'):
+    """
+    Renderiza um <picture> com as derivadas da imagem (AVIF/WebP/JPEG).
+    Enquanto as derivadas não foram geradas, usa a imagem original.
+
+    Uso: {% imagem_responsiva photo sizes="(max-width: 600px) 100vw, 33vw" alt=photo.caption %}
+    """
+    fontes = [
+        (TIPOS_MIME[formato], objeto.srcset(formato), sizes)
+        for formato in objeto.derivadas_formatos
+        if formato != 'jpeg' and objeto.tem_derivadas
+    ]
+    return format_html(
+        '<picture>{}<img src="{}" srcset="{}" sizes="{}" alt="{}" class="{}" loading="{}" decoding="async"></picture>',
+        format_html_join('', '<source type="{}" srcset="{}" sizes="{}">', fontes),
+        objeto.url_imagem(largura_maxima),
+        objeto.srcset('jpeg'),
+        sizes,
+        alt,
+        css_class,
+        loading,
+    )
@@ -1,3 +1,185 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from io import BytesIO
 
-# Create your tests here.
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from .models import Album, Foto
+from .tarefas import processar_pendentes, reservar_pendentes
+
+
+def imagem_teste(nome='foto.jpg', largura=1200, altura=800):
+    """Gera um JPEG em memória para os testes"""
+    buffer = BytesIO()
+    Image.new('RGB', (largura, altura), (200, 120, 40)).save(buffer, format='JPEG')
+    return SimpleUploadedFile(nome, buffer.getvalue(), content_type='image/jpeg')
+
+
+class DerivadasImagemTest(TransactionTestCase):
+    """Testes para a geração das versões reduzidas (TransactionTestCase: o worker usa threads)"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.override = override_settings(MEDIA_ROOT=self.media_root)
+        self.override.enable()
+        self.album = Album.objects.create(title="Congresso", cover_image=imagem_teste('capa.jpg'))
+        self.foto = Foto.objects.create(album=self.album, image=imagem_teste())
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def test_imagens_novas_ficam_pendentes(self):
+        """Sem o worker, as páginas usam a imagem original"""
+        self.assertEqual(self.foto.derivadas_status, 'PENDENTE')
+        self.assertEqual(self.foto.url_imagem(), self.foto.image.url)
+        self.assertEqual(self.foto.srcset('webp'), '')
+
+    def test_worker_gera_derivadas(self):
+        """O worker gera as larguras fixas menores que o original, mais a largura original"""
+        self.assertEqual(processar_pendentes(threads=2, limite=10), (2, 0))
+        self.foto.refresh_from_db()
+        self.assertEqual(self.foto.derivadas_status, 'CONCLUIDO')
+        self.assertEqual(self.foto.derivadas_larguras, [320, 640, 1024, 1200])
+        self.assertIn('webp', self.foto.derivadas_formatos)
+        self.assertIn('/galeria/derivadas/', self.foto.url_imagem(640))
+        self.assertIn('640w', self.foto.srcset('jpeg'))
+
+    def test_mesmo_conteudo_compartilha_derivadas(self):
+        """Imagens com o mesmo conteúdo usam os mesmos arquivos"""
+        copia = Foto.objects.create(album=self.album, image=imagem_teste('copia.jpg'))
+        processar_pendentes(threads=1, limite=10)
+        self.foto.refresh_from_db()
+        copia.refresh_from_db()
+        self.assertEqual(copia.derivadas_hash, self.foto.derivadas_hash)
+        self.assertEqual(copia.srcset('jpeg'), self.foto.srcset('jpeg'))
+
+    def test_trocar_imagem_volta_para_fila(self):
+        """Uma nova imagem invalida as derivadas anteriores"""
+        processar_pendentes(threads=1, limite=10)
+        self.foto.refresh_from_db()
+        self.foto.image = imagem_teste('nova.jpg', largura=500, altura=500)
+        self.foto.save()
+        self.assertEqual(self.foto.derivadas_status, 'PENDENTE')
+        self.assertEqual(self.foto.derivadas_larguras, [])
+
+    def test_erro_registrado_na_imagem(self):
+        """Uma imagem inválida fica com status ERRO e a mensagem do erro"""
+        quebrada = Foto.objects.create(
+            album=self.album, image=SimpleUploadedFile('quebrada.jpg', b'nao e imagem', content_type='image/jpeg')
+        )
+        with self.assertLogs('galeria.models', level='ERROR'):
+            self.assertEqual(processar_pendentes(threads=1, limite=10), (2, 1))
+        quebrada.refresh_from_db()
+        self.assertEqual(quebrada.derivadas_status, 'ERRO')
+        self.assertNotEqual(quebrada.derivadas_erro, '')
+
+    def test_imagem_trocada_durante_o_processamento(self):
+        """O resultado da imagem antiga é descartado e a nova volta para a fila"""
+        reservar_pendentes(10)
+        no_worker = Foto.objects.get(pk=self.foto.pk)
+
+        self.foto.image = imagem_teste('nova.jpg', largura=500, altura=500)
+        self.foto.save()
+        self.assertFalse(no_worker.gerar_derivadas())
+
+        self.foto.refresh_from_db()
+        self.assertEqual(self.foto.derivadas_status, 'PENDENTE')
+        self.assertEqual(self.foto.derivadas_hash, '')
+
+        processar_pendentes(threads=1, limite=10)
+        self.foto.refresh_from_db()
+        self.assertEqual(self.foto.derivadas_status, 'CONCLUIDO')
+        self.assertEqual(self.foto.derivadas_larguras, [320, 500])
+
+    def test_album_detail_usa_srcset(self):
+        """A página do álbum usa <picture> com as derivadas"""
+        processar_pendentes(threads=1, limite=10)
+        response = self.client.get(reverse('galeria:album_detail', args=[self.album.pk]))
+        self.assertContains(response, '<picture>')
+        self.assertContains(response, 'type="image/webp"')
+        self.assertNotContains(response, 'src="%s"' % Foto.objects.get().image.url)
+
+
+class AlbumListTest(TestCase):
+    """Testes para a listagem de álbuns"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.override = override_settings(MEDIA_ROOT=self.media_root)
+        self.override.enable()
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def criar_albuns(self, quantidade, fotos_por_album=2):
+        for numero in range(quantidade):
+            album = Album.objects.create(title=f"Álbum {numero}", cover_image=imagem_teste(f'capa{numero}.jpg', 100, 80))
+            for _ in range(fotos_por_album):
+                Foto.objects.create(album=album, image=imagem_teste('foto.jpg', 100, 80))
+
+    def test_contagem_de_fotos_anotada(self):
+        """A contagem vem da anotação, sem consultas extras"""
+        self.criar_albuns(2, fotos_por_album=3)
+        albuns = list(Album.objects.com_contagem_fotos())
+        with self.assertNumQueries(0):
+            self.assertEqual([album.photo_count() for album in albuns], [3, 3])
+
+    def test_lista_com_numero_constante_de_consultas(self):
+        """A lista de álbuns custa o mesmo número de consultas com 1 ou 5 álbuns"""
+        self.criar_albuns(1)
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('galeria:album_list'))
+        self.assertContains(response, '2 Fotos')
+
+        self.criar_albuns(4)
+        with self.assertNumQueries(1):
+            self.client.get(reverse('galeria:album_list'))
+
+
+class AlbumDetailTest(TestCase):
+    """Testes para a paginação das fotos de um álbum"""
+
+    def setUp(self):
+        self.album = Album.objects.create(title="Evento", cover_image='galeria/covers/capa.jpg')
+        # Os arquivos não são abertos pelas páginas, então bastam os nomes
+        Foto.objects.bulk_create([
+            Foto(album=self.album, image=f'galeria/photos/foto{numero}.jpg', caption=f'Foto {numero}')
+            for numero in range(30)
+        ])
+
+    def test_primeira_pagina_limitada(self):
+        """O HTML inicial traz só a primeira página e o link para a próxima"""
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('galeria:album_detail', args=[self.album.pk]))
+        self.assertEqual(len(response.context['photos']), 24)
+        self.assertContains(response, 'id="loadMorePhotos"')
+
+    def test_json_continua_do_cursor(self):
+        """O endpoint JSON devolve as fotos seguintes, sem repetir nenhuma"""
+        response = self.client.get(reverse('galeria:album_detail', args=[self.album.pk]))
+        primeiras = [foto.pk for foto in response.context['photos']]
+
+        dados = self.client.get(
+            reverse('galeria:album_photos_json', args=[self.album.pk]),
+            {'cursor': response.context['proximo_cursor']}
+        ).json()
+        seguintes = [foto['id'] for foto in dados['fotos']]
+
+        self.assertEqual(len(seguintes), 6)
+        self.assertIsNone(dados['proximo_cursor'])
+        self.assertEqual(
+            primeiras + seguintes,
+            list(self.album.photos.order_by('uploaded_at', 'id').values_list('pk', flat=True))
+        )
+
+    def test_cursor_invalido_volta_ao_inicio(self):
+        """Um cursor inválido é ignorado"""
+        dados = self.client.get(
+            reverse('galeria:album_photos_json', args=[self.album.pk]), {'cursor': 'invalido'}
+        ).json()
+        self.assertEqual(len(dados['fotos']), 24)
@@ -13,6 +13,10 @@ urlpatterns = [
     # Ex: /galeria/1/
     path('<int:pk>/', album_detail_view, name='album_detail'),
 
+    # Próximo lote de fotos do álbum em JSON (rolagem infinita)
+    # Ex: /galeria/1/fotos/?cursor=...
+    path('<int:pk>/fotos/', views.album_photos_json, name='album_photos_json'),
+
     #URL para o card da homepage
     path("<int:album_id>/", views.detalhe_album, name="detalhe"),
 ]
@@ -1,11 +1,65 @@
+import base64
+import binascii
+import json
+
+from django.db.models import Q
+from django.http import JsonResponse
 from django.shortcuts import render, get_object_or_404
+from django.utils.dateparse import parse_datetime
+
+from .derivadas import TIPOS_MIME
 from .models import Album
 
+FOTOS_POR_PAGINA = 24
+
+
+def codificar_cursor(foto):
+    """Cursor opaco que aponta para depois da foto informada"""
+    dados = json.dumps([foto.uploaded_at.isoformat(), foto.pk]).encode()
+    return base64.urlsafe_b64encode(dados).decode().rstrip('=')
+
+
+def decodificar_cursor(cursor):
+    """Converte o cursor em (uploaded_at, id); cursores inválidos viram None"""
+    if not cursor:
+        return None
+    try:
+        dados = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        enviado_em, foto_id = json.loads(dados)
+        enviado_em = parse_datetime(enviado_em)
+        if enviado_em is None:
+            return None
+        return enviado_em, int(foto_id)
+    except (binascii.Error, ValueError, TypeError):
+        return None
+
+
+def pagina_fotos(album, cursor=None, limite=FOTOS_POR_PAGINA):
+    """
+    Retorna (fotos, proximo_cursor) com as fotos do álbum depois do cursor,
+    na ordem de envio. A paginação é por cursor (uploaded_at, id), sem OFFSET.
+    """
+    fotos = album.photos.order_by('uploaded_at', 'id')
+    posicao = decodificar_cursor(cursor)
+    if posicao is not None:
+        enviado_em, foto_id = posicao
+        fotos = fotos.filter(
+            Q(uploaded_at__gt=enviado_em) | Q(uploaded_at=enviado_em, id__gt=foto_id)
+        )
+
+    # Busca uma foto a mais para saber se existe próxima página
+    fotos = list(fotos[:limite + 1])
+    if len(fotos) > limite:
+        fotos = fotos[:limite]
+        return fotos, codificar_cursor(fotos[-1])
+    return fotos, None
+
 def album_list_view(request):
     """
     Exibe a lista de todos os álbuns de fotos.
     """
-    albums = Album.objects.all()
+    # A anotação descarta o Meta.ordering (GROUP BY): a ordem é repetida aqui
+    albums = Album.objects.com_contagem_fotos().order_by('-event_date')
     context = {
         'albums': albums
     }
@@ -13,16 +67,46 @@ def album_list_view(request):
 
 def album_detail_view(request, pk):
     """
-    Exibe todas as fotos de um álbum específico.
+    Exibe a primeira página de fotos de um álbum; as demais são carregadas
+    sob demanda pelo endpoint album_photos_json (rolagem infinita).
     """
     album = get_object_or_404(Album, pk=pk)
-    photos = album.photos.all()
+    photos, proximo_cursor = pagina_fotos(album, request.GET.get('cursor'))
     context = {
         'album': album,
-        'photos': photos
+        'photos': photos,
+        'proximo_cursor': proximo_cursor,
+        'is_first_page': not request.GET.get('cursor'),
     }
     return render(request, 'galeria/album_detail.html', context)
 
+
+def album_photos_json(request, pk):
+    """
+    Retorna em JSON o próximo lote de fotos do álbum, com as URLs das
+    versões reduzidas (srcset por formato).
+    """
+    album = get_object_or_404(Album, pk=pk)
+    photos, proximo_cursor = pagina_fotos(album, request.GET.get('cursor'))
+    return JsonResponse({
+        'fotos': [
+            {
+                'id': foto.pk,
+                'legenda': foto.caption or '',
+                'url': foto.url_imagem(),
+                'src': foto.url_imagem(640),
+                'fontes': [
+                    {'tipo': TIPOS_MIME[formato], 'srcset': foto.srcset(formato)}
+                    for formato in foto.derivadas_formatos
+                    if formato != 'jpeg' and foto.tem_derivadas
+                ],
+                'srcset': foto.srcset('jpeg'),
+            }
+            for foto in photos
+        ],
+        'proximo_cursor': proximo_cursor,
+    })
+
 def detalhe_album(request, album_id):
     album = get_object_or_404(Album, pk=album_id)
     return render(request, (
@@ -0,0 +1,103 @@
+"""
+Mede latência, consultas SQL e bytes de cada página pública e endpoint da API
+
+Os resultados são salvos em JSON (benchmarks/resultados/ por padrão) para
+comparar execuções ao longo do tempo. Veja o pacote benchmarks.
+
+Uso:
+    python manage.py benchmark --iteracoes 50
+    python manage.py benchmark --rotas publicacoes --sem-cache
+    python manage.py benchmark --comparar benchmarks/resultados/benchmark_20250101_120000.json
+"""
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from benchmarks import executor
+
+
+class Command(BaseCommand):
+    help = "Mede p50/p95/p99, consultas e bytes das páginas e da API e salva o resultado em JSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iteracoes',
+            type=int,
+            default=20,
+            help='Requisições medidas por rota (padrão: 20)',
+        )
+        parser.add_argument(
+            '--aquecimento',
+            type=int,
+            default=2,
+            help='Requisições descartadas antes da medição (padrão: 2)',
+        )
+        parser.add_argument(
+            '--rotas',
+            default='',
+            help='Mede apenas as rotas cujo nome contém este texto',
+        )
+        parser.add_argument(
+            '--sem-cache',
+            action='store_true',
+            help='Limpa o cache antes de cada requisição (mede a renderização completa)',
+        )
+        parser.add_argument(
+            '--saida',
+            help='Arquivo JSON de saída (padrão: benchmarks/resultados/benchmark_<data>.json)',
+        )
+        parser.add_argument(
+            '--comparar',
+            help='Resultado anterior (JSON) para comparar com esta execução',
+        )
+
+    def handle(self, *args, **options):
+        if options['iteracoes'] < 1:
+            raise CommandError('--iteracoes deve ser pelo menos 1')
+
+        anterior = None
+        if options['comparar']:
+            try:
+                anterior = executor.carregar(options['comparar'])
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Não foi possível ler {options['comparar']}: {e}")
+
+        self.stdout.write(f"{'rota':<60} {'p50':>8} {'p95':>8} {'p99':>8} {'sql':>5} {'bytes':>9}")
+        resultado = executor.executar(
+            iteracoes=options['iteracoes'],
+            aquecimento=options['aquecimento'],
+            filtro=options['rotas'],
+            sem_cache=options['sem_cache'],
+            progresso=self.mostrar_rota,
+        )
+
+        caminho = options['saida'] or os.path.join(
+            settings.BASE_DIR, 'benchmarks', 'resultados',
+            f"benchmark_{timezone.now():%Y%m%d_%H%M%S}.json",
+        )
+        os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+        executor.salvar(resultado, caminho)
+        self.stdout.write(self.style.SUCCESS(f"{len(resultado['rotas'])} rota(s) medida(s). Resultado salvo em {caminho}"))
+
+        if anterior:
+            self.mostrar_comparacao(executor.comparar(anterior, resultado))
+
+    def mostrar_rota(self, nome, medicao):
+        if medicao is None:
+            self.stdout.write(self.style.WARNING(f"{nome:<60} ignorada: sem dados no banco"))
+            return
+        latencia = medicao['latencia_ms']
+        self.stdout.write(
+            f"{nome:<60} {latencia['p50']:>8.1f} {latencia['p95']:>8.1f} {latencia['p99']:>8.1f} "
+            f"{medicao['consultas']['mediana']:>5} {medicao['bytes']['mediana']:>9}"
+        )
+
+    def mostrar_comparacao(self, comparacao):
+        self.stdout.write(f"\n{'rota':<60} {'p95 antes':>10} {'p95 agora':>10} {'variação':>9} {'sql':>9}")
+        for nome, p95_antes, p95_agora, variacao, sql_antes, sql_agora in comparacao:
+            estilo = self.style.ERROR if variacao > 10 else self.style.SUCCESS if variacao < -10 else str
+            self.stdout.write(estilo(
+                f"{nome:<60} {p95_antes:>10.1f} {p95_agora:>10.1f} {variacao:>+8.1f}% {sql_antes:>4}→{sql_agora:<4}"
+            ))
@@ -0,0 +1,390 @@
+"""
+Gera uma massa de dados sintética para testes de carga e benchmarks
+
+Os registros são inseridos com bulk_create (inclusive nas tabelas de ligação
+dos ManyToMany), então os signals não rodam: ao final as estatísticas das
+publicações são recalculadas, os modelos passam para uma nova geração de
+cache e o índice de busca é reconstruído de uma vez.
+Com --scale 1 são gerados os volumes de VOLUMES (100 mil produções, 20 mil
+autores, 5 mil PDFs reais e 50 mil fotos).
+
+Uso:
+    python manage.py generate_dataset --scale 0.1
+    python manage.py generate_dataset --scale 1 --limpar
+"""
+import itertools
+import os
+import random
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from io import BytesIO
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models.signals import post_delete, pre_delete
+from django.utils import timezone
+from PIL import Image
+
+from galeria.models import Album, Foto
+from langue import cache_versionado
+from langue.texto import normalizar
+from linhas_pesquisa.models import (
+    Estudante, LinhaPesquisa, PalavraChave, Pesquisador, PesquisadorLinha,
+)
+from producoes_bibliograficas.models import Autor, ProducaoBibliografica
+from publicacoes.models import EstatisticasPublicacoes, Organizador, PublicacaoPDF
+from search import indice
+from search.models import DocumentoBusca
+
+
+VOLUMES = {
+    'pesquisadores': 60,
+    'estudantes': 300,
+    'linhas': 12,
+    'autores': 20_000,
+    'producoes': 100_000,
+    'organizadores': 500,
+    'publicacoes': 5_000,
+    'albuns': 250,
+    'fotos': 50_000,
+}
+
+TAMANHO_LOTE = 2000
+
+# Imagens distintas geradas para a galeria; as fotos reaproveitam estes
+# arquivos, o que também exercita a deduplicação das derivadas por hash
+IMAGENS_DISTINTAS = 24
+
+PRIMEIROS_NOMES = [
+    'Ana', 'Bruno', 'Carla', 'Daniel', 'Eduarda', 'Felipe', 'Gabriela', 'Heitor', 'Isabela', 'João',
+    'Karina', 'Leonardo', 'Mariana', 'Natanael', 'Olívia', 'Paulo', 'Quitéria', 'Rafael', 'Sofia', 'Tiago',
+    'Úrsula', 'Vinícius', 'Wanda', 'Xavier', 'Yasmin', 'Zélia', 'Antônio', 'Beatriz', 'Cícero', 'Débora',
+    'Emanuel', 'Fernanda', 'Gustavo', 'Helena', 'Igor', 'Joana', 'Lucas', 'Luíza', 'Marcos', 'Nathália',
+]
+SOBRENOMES = [
+    'Silva', 'Souza', 'Oliveira', 'Santos', 'Lima', 'Barbosa', 'Azevedo', 'Mendes', 'Barros', 'Cavalcanti',
+    'Albuquerque', 'Araújo', 'Pereira', 'Ferreira', 'Rodrigues', 'Almeida', 'Nascimento', 'Carvalho', 'Gomes', 'Martins',
+    'Rocha', 'Ribeiro', 'Correia', 'Teixeira', 'Moura', 'Freitas', 'Vieira', 'Monteiro', 'Cardoso', 'Melo',
+    'Duarte', 'Bezerra', 'Farias', 'Pinto', 'Rego', 'Tavares', 'Queiroz', 'Brandão', 'Siqueira', 'Xavier',
+]
+TEMAS = [
+    'linguagem', 'discurso', 'letramento', 'gênero textual', 'ensino de língua portuguesa', 'literatura',
+    'história da leitura', 'variação linguística', 'análise do discurso', 'oralidade', 'multimodalidade',
+    'formação docente', 'semântica', 'argumentação', 'tradução', 'memória', 'identidade', 'narrativa',
+]
+LOCAIS = [
+    'Revista de Letras', 'Linguagem em (Dis)curso', 'Revista Brasileira de Linguística Aplicada',
+    'Anais do Congresso Nacional de Linguística', 'Cadernos de Estudos Linguísticos', 'Editora UFRPE',
+    'Revista Investigações', 'Anais do SIELP', 'Trabalhos em Linguística Aplicada',
+]
+
+
+def nome_pessoa(numero):
+    """Nome único e determinístico para o número informado"""
+    primeiro = PRIMEIROS_NOMES[numero % len(PRIMEIROS_NOMES)]
+    meio = SOBRENOMES[(numero // len(PRIMEIROS_NOMES)) % len(SOBRENOMES)]
+    ultimo = SOBRENOMES[(numero // (len(PRIMEIROS_NOMES) * len(SOBRENOMES))) % len(SOBRENOMES)]
+    sufixo = numero // (len(PRIMEIROS_NOMES) * len(SOBRENOMES) ** 2)
+    return f"{primeiro} {meio} {ultimo}" + (f" {sufixo + 1}" if sufixo else '')
+
+
+def nome_arquivo_pdf(numero):
+    return f'publicacoes/pdfs/dataset/publicacao_{numero:06d}.pdf'
+
+
+def numeros_livres(formatar, ocupados):
+    """Números em ordem cujo nome, formatar(numero), ainda não está em `ocupados`"""
+    return (numero for numero in itertools.count() if formatar(numero) not in ocupados)
+
+
+@contextmanager
+def sem_signals_de_exclusao(modelos):
+    """
+    Desconecta os receivers de pre_delete e post_delete de `modelos` (índice de
+    busca, nomes desnormalizados, estatísticas e gerações do cache). Sem eles o
+    Django exclui cada tabela com um único DELETE, em vez de carregar os
+    objetos e disparar os signals um a um.
+    """
+    desconectados = []
+    for sinal in (pre_delete, post_delete):
+        for modelo in modelos:
+            for receiver in itertools.chain(*sinal._live_receivers(modelo)):
+                if sinal.disconnect(receiver, sender=modelo):
+                    desconectados.append((sinal, receiver, modelo))
+    try:
+        yield
+    finally:
+        for sinal, receiver, modelo in desconectados:
+            sinal.connect(receiver, sender=modelo)
+
+
+class Command(BaseCommand):
+    help = "Gera uma massa de dados sintética (bulk_create) para testes de carga e benchmarks"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scale',
+            type=float,
+            default=1.0,
+            help='Multiplicador dos volumes padrão (1 = 100 mil produções, 5 mil PDFs, 50 mil fotos)',
+        )
+        parser.add_argument(
+            '--semente',
+            type=int,
+            default=42,
+            help='Semente do gerador aleatório, para massas reproduzíveis (padrão: 42)',
+        )
+        parser.add_argument(
+            '--limpar',
+            action='store_true',
+            help='Apaga o conteúdo existente (produções, publicações, linhas e galeria) antes de gerar',
+        )
+        parser.add_argument(
+            '--sem-indice',
+            action='store_true',
+            help='Não reconstrói o índice de busca ao final',
+        )
+
+    def handle(self, *args, **options):
+        self.aleatorio = random.Random(options['semente'])
+        self.volumes = {
+            chave: max(1, round(volume * options['scale']))
+            for chave, volume in VOLUMES.items()
+        }
+        inicio = time.perf_counter()
+
+        with transaction.atomic():
+            if options['limpar']:
+                self.etapa('Limpando dados existentes', self.limpar)
+            self.etapa('Linhas de pesquisa', self.gerar_linhas)
+            self.etapa('Produções bibliográficas', self.gerar_producoes)
+            self.etapa('Publicações PDF', self.gerar_publicacoes)
+            self.etapa('Galeria', self.gerar_galeria)
+            # bulk_create não dispara os signals que atualizam as estatísticas
+            self.etapa('Estatísticas das publicações', EstatisticasPublicacoes.recalcular)
+            # Nem as gerações do cache das páginas (langue/cache_versionado.py)
+            self.etapa('Cache das páginas', self.renovar_cache)
+
+        if not options['sem_indice']:
+            self.etapa('Índice de busca', indice.reconstruir)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Massa de dados gerada em {time.perf_counter() - inicio:.1f}s: "
+            + ', '.join(f"{volume} {chave}" for chave, volume in self.volumes.items())
+        ))
+
+    def etapa(self, descricao, funcao):
+        inicio = time.perf_counter()
+        funcao()
+        self.stdout.write(f"  {descricao}: {time.perf_counter() - inicio:.1f}s")
+
+    def limpar(self):
+        modelos = (Foto, Album, PublicacaoPDF, Organizador, ProducaoBibliografica, Autor,
+                   PesquisadorLinha, LinhaPesquisa, Pesquisador, Estudante, PalavraChave)
+        # Índice, estatísticas e cache são refeitos de uma vez ao final de handle()
+        with sem_signals_de_exclusao(modelos):
+            for modelo in modelos:
+                modelo.objects.all().delete()
+        DocumentoBusca.objects.all().delete()
+
+    def renovar_cache(self):
+        for modelo in (LinhaPesquisa, Pesquisador, Estudante, PesquisadorLinha, PalavraChave,
+                       LinhaPesquisa.estudantes.through, LinhaPesquisa.palavras.through,
+                       ProducaoBibliografica, Autor, ProducaoBibliografica.autores.through):
+            cache_versionado.nova_geracao(modelo)
+
+    def titulo(self):
+        tema, outro = self.aleatorio.sample(TEMAS, 2)
+        return f"{tema.capitalize()} e {outro}: {self.aleatorio.choice(['estudo de caso', 'uma abordagem crítica', 'perspectivas', 'reflexões', 'práticas em sala de aula'])}"
+
+    def gerar_linhas(self):
+        pesquisadores = Pesquisador.objects.bulk_create([
+            Pesquisador(nome=nome_pessoa(numero), universidade=self.aleatorio.choice(['UFRPE', 'UFPE', 'UNICAP', 'UERJ']))
+            for numero in range(self.volumes['pesquisadores'])
+        ], batch_size=TAMANHO_LOTE)
+        niveis = [nivel for nivel, _ in Estudante.NIVEL_CHOICES]
+        estudantes = Estudante.objects.bulk_create([
+            Estudante(nome=nome_pessoa(numero + 7), nivel=self.aleatorio.choice(niveis), universidade='UFRPE')
+            for numero in range(self.volumes['estudantes'])
+        ], batch_size=TAMANHO_LOTE)
+        linhas = LinhaPesquisa.objects.bulk_create([
+            LinhaPesquisa(
+                titulo=f"{self.titulo()} ({numero + 1})",
+                objetivo=f"Investigar {self.aleatorio.choice(TEMAS)} em contextos de {self.aleatorio.choice(TEMAS)}.",
+                palavras_chave='; '.join(self.aleatorio.sample(TEMAS, 4)),
+                setores_aplicacao='Educação; Cultura',
+                ordem=numero,
+            )
+            for numero in range(self.volumes['linhas'])
+        ], batch_size=TAMANHO_LOTE)
+
+        EstudantesLinha = LinhaPesquisa.estudantes.through
+        PesquisadorLinha.objects.bulk_create([
+            PesquisadorLinha(
+                linhapesquisa_id=linha.pk,
+                pesquisador_id=pesquisador.pk,
+                papel=PesquisadorLinha.COORDENADOR if ordem == 0 else PesquisadorLinha.MEMBRO,
+                ordem=ordem,
+            )
+            for linha in linhas
+            for ordem, pesquisador in enumerate(self.aleatorio.sample(pesquisadores, min(5, len(pesquisadores))))
+        ], batch_size=TAMANHO_LOTE)
+        EstudantesLinha.objects.bulk_create([
+            EstudantesLinha(linhapesquisa_id=linha.pk, estudante_id=estudante.pk)
+            for linha in linhas
+            for estudante in self.aleatorio.sample(estudantes, min(20, len(estudantes)))
+        ], batch_size=TAMANHO_LOTE)
+
+        # bulk_create não dispara o signal que normaliza as palavras-chave
+        palavras = {palavra.termo: palavra.pk for palavra in PalavraChave.obter_ou_criar(TEMAS)}
+        PalavrasLinha = LinhaPesquisa.palavras.through
+        PalavrasLinha.objects.bulk_create([
+            PalavrasLinha(linhapesquisa_id=linha.pk, palavrachave_id=palavras[normalizar(nome)])
+            for linha in linhas
+            for nome in linha.get_palavras_chave_list()
+        ], batch_size=TAMANHO_LOTE)
+
+    def gerar_producoes(self):
+        # Autor.nome é único: pula os nomes já usados para poder rodar o comando de novo sem --limpar
+        numeros = numeros_livres(nome_pessoa, set(Autor.objects.values_list('nome', flat=True)))
+        autores = Autor.objects.bulk_create([
+            Autor(nome=nome_pessoa(numero), lattes_link=f'http://lattes.cnpq.br/{1000000000 + numero}')
+            for numero in itertools.islice(numeros, self.volumes['autores'])
+        ], batch_size=TAMANHO_LOTE)
+        autor_ids = [autor.pk for autor in autores]
+        tipos = [tipo for tipo, _ in ProducaoBibliografica.TIPO_CHOICES]
+        ano_atual = timezone.now().year
+        AutoresProducao = ProducaoBibliografica.autores.through
+
+        for posicao in range(0, self.volumes['producoes'], TAMANHO_LOTE):
+            quantidade = min(TAMANHO_LOTE, self.volumes['producoes'] - posicao)
+            producoes = ProducaoBibliografica.objects.bulk_create([
+                ProducaoBibliografica(
+                    titulo=self.titulo(),
+                    tipo=self.aleatorio.choice(tipos),
+                    local_publicacao=self.aleatorio.choice(LOCAIS),
+                    volume=str(self.aleatorio.randint(1, 40)),
+                    numero=str(self.aleatorio.randint(1, 4)),
+                    paginas=f"{(inicio := self.aleatorio.randint(1, 300))}-{inicio + self.aleatorio.randint(8, 30)}",
+                    ano_publicacao=ano_atual - int(self.aleatorio.triangular(0, 25, 0)),
+                    ativa=self.aleatorio.random() > 0.02,
+                )
+                for _ in range(quantidade)
+            ])
+            AutoresProducao.objects.bulk_create([
+                AutoresProducao(producaobibliografica_id=producao.pk, autor_id=autor_id)
+                for producao in producoes
+                for autor_id in self.aleatorio.sample(autor_ids, min(self.aleatorio.randint(1, 4), len(autor_ids)))
+            ], batch_size=TAMANHO_LOTE)
+            # bulk_create não dispara o signal que monta os nomes dos autores
+            ProducaoBibliografica.objects.filter(
+                pk__in=[producao.pk for producao in producoes]
+            ).atualizar_autores_nomes(TAMANHO_LOTE)
+
+    def gerar_publicacoes(self):
+        organizadores = Organizador.objects.bulk_create([
+            Organizador(nome=nome_pessoa(numero + 3), email=f'organizador{numero}@ufrpe.edu.br')
+            for numero in range(self.volumes['organizadores'])
+        ], batch_size=TAMANHO_LOTE)
+        organizador_ids = [organizador.pk for organizador in organizadores]
+        categorias = [categoria for categoria, _ in PublicacaoPDF.CATEGORIA_CHOICES]
+        ano_atual = timezone.now().year
+        OrganizadoresPublicacao = PublicacaoPDF.organizadores.through
+        os.makedirs(default_storage.path('publicacoes/pdfs/dataset'), exist_ok=True)
+        # Não sobrescreve o PDF de uma publicação que continua no banco
+        numeros = numeros_livres(
+            nome_arquivo_pdf, set(PublicacaoPDF.objects.values_list('arquivo_pdf', flat=True))
+        )
+
+        for posicao in range(0, self.volumes['publicacoes'], TAMANHO_LOTE):
+            quantidade = min(TAMANHO_LOTE, self.volumes['publicacoes'] - posicao)
+            novas = []
+            for numero in itertools.islice(numeros, quantidade):
+                titulo = self.titulo()
+                nome_arquivo = nome_arquivo_pdf(numero)
+                with open(default_storage.path(nome_arquivo), 'wb') as arquivo:
+                    arquivo.write(self.pdf(titulo))
+                novas.append(PublicacaoPDF(
+                    titulo=titulo,
+                    categoria=self.aleatorio.choice(categorias),
+                    ano_publicacao=ano_atual - self.aleatorio.randint(0, 15),
+                    editora='Editora UFRPE',
+                    numero_paginas=self.aleatorio.randint(40, 400),
+                    arquivo_pdf=nome_arquivo,
+                    destaque=self.aleatorio.random() < 0.05,
+                    downloads=self.aleatorio.randint(0, 500),
+                ))
+            publicacoes = PublicacaoPDF.objects.bulk_create(novas)
+            OrganizadoresPublicacao.objects.bulk_create([
+                OrganizadoresPublicacao(publicacaopdf_id=publicacao.pk, organizador_id=organizador_id)
+                for publicacao in publicacoes
+                for organizador_id in self.aleatorio.sample(
+                    organizador_ids, min(self.aleatorio.randint(1, 3), len(organizador_ids))
+                )
+            ], batch_size=TAMANHO_LOTE)
+            # bulk_create não dispara o signal que monta os nomes dos organizadores
+            PublicacaoPDF.objects.filter(
+                pk__in=[publicacao.pk for publicacao in publicacoes]
+            ).atualizar_organizadores_nomes(TAMANHO_LOTE)
+
+    def pdf(self, titulo):
+        """
+        PDF real de uma página, para que a geração de thumbnails tenha o que
+        renderizar. Montado à mão porque gerar milhares com o PyMuPDF é lento.
+        """
+        texto = titulo.encode('latin-1', 'replace').replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)')
+        conteudo = b'BT /F1 18 Tf 40 500 Td (' + texto + b') Tj 0 -460 Td /F1 10 Tf (LANGUE UFRPE) Tj ET'
+        objetos = [
+            b'<< /Type /Catalog /Pages 2 0 R >>',
+            b'<< /Type /Pages /Kids [3 0 R] /Count 1 >>',
+            b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 420 595] '
+            b'/Resources << /Font << /F1 4 0 R >> >> /Contents 5 0 R >>',
+            b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>',
+            b'<< /Length %d >>\nstream\n' % len(conteudo) + conteudo + b'\nendstream',
+        ]
+        pdf = bytearray(b'%PDF-1.4\n')
+        posicoes = []
+        for numero, objeto in enumerate(objetos, start=1):
+            posicoes.append(len(pdf))
+            pdf += b'%d 0 obj\n' % numero + objeto + b'\nendobj\n'
+        inicio_xref = len(pdf)
+        pdf += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objetos) + 1)
+        pdf += b''.join(b'%010d 00000 n \n' % posicao for posicao in posicoes)
+        pdf += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objetos) + 1, inicio_xref)
+        return bytes(pdf)
+
+    def imagens(self, pasta):
+        """Gera IMAGENS_DISTINTAS JPEGs e retorna seus nomes no storage"""
+        os.makedirs(default_storage.path(pasta), exist_ok=True)
+        nomes = []
+        for numero in range(IMAGENS_DISTINTAS):
+            cor = tuple(self.aleatorio.randint(40, 220) for _ in range(3))
+            imagem = Image.new('RGB', (1600, 1067), cor)
+            imagem.paste(tuple(255 - canal for canal in cor), (200 + numero * 40, 200, 900 + numero * 20, 800))
+            buffer = BytesIO()
+            imagem.save(buffer, format='JPEG', quality=80)
+            nome = f'{pasta}/imagem_{numero:02d}.jpg'
+            with open(default_storage.path(nome), 'wb') as arquivo:
+                arquivo.write(buffer.getvalue())
+            nomes.append(nome)
+        return nomes
+
+    def gerar_galeria(self):
+        capas = self.imagens('galeria/covers/dataset')
+        fotos = self.imagens('galeria/photos/dataset')
+        hoje = timezone.localdate()
+        albuns = Album.objects.bulk_create([
+            Album(
+                title=f"{self.aleatorio.choice(['Congresso', 'Seminário', 'Encontro', 'Colóquio'])} de {self.aleatorio.choice(TEMAS)} {numero + 1}",
+                cover_image=self.aleatorio.choice(capas),
+                event_date=hoje - timedelta(days=self.aleatorio.randint(0, 3650)),
+            )
+            for numero in range(self.volumes['albuns'])
+        ], batch_size=TAMANHO_LOTE)
+        album_ids = [album.pk for album in albuns]
+        Foto.objects.bulk_create([
+            Foto(album_id=self.aleatorio.choice(album_ids), image=self.aleatorio.choice(fotos))
+            for _ in range(self.volumes['fotos'])
+        ], batch_size=TAMANHO_LOTE)
@@ -1,3 +1,102 @@
-from django.test import TestCase
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
 
-# Create your tests here.
+from django.core.management import call_command
+from django.db import connection
+from django.db.models.signals import post_delete
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from benchmarks.executor import percentil
+from home.management.commands.generate_dataset import Command as GenerateDataset
+from galeria.models import Album, Foto
+from langue import cache_versionado
+from linhas_pesquisa.models import LinhaPesquisa
+from producoes_bibliograficas.models import Autor, ProducaoBibliografica
+from publicacoes.models import PublicacaoPDF
+from search.models import DocumentoBusca
+
+
+class GenerateDatasetTest(TestCase):
+    """Testes para o comando generate_dataset"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.override = override_settings(MEDIA_ROOT=self.media_root)
+        self.override.enable()
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def test_volumes_proporcionais_a_escala(self):
+        """--scale multiplica os volumes e pode ser executado mais de uma vez"""
+        call_command('generate_dataset', scale=0.001, stdout=StringIO())
+        call_command('generate_dataset', scale=0.001, sem_indice=True, stdout=StringIO())
+
+        self.assertEqual(ProducaoBibliografica.objects.count(), 200)
+        self.assertEqual(Foto.objects.count(), 100)
+        publicacao = PublicacaoPDF.objects.first()
+        with publicacao.arquivo_pdf.open('rb') as arquivo:
+            self.assertTrue(arquivo.read().startswith(b'%PDF'))
+
+    def test_numeracao_apos_exclusoes(self):
+        """Rodar de novo depois de excluir registros não repete nomes de autores nem arquivos"""
+        call_command('generate_dataset', scale=0.001, sem_indice=True, stdout=StringIO())
+        Autor.objects.order_by('pk').first().delete()
+        PublicacaoPDF.objects.order_by('pk').first().delete()
+        call_command('generate_dataset', scale=0.001, sem_indice=True, stdout=StringIO())
+
+        self.assertEqual(Autor.objects.count(), 39)
+        arquivos = list(PublicacaoPDF.objects.values_list('arquivo_pdf', flat=True))
+        self.assertEqual(len(arquivos), len(set(arquivos)))
+
+    def test_nova_geracao_do_cache(self):
+        """As páginas guardadas antes da carga não continuam sendo servidas"""
+        geracao = cache_versionado.geracao(ProducaoBibliografica, LinhaPesquisa)
+        call_command('generate_dataset', scale=0.001, limpar=True, sem_indice=True, stdout=StringIO())
+        self.assertNotEqual(cache_versionado.geracao(ProducaoBibliografica, LinhaPesquisa), geracao)
+
+    def test_limpar_sem_signals_por_objeto(self):
+        """--limpar exclui as tabelas sem disparar os signals de cada objeto e depois os reconecta"""
+        call_command('generate_dataset', scale=0.001, stdout=StringIO())
+        with CaptureQueriesContext(connection) as consultas:
+            GenerateDataset().limpar()
+        self.assertLess(len(consultas), 50)
+        self.assertFalse(ProducaoBibliografica.objects.exists())
+        self.assertFalse(DocumentoBusca.objects.exists())
+        self.assertTrue(post_delete.has_listeners(ProducaoBibliografica))
+
+
+class BenchmarkTest(TestCase):
+    """Testes para o comando benchmark"""
+
+    def setUp(self):
+        self.pasta = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.pasta, ignore_errors=True)
+
+    def test_percentil_interpolado(self):
+        amostras = [10, 20, 30, 40, 50]
+        self.assertEqual(percentil(amostras, 50), 30)
+        self.assertEqual(percentil(amostras, 95), 48)
+        self.assertEqual(percentil([7], 99), 7)
+
+    def test_resultado_salvo_em_json(self):
+        """Cada rota medida registra latência, consultas e bytes"""
+        Album.objects.create(title="Evento", cover_image='galeria/covers/capa.jpg')
+        saida = os.path.join(self.pasta, 'resultado.json')
+        call_command('benchmark', iteracoes=3, aquecimento=0, rotas='galeria:album', saida=saida, stdout=StringIO())
+
+        with open(saida, encoding='utf-8') as arquivo:
+            resultado = json.load(arquivo)
+        self.assertEqual(set(resultado['rotas']), {'galeria:album_list', 'galeria:album_detail', 'galeria:album_photos_json'})
+        medicao = resultado['rotas']['galeria:album_detail']
+        self.assertEqual(medicao['status'], [200])
+        self.assertEqual(set(medicao['latencia_ms']), {'p50', 'p95', 'p99', 'media', 'min', 'max'})
+        self.assertEqual(medicao['consultas']['max'], 2)
+        self.assertGreater(medicao['bytes']['mediana'], 0)
@@ -0,0 +1,118 @@
+"""
+Cache com invalidação por geração de modelo
+
+Cada modelo tem uma geração (um valor aleatório) guardada no cache
+compartilhado. Os signals post_save, post_delete e m2m_changed de cada app
+chamam nova_geracao(), e as chaves de tudo o que depende do modelo passam a
+ser outras. As entradas antigas não são apagadas: deixam de ser lidas e expiram
+sozinhas. Como a geração fica no cache compartilhado (arquivos ou Redis, ver
+CACHES), todos os processos veem a mudança na requisição seguinte.
+
+    @cache_por_modelos(LinhaPesquisa, Pesquisador, Estudante)
+    def linhas_pesquisa_view(request):
+        ...
+
+Os cards das listagens também são guardados um a um ({% cache %} do Django),
+com a chave formada pelo objeto, sua data de atualização e a geração dos
+modelos relacionados (contexto_fragmentos()).
+"""
+import hashlib
+import uuid
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.cache import (
+    get_cache_key, get_max_age, has_vary_header, learn_cache_key, patch_response_headers,
+)
+
+
+def chave(modelo):
+    return f'geracao:{modelo._meta.label_lower}'
+
+
+def _geracao_nova():
+    # Um valor que nunca se repete, em vez de um contador: cache.incr() não é
+    # atômico entre processos no FileBasedCache, e duas mudanças simultâneas
+    # poderiam gravar o mesmo número. Com set() a última escrita vence, mas a
+    # geração sempre passa a ser diferente da que foi lida antes da mudança
+    return uuid.uuid4().hex
+
+
+def geracao(*modelos):
+    """Identificador das gerações atuais de `modelos`, lido numa só ida ao cache"""
+    chaves = [chave(modelo) for modelo in modelos]
+    atuais = cache.get_many(chaves)
+    for chave_geracao in chaves:
+        if chave_geracao not in atuais:
+            cache.add(chave_geracao, _geracao_nova(), None)
+            atuais[chave_geracao] = cache.get(chave_geracao)
+    valores = '.'.join(str(atuais[chave_geracao]) for chave_geracao in chaves)
+    return hashlib.md5(valores.encode()).hexdigest()
+
+
+def nova_geracao(modelo):
+    """
+    Passa `modelo` para uma nova geração. Repete após o commit, para não
+    aproveitar o que outra requisição guardou lendo os dados antigos durante
+    a transação.
+    """
+    chave_geracao = chave(modelo)
+    cache.set(chave_geracao, _geracao_nova(), None)
+    transaction.on_commit(lambda: cache.set(chave_geracao, _geracao_nova(), None))
+
+
+def contexto_fragmentos(*modelos):
+    """
+    Variáveis de contexto para a chave e a validade dos fragmentos em cache:
+
+        {% cache tempo_cache_cards 'card' objeto.pk objeto.data_atualizacao versao_cards %}
+    """
+    return {
+        'versao_cards': geracao(*modelos),
+        'tempo_cache_cards': settings.CACHE_FRAGMENTOS_TIMEOUT,
+    }
+
+
+def cache_por_modelos(*modelos, timeout=None):
+    """
+    Como cache_page, mas a chave inclui a geração de `modelos`: a página é
+    refeita assim que um deles é salvo ou excluído.
+    """
+    if timeout is None:
+        timeout = settings.CACHE_PAGINAS_TIMEOUT
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+
+            prefixo = f'pagina.{geracao(*modelos)}'
+            chave_cache = get_cache_key(request, prefixo, 'GET', cache=cache)
+            if chave_cache is not None:
+                resposta = cache.get(chave_cache)
+                if resposta is not None:
+                    return resposta
+
+            resposta = view(request, *args, **kwargs)
+            if _pode_guardar(request, resposta):
+                patch_response_headers(resposta, timeout)
+                chave_cache = learn_cache_key(request, resposta, timeout, prefixo, cache=cache)
+                cache.set(chave_cache, resposta, timeout)
+            return resposta
+        return wrapper
+    return decorator
+
+
+def _pode_guardar(request, resposta):
+    """Mesmas regras do UpdateCacheMiddleware do Django"""
+    if resposta.streaming or resposta.status_code != 200:
+        return False
+    # Cookie do usuário criado por uma requisição sem cookies
+    if not request.COOKIES and resposta.cookies and has_vary_header(resposta, 'Cookie'):
+        return False
+    if 'private' in resposta.get('Cache-Control', ()):
+        return False
+    return get_max_age(resposta) != 0
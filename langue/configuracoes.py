@@ -0,0 +1,73 @@
+"""
+Cache das configurações de página
+
+ConfiguracaoPagina, ConfiguracaoPaginaProducoes e ConfiguracaoPaginaPublicacoes
+têm uma linha cada, que quase nunca muda e era consultada em toda requisição.
+obter() guarda essa linha na memória do processo e no cache compartilhado, de
+modo que as views não vão ao banco. Os signals post_save/post_delete de cada
+app chamam invalidar().
+
+Outros processos não recebem o signal: a cópia em memória deles é conferida
+contra o cache compartilhado a cada CONFIGURACOES_CACHE_MEMORIA segundos.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+
+# Guardado no cache compartilhado quando a configuração não existe (None
+# significaria "não está no cache")
+SEM_CONFIGURACAO = 'sem-configuracao'
+
+# chave -> (validade em time.monotonic(), configuração ou None)
+_memoria = {}
+
+
+def chave(modelo):
+    return f'configuracao:{modelo._meta.label_lower}'
+
+
+def obter(modelo, consulta):
+    """
+    Configuração de `modelo`, ou None se não houver nenhuma. `consulta` é
+    chamada sem argumentos para ler a linha do banco quando ela não está em cache.
+    """
+    chave_cache = chave(modelo)
+    agora = time.monotonic()
+
+    em_memoria = _memoria.get(chave_cache)
+    if em_memoria and em_memoria[0] > agora:
+        return em_memoria[1]
+
+    configuracao = cache.get(chave_cache)
+    if configuracao is None:
+        configuracao = consulta()
+        cache.set(chave_cache, SEM_CONFIGURACAO if configuracao is None else configuracao,
+                  settings.CONFIGURACOES_CACHE_TIMEOUT)
+    elif configuracao == SEM_CONFIGURACAO:
+        configuracao = None
+
+    _memoria[chave_cache] = (agora + settings.CONFIGURACOES_CACHE_MEMORIA, configuracao)
+    return configuracao
+
+
+def _descartar(chave_cache):
+    _memoria.pop(chave_cache, None)
+    cache.delete(chave_cache)
+
+
+def invalidar(modelo):
+    """
+    Descarta a configuração em cache. Repete o descarte após o commit, para
+    não manter o valor antigo lido por outra requisição durante a transação.
+    """
+    chave_cache = chave(modelo)
+    _descartar(chave_cache)
+    transaction.on_commit(lambda: _descartar(chave_cache))
+
+
+def limpar():
+    """Descarta todas as configurações em memória (usado nos testes)"""
+    _memoria.clear()
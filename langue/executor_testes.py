@@ -0,0 +1,27 @@
+"""
+Executor dos testes (settings.TEST_RUNNER)
+
+Troca o cache compartilhado (arquivos ou Redis, ver CACHES) por um cache em
+memória durante os testes, para que os cache.clear() dos testes não apaguem
+o cache de um servidor em execução.
+"""
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+CACHES_TESTES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+
+class ExecutorTestes(DiscoverRunner):
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._cache_testes = override_settings(CACHES=CACHES_TESTES)
+        self._cache_testes.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._cache_testes.disable()
+        super().teardown_test_environment(**kwargs)
@@ -0,0 +1,153 @@
+"""
+Filas de processamento em segundo plano
+
+A fila é a própria tabela do modelo: um campo de status indica o que está
+pendente. Cada worker reserva os registros com um UPDATE condicional
+(PENDENTE -> PROCESSANDO), então vários workers podem rodar ao mesmo tempo
+sem processar o mesmo registro duas vezes. Usada pelos thumbnails das
+publicações (publicacoes/tarefas.py) e pelas derivadas das imagens da galeria
+(galeria/tarefas.py); ComandoWorker é a base dos comandos que esvaziam a fila.
+
+    fila = Fila(PublicacaoPDF, processar_thumbnail, 'thumbnail_status',
+                'thumbnail_processado_em', ordenacao='criado_em')
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+
+class Fila:
+    """
+    Fila sobre um ou mais modelos. `processar(objeto)` trata um registro
+    reservado e retorna True em caso de sucesso; `campo_data` guarda quando o
+    status mudou, para liberar_travados() achar os registros abandonados.
+    """
+
+    def __init__(self, modelos, processar, campo_status, campo_data, ordenacao='pk'):
+        self.modelos = modelos if isinstance(modelos, (list, tuple)) else (modelos,)
+        self.processar = processar
+        self.campo_status = campo_status
+        self.campo_data = campo_data
+        self.ordenacao = ordenacao
+
+    def reservar_pendentes(self, limite):
+        """Reserva até `limite` registros pendentes e retorna uma lista de (modelo, id)"""
+        reservados = []
+        for modelo in self.modelos:
+            candidatos = modelo.objects.filter(
+                **{self.campo_status: 'PENDENTE'}
+            ).order_by(self.ordenacao).values_list('pk', flat=True)[:limite - len(reservados)]
+
+            for pk in candidatos:
+                atualizados = modelo.objects.filter(pk=pk, **{self.campo_status: 'PENDENTE'}).update(
+                    **{self.campo_status: 'PROCESSANDO', self.campo_data: timezone.now()}
+                )
+                if atualizados:
+                    reservados.append((modelo, pk))
+            if len(reservados) >= limite:
+                break
+        return reservados
+
+    def liberar_travados(self, minutos=10):
+        """Devolve para a fila os registros de workers que pararam no meio do processamento"""
+        limite = timezone.now() - timedelta(minutes=minutos)
+        return sum(
+            modelo.objects.filter(
+                **{self.campo_status: 'PROCESSANDO', f'{self.campo_data}__lt': limite}
+            ).update(**{self.campo_status: 'PENDENTE'})
+            for modelo in self.modelos
+        )
+
+    def processar_reservado(self, modelo, pk):
+        """Processa um registro reservado. Retorna True em caso de sucesso"""
+        objeto = modelo.objects.filter(pk=pk).first()
+        if objeto is None:
+            return False
+        return self.processar(objeto)
+
+    def _processar_em_thread(self, tarefa):
+        try:
+            return self.processar_reservado(*tarefa)
+        finally:
+            # Cada thread abre a própria conexão; fecha ao terminar a tarefa
+            connection.close()
+
+    def processar_pendentes(self, threads=2, limite=20):
+        """
+        Reserva um lote de registros pendentes e processa em paralelo.
+        Retorna uma tupla (processados, erros).
+        """
+        reservados = self.reservar_pendentes(limite)
+        if not reservados:
+            return 0, 0
+
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            resultados = list(executor.map(self._processar_em_thread, reservados))
+
+        sucessos = sum(1 for resultado in resultados if resultado)
+        return sucessos, len(resultados) - sucessos
+
+
+class ComandoWorker(BaseCommand):
+    """
+    Comando que esvazia uma Fila e fica aguardando novas tarefas. As
+    subclasses definem `fila`, `nome` ("Worker de ...") e `mensagem_lote`,
+    formatada com `sucessos` e `erros`.
+    """
+    fila = None
+    nome = "Worker"
+    mensagem_lote = "{sucessos} tarefa(s) processada(s), {erros} erro(s)."
+    ajuda_threads = 'Número de tarefas processadas em paralelo (padrão: 2)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--threads',
+            type=int,
+            default=2,
+            help=self.ajuda_threads,
+        )
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=20,
+            help='Quantidade de tarefas reservadas por vez (padrão: 20)',
+        )
+        parser.add_argument(
+            '--intervalo',
+            type=float,
+            default=5.0,
+            help='Segundos de espera quando a fila está vazia (padrão: 5)',
+        )
+        parser.add_argument(
+            '--uma-vez',
+            action='store_true',
+            help='Esvazia a fila e termina, em vez de ficar aguardando novas tarefas',
+        )
+
+    def handle(self, *args, **options):
+        liberadas = self.fila.liberar_travados()
+        if liberadas:
+            self.stdout.write(f"{liberadas} tarefa(s) interrompida(s) devolvida(s) à fila.")
+
+        self.stdout.write(f"{self.nome} iniciado.")
+        try:
+            while True:
+                sucessos, erros = self.fila.processar_pendentes(
+                    threads=options['threads'],
+                    limite=options['lote'],
+                )
+                if sucessos or erros:
+                    self.stdout.write(self.mensagem_lote.format(sucessos=sucessos, erros=erros))
+                    continue
+
+                if options['uma_vez']:
+                    break
+                time.sleep(options['intervalo'])
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS(f"{self.nome} finalizado."))
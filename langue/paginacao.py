@@ -0,0 +1,152 @@
+"""
+Paginação por cursor (keyset) da API REST
+
+PageNumberPagination faz um COUNT(*) a cada página e chega às páginas com
+OFFSET, e as duas coisas ficam mais lentas quanto mais fundo o cliente vai.
+PaginacaoPorCursor guarda no cursor os valores da ordenação do último item
+entregue e busca a página seguinte com
+
+    WHERE ano_publicacao < 2021
+       OR (ano_publicacao = 2021 AND criado_em < '...')
+       OR (ano_publicacao = 2021 AND criado_em = '...' AND id < 42)
+
+sobre um índice com os mesmos campos (ver Meta.indexes dos modelos), então a
+última página custa o mesmo que a primeira.
+
+A ordenação é a do queryset da view (order_by() ou Meta.ordering), com a
+chave primária no fim para desempatar. Só campos do próprio modelo podem ser
+usados. A resposta é {"next": url, "previous": url, "results": [...]}, sem o
+total de itens. O cursor é opaco para o cliente, que só segue os links.
+
+A paginação da DRF (CursorPagination) posiciona o cursor só pelo primeiro
+campo e desempata com OFFSET, limitado a 1000 itens. Com milhares de
+produções no mesmo ano, a navegação pararia no meio do ano.
+"""
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+def ordenacao_com_chave(queryset):
+    """Campos de ordenação do queryset, terminando pela chave primária"""
+    ordenacao = list(queryset.query.order_by or queryset.model._meta.ordering)
+    for campo in ordenacao:
+        if not isinstance(campo, str) or '__' in campo or campo.lstrip('-') == '?':
+            raise ImproperlyConfigured(
+                f"PaginacaoPorCursor só ordena por campos de {queryset.model.__name__}: {campo!r}"
+            )
+    chave = queryset.model._meta.pk.name
+    if not any(campo.lstrip('-') in ('pk', chave) for campo in ordenacao):
+        decrescente = bool(ordenacao) and ordenacao[-1].startswith('-')
+        ordenacao.append(f"{'-' if decrescente else ''}{chave}")
+    return ordenacao
+
+
+def inverter(campo):
+    return campo[1:] if campo.startswith('-') else f'-{campo}'
+
+
+def filtro_apos(ordenacao, valores):
+    """Itens que vêm depois de `valores` na `ordenacao`"""
+    filtro = None
+    for campo, valor in reversed(list(zip(ordenacao, valores))):
+        nome = campo.lstrip('-')
+        depois = Q(**{f"{nome}__{'lt' if campo.startswith('-') else 'gt'}": valor})
+        filtro = depois if filtro is None else depois | (Q(**{nome: valor}) & filtro)
+    return filtro
+
+
+class PaginacaoPorCursor(BasePagination):
+    """Paginação keyset pelos campos de ordenação do queryset (ver o início do módulo)"""
+    page_size = api_settings.PAGE_SIZE
+    cursor_query_param = 'cursor'
+    mensagem_cursor_invalido = 'Cursor inválido'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.base_url = request.build_absolute_uri()
+        self.ordenacao = ordenacao_com_chave(queryset)
+        posicao, voltando = self.decodificar_cursor(request)
+
+        ordenacao = [inverter(campo) for campo in self.ordenacao] if voltando else self.ordenacao
+        queryset = queryset.order_by(*ordenacao)
+        if posicao is not None:
+            try:
+                queryset = queryset.filter(filtro_apos(ordenacao, posicao))
+            except (ValueError, TypeError, ValidationError):
+                # Valores do cursor que não cabem nos campos (cursor adulterado)
+                raise NotFound(self.mensagem_cursor_invalido)
+
+        # Um item a mais indica se há outra página na mesma direção
+        itens = list(queryset[:self.page_size + 1])
+        ha_mais = len(itens) > self.page_size
+        itens = itens[:self.page_size]
+        if voltando:
+            itens.reverse()
+            self.tem_anterior, self.tem_proxima = ha_mais, True
+        else:
+            self.tem_anterior, self.tem_proxima = posicao is not None, ha_mais
+
+        self.itens = itens
+        return itens
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_next_link(self):
+        if not (self.tem_proxima and self.itens):
+            return None
+        return self.link(self.itens[-1], voltando=False)
+
+    def get_previous_link(self):
+        if not (self.tem_anterior and self.itens):
+            return None
+        return self.link(self.itens[0], voltando=True)
+
+    def link(self, item, voltando):
+        valores = [self.valor(item, campo.lstrip('-')) for campo in self.ordenacao]
+        dados = json.dumps({'v': valores, 'r': voltando}, separators=(',', ':'))
+        cursor = base64.urlsafe_b64encode(dados.encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    @staticmethod
+    def valor(item, campo):
+        valor = getattr(item, campo)
+        # Datas com os microssegundos, para o empate (=) no filtro ser exato
+        return valor.isoformat() if hasattr(valor, 'isoformat') else valor
+
+    def decodificar_cursor(self, request):
+        """(valores da posição, voltando) do cursor da URL; (None, False) na primeira página"""
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None, False
+        try:
+            dados = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            valores, voltando = dados['v'], bool(dados['r'])
+        except (binascii.Error, UnicodeDecodeError, ValueError, TypeError, KeyError):
+            raise NotFound(self.mensagem_cursor_invalido)
+        if not isinstance(valores, list) or len(valores) != len(self.ordenacao):
+            raise NotFound(self.mensagem_cursor_invalido)
+        return valores, voltando
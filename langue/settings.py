@@ -143,7 +143,51 @@ REST_FRAMEWORK = {
     'DEFAULT_RENDERER_CLASSES': [
         'rest_framework.renderers.JSONRenderer',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    # Paginação keyset, sem COUNT nem OFFSET (langue/paginacao.py)
+    'DEFAULT_PAGINATION_CLASS': 'langue.paginacao.PaginacaoPorCursor',
     'PAGE_SIZE': 20
     
-}
\ No newline at end of file
+}
+# Contagem de downloads das publicações (publicacoes/downloads.py): os cliques
+# ficam em memória e são gravados em lote a cada intervalo (segundos) ou quando
+# o buffer atinge o limite de publicações
+DOWNLOADS_INTERVALO_GRAVACAO = 10
+DOWNLOADS_LIMITE_BUFFER = 500
+
+# Configurações de página em cache (langue/configuracoes.py): validade no
+# cache compartilhado e intervalo em que a cópia em memória de cada processo
+# é conferida contra ele (segundos)
+CONFIGURACOES_CACHE_TIMEOUT = 60 * 60
+CONFIGURACOES_CACHE_MEMORIA = 5
+
+# Cache compartilhado entre os processos. Por padrão em arquivos; com
+# CACHE_REDIS_URL definida (redis://localhost:6379/1, por exemplo) usa o
+# Redis, que requer o pacote redis
+CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL')
+if CACHE_REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ.get('CACHE_DIR', os.path.join(BASE_DIR, 'cache')),
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        }
+    }
+
+# Nos testes o cache fica na memória do processo (ver langue/executor_testes.py):
+# os cache.clear() dos testes não apagam o cache compartilhado de um servidor
+TEST_RUNNER = 'langue.executor_testes.ExecutorTestes'
+
+# Páginas em cache com invalidação por geração de modelo
+# (langue/cache_versionado.py), em segundos
+CACHE_PAGINAS_TIMEOUT = 60 * 15
+
+# Cards das listagens em cache ({% cache %}); a chave muda quando o objeto ou
+# os modelos relacionados mudam, então a validade pode ser longa
+CACHE_FRAGMENTOS_TIMEOUT = 60 * 60 * 24
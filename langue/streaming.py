@@ -0,0 +1,90 @@
+"""
+Respostas JSON em streaming
+
+Usado pelos endpoints que devolvem o acervo inteiro (as ações por_ano da
+API). O JSON é escrito aos pedaços enquanto as linhas são lidas do banco com
+iterator(), que usa cursor no servidor no PostgreSQL. Cada bloco de linhas
+recebe o prefetch_related dos relacionamentos e é serializado de uma vez. A
+memória fica limitada a um bloco e o primeiro byte sai antes de a consulta
+terminar.
+
+Os geradores abaixo produzem fragmentos de texto e podem ser combinados:
+
+    grupos = groupby(serializar_em_blocos(queryset, Serializer), key=...)
+    corpo = objeto_json((str(ano), lista_json(valor_json(dados) for _, dados in grupo))
+                        for ano, grupo in grupos)
+    return resposta_json(corpo)
+"""
+import json
+
+from django.http import StreamingHttpResponse
+from rest_framework.utils.encoders import JSONEncoder
+
+
+# Objetos lidos do cursor (e pré-carregados) por vez
+TAMANHO_BLOCO = 500
+
+# Os fragmentos são agrupados até este tamanho antes de ir para a rede
+TAMANHO_ENVIO = 64 * 1024
+
+
+def blocos(queryset, tamanho=TAMANHO_BLOCO):
+    """Lê o queryset do cursor em listas de até `tamanho` objetos"""
+    bloco = []
+    for objeto in queryset.iterator(chunk_size=tamanho):
+        bloco.append(objeto)
+        if len(bloco) == tamanho:
+            yield bloco
+            bloco = []
+    if bloco:
+        yield bloco
+
+
+def serializar_em_blocos(queryset, serializer_class, context=None, tamanho=TAMANHO_BLOCO):
+    """Gera pares (objeto, dados serializados), com um serializer por bloco"""
+    for bloco in blocos(queryset, tamanho):
+        yield from zip(bloco, serializer_class(bloco, many=True, context=context or {}).data)
+
+
+def valor_json(valor):
+    yield json.dumps(valor, cls=JSONEncoder, ensure_ascii=False)
+
+
+def lista_json(elementos):
+    """Lista JSON; cada elemento é um iterável de fragmentos"""
+    yield '['
+    for posicao, elemento in enumerate(elementos):
+        if posicao:
+            yield ','
+        yield from elemento
+    yield ']'
+
+
+def objeto_json(pares):
+    """Objeto JSON; cada par é (chave, iterável de fragmentos do valor)"""
+    yield '{'
+    for posicao, (chave, valor) in enumerate(pares):
+        if posicao:
+            yield ','
+        yield json.dumps(str(chave), ensure_ascii=False)
+        yield ':'
+        yield from valor
+    yield '}'
+
+
+def agrupar_envio(fragmentos, tamanho=TAMANHO_ENVIO):
+    """Junta os fragmentos em pedaços de `tamanho` bytes; o primeiro sai imediatamente"""
+    buffer, acumulado, primeiro = [], 0, True
+    for fragmento in fragmentos:
+        dados = fragmento.encode('utf-8')
+        buffer.append(dados)
+        acumulado += len(dados)
+        if primeiro or acumulado >= tamanho:
+            yield b''.join(buffer)
+            buffer, acumulado, primeiro = [], 0, False
+    if buffer:
+        yield b''.join(buffer)
+
+
+def resposta_json(fragmentos):
+    return StreamingHttpResponse(agrupar_envio(fragmentos), content_type='application/json')
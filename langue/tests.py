@@ -0,0 +1,243 @@
+"""
+Orçamento de consultas SQL por página - LANGUE UFRPE
+
+Carrega um conjunto de dados com volume parecido com o do site e verifica
+que cada URL pública (langue/urls.py) e cada endpoint da API não passa do
+número máximo de consultas definido em ROTAS (benchmarks/rotas.py). Quando
+uma rota estoura o orçamento, a falha lista o SQL executado, o que facilita
+achar o N+1.
+
+Ao criar uma URL nova, acrescente-a em ROTAS: o teste de cobertura falha
+enquanto houver rota sem orçamento.
+
+PlanoConsultasTest confere, com EXPLAIN QUERY PLAN do SQLite, que as
+consultas das listagens (LISTAGENS) usam um índice em vez de ler a tabela
+inteira ou ordenar o resultado em memória.
+"""
+import re
+from unittest import skipUnless
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+
+from benchmarks.rotas import ROTAS
+from galeria.models import Album, Foto
+from langue import configuracoes
+from langue.paginacao import PaginacaoPorCursor, filtro_apos, ordenacao_com_chave
+from linhas_pesquisa.views import EstudanteViewSet, LinhaPesquisaViewSet, PesquisadorViewSet
+from producoes_bibliograficas.agrupamento import AgrupamentoPorAno
+from producoes_bibliograficas.views import AutorViewSet, ProducaoBibliograficaViewSet
+from publicacoes.views import OrganizadorViewSet, PublicacaoPDFViewSet
+from linhas_pesquisa.models import ConfiguracaoPagina, Estudante, LinhaPesquisa, PalavraChave, Pesquisador
+from producoes_bibliograficas.models import Autor, ConfiguracaoPaginaProducoes, ProducaoBibliografica
+from publicacoes import downloads
+from publicacoes.models import ConfiguracaoPaginaPublicacoes, EstatisticasPublicacoes, Organizador, PublicacaoPDF
+
+
+# Rotas que não são páginas públicas do site
+NAMESPACES_IGNORADOS = {'admin', 'rest_framework'}
+
+# Páginas de detalhe cujas views existem mas cujo template ainda não foi
+# criado (nenhuma página do site aponta para elas). Entram em ROTAS quando o
+# template existir.
+ROTAS_SEM_TEMPLATE = {
+    'linhas_pesquisa:linha_pesquisa_detail',
+    'producoes_bibliograficas:producao_detail',
+    'publicacoes:detalhes',
+}
+
+
+def criar_massa_de_dados():
+    """
+    Massa de dados com a proporção do site: várias linhas com equipe,
+    produções com coautores, publicações com organizadores e álbuns com fotos.
+    Retorna os objetos usados nas URLs de detalhe.
+    """
+    ConfiguracaoPagina.objects.create(titulo_pagina="Linhas de Pesquisa")
+    ConfiguracaoPaginaProducoes.objects.create(titulo_pagina="Produções")
+    ConfiguracaoPaginaPublicacoes.objects.create(titulo_pagina="Publicações", ativa=True)
+
+    pesquisadores = Pesquisador.objects.bulk_create([
+        Pesquisador(nome=f"Pesquisadora {numero}", universidade="UFRPE") for numero in range(12)
+    ])
+    niveis = [nivel for nivel, _ in Estudante.NIVEL_CHOICES]
+    estudantes = Estudante.objects.bulk_create([
+        Estudante(nome=f"Estudante {numero}", nivel=niveis[numero % len(niveis)], universidade="UFRPE")
+        for numero in range(24)
+    ])
+    for numero in range(6):
+        linha = LinhaPesquisa.objects.create(
+            titulo=f"Linguagem e sociedade {numero}",
+            objetivo="Estudar a linguagem em seus contextos sociais.",
+            palavras_chave="linguagem; discurso; ensino",
+            setores_aplicacao="Educação",
+            ordem=numero,
+        )
+        linha.pesquisadores.set(pesquisadores[numero * 2:numero * 2 + 4])
+        linha.estudantes.set(estudantes[numero * 4:numero * 4 + 6])
+
+    autores = Autor.objects.bulk_create([Autor(nome=f"Autor {numero}") for numero in range(20)])
+    tipos = [tipo for tipo, _ in ProducaoBibliografica.TIPO_CHOICES]
+    for numero in range(40):
+        producao = ProducaoBibliografica.objects.create(
+            titulo=f"Estudo sobre linguagem {numero}",
+            tipo=tipos[numero % len(tipos)],
+            local_publicacao="Revista de Letras",
+            ano_publicacao=2020 + numero % 5,
+        )
+        producao.autores.set(autores[numero % 17:numero % 17 + 3])
+
+    organizadores = Organizador.objects.bulk_create([
+        Organizador(nome=f"Organizadora {numero}") for numero in range(6)
+    ])
+    for numero in range(15):
+        publicacao = PublicacaoPDF.objects.create(
+            titulo=f"Publicação {numero}",
+            ano_publicacao=2020 + numero % 4,
+            arquivo_pdf=f'publicacoes/pdfs/publicacao{numero}.pdf',
+        )
+        publicacao.organizadores.set(organizadores[numero % 5:numero % 5 + 2])
+    EstatisticasPublicacoes.recalcular()
+
+    for numero in range(4):
+        album = Album.objects.create(title=f"Evento {numero}", cover_image=f'galeria/covers/capa{numero}.jpg')
+        Foto.objects.bulk_create([
+            Foto(album=album, image=f'galeria/photos/evento{numero}_{foto}.jpg') for foto in range(30)
+        ])
+
+    return {
+        'linha': LinhaPesquisa.objects.first(),
+        'producao': ProducaoBibliografica.objects.first(),
+        'autor': autores[0],
+        'publicacao': PublicacaoPDF.objects.first(),
+        'organizador': organizadores[0],
+        'album': Album.objects.first(),
+    }
+
+
+def nomes_das_rotas(padroes=None, namespace=''):
+    """Nomes completos (com namespace) de todas as rotas do projeto"""
+    nomes = set()
+    for padrao in padroes if padroes is not None else get_resolver().url_patterns:
+        if isinstance(padrao, URLResolver):
+            if padrao.namespace in NAMESPACES_IGNORADOS:
+                continue
+            prefixo = f'{namespace}{padrao.namespace}:' if padrao.namespace else namespace
+            nomes |= nomes_das_rotas(padrao.url_patterns, prefixo)
+        elif isinstance(padrao, URLPattern) and padrao.name:
+            nomes.add(f'{namespace}{padrao.name}')
+    return nomes
+
+
+@override_settings(DOWNLOADS_INTERVALO_GRAVACAO=3600)
+class OrcamentoConsultasTest(TestCase):
+    """Número máximo de consultas SQL por URL pública e endpoint da API"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.objetos = criar_massa_de_dados()
+
+    def setUp(self):
+        # Páginas com cache_page precisam ser medidas sem cache
+        cache.clear()
+        configuracoes.limpar()
+        downloads.descarregar()
+        # As configurações de página ficam em cache entre requisições
+        for modelo in (ConfiguracaoPagina, ConfiguracaoPaginaProducoes, ConfiguracaoPaginaPublicacoes):
+            modelo.atual()
+
+    def medir(self, rota):
+        """Faz a requisição da rota e retorna (resposta, consultas executadas)"""
+        url = reverse(rota.nome, args=[self.objetos[nome].pk for nome in rota.args])
+        cabecalhos = {'HTTP_X_REQUESTED_WITH': 'XMLHttpRequest'} if rota.ajax else {}
+        with CaptureQueriesContext(connection) as consultas:
+            resposta = getattr(self.client, rota.metodo)(url, rota.params, **cabecalhos)
+            # Respostas em streaming consultam o banco enquanto são lidas
+            resposta.getvalue()
+        return resposta, consultas
+
+    def test_rotas_dentro_do_orcamento(self):
+        for rota in ROTAS:
+            with self.subTest(rota=rota.nome):
+                resposta, consultas = self.medir(rota)
+                self.assertLess(resposta.status_code, 400, f'{rota.nome} respondeu {resposta.status_code}')
+                if len(consultas) > rota.orcamento:
+                    sql = '\n'.join(
+                        f'  {numero}. {consulta["sql"]}'
+                        for numero, consulta in enumerate(consultas.captured_queries, start=1)
+                    )
+                    self.fail(
+                        f'{rota.nome} executou {len(consultas)} consultas '
+                        f'(orçamento: {rota.orcamento}):\n{sql}'
+                    )
+
+    def test_todas_as_rotas_tem_orcamento(self):
+        sem_orcamento = nomes_das_rotas() - {rota.nome for rota in ROTAS} - ROTAS_SEM_TEMPLATE
+        self.assertFalse(sem_orcamento, f'Rotas sem orçamento de consultas em benchmarks/rotas.py: {sorted(sem_orcamento)}')
+
+
+def pagina_api(queryset, posicao=None):
+    """Consulta de uma página da API (langue/paginacao.py), a primeira ou a seguinte a `posicao`"""
+    ordenacao = ordenacao_com_chave(queryset)
+    queryset = queryset.order_by(*ordenacao)
+    if posicao is not None:
+        queryset = queryset.filter(filtro_apos(ordenacao, posicao))
+    return queryset[:PaginacaoPorCursor.page_size + 1]
+
+
+# Consultas das listagens do site e da API, com os filtros e a ordem que as
+# views usam. Cada uma precisa de um índice (ver os Meta.indexes dos modelos).
+LISTAGENS = {
+    'home: produção mais recente': lambda: ProducaoBibliografica.objects.order_by('-ano_publicacao', '-id')[:1],
+    'home: publicação mais recente': lambda: PublicacaoPDF.objects.order_by('-ano_publicacao', '-id')[:1],
+    'home: álbum mais recente': lambda: Album.objects.order_by('-created_at', '-id')[:1],
+    'produções: índice de anos': lambda: AgrupamentoPorAno(
+        ProducaoBibliografica.objects.filter(ativa=True)
+    ).consulta_indice(),
+    'produções: anos da página': lambda: AgrupamentoPorAno(
+        ProducaoBibliografica.objects.filter(ativa=True)
+    ).producoes([(2024, 1), (2023, 1)]),
+    'produções: API': lambda: pagina_api(ProducaoBibliograficaViewSet.queryset),
+    'produções: API, página seguinte': lambda: pagina_api(
+        ProducaoBibliograficaViewSet.queryset, [2023, 'Estudo', 10]
+    ),
+    'publicações: lista': lambda: PublicacaoPDF.objects.filter(ativa=True).order_by('-ano_publicacao', '-criado_em'),
+    'publicações: lista por categoria': lambda: PublicacaoPDF.objects.filter(
+        ativa=True, categoria='LIVRO'
+    ).order_by('-ano_publicacao', '-criado_em'),
+    'publicações: API': lambda: pagina_api(PublicacaoPDFViewSet.queryset),
+    'publicações: API, página seguinte': lambda: pagina_api(
+        PublicacaoPDFViewSet.queryset, [2023, '2023-05-01T12:00:00+00:00', 10]
+    ),
+    'autores: API': lambda: pagina_api(AutorViewSet.queryset),
+    'organizadores: API': lambda: pagina_api(OrganizadorViewSet.queryset),
+    'linhas: lista': lambda: LinhaPesquisa.objects.filter(ativa=True).order_by('ordem', 'titulo'),
+    'linhas: API': lambda: pagina_api(LinhaPesquisaViewSet.queryset),
+    'linhas: busca por palavra-chave': lambda: LinhaPesquisa.palavras.through.objects.filter(
+        palavrachave__in=PalavraChave.objects.buscar('ling').values('pk')
+    ).values('linhapesquisa_id'),
+    'pesquisadores: API': lambda: pagina_api(PesquisadorViewSet.queryset),
+    'estudantes: API': lambda: pagina_api(EstudanteViewSet.queryset),
+    'galeria: álbuns': lambda: Album.objects.order_by('-event_date'),
+    'galeria: fotos do álbum': lambda: Foto.objects.filter(album_id=1).order_by('uploaded_at', 'id')[:31],
+}
+
+# Linhas do EXPLAIN QUERY PLAN que indicam leitura da tabela inteira ("SCAN
+# tabela", sem "USING INDEX") ou ordenação de todo o resultado em memória
+PLANO_SEM_INDICE = re.compile(r'SCAN \w+$|USE TEMP B-TREE FOR ORDER BY$')
+
+
+@skipUnless(connection.vendor == 'sqlite', 'Os planos conferidos são os do SQLite')
+class PlanoConsultasTest(TestCase):
+    """As listagens usam índices, sem ler a tabela inteira nem ordenar em memória"""
+
+    def test_listagens_usam_indice(self):
+        for nome, consulta in LISTAGENS.items():
+            with self.subTest(listagem=nome):
+                queryset = consulta()
+                plano = queryset.explain()
+                sem_indice = [linha for linha in plano.splitlines() if PLANO_SEM_INDICE.search(linha.strip())]
+                self.assertFalse(sem_indice, f'{nome} sem índice:\n{plano}\n\n{queryset.query}')
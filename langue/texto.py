@@ -0,0 +1,17 @@
+"""
+Normalização de texto comum à busca (search/indice.py) e às palavras-chave
+das linhas de pesquisa
+"""
+import unicodedata
+
+
+def normalizar(texto):
+    """
+    Forma usada para comparar textos: sem acentos, minúsculas e com espaços
+    simples ("Linguística  Aplicada" -> "linguistica aplicada")
+    """
+    sem_acentos = ''.join(
+        caractere for caractere in unicodedata.normalize('NFKD', texto or '')
+        if not unicodedata.combining(caractere)
+    )
+    return ' '.join(sem_acentos.casefold().split())
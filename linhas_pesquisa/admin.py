@@ -1,8 +1,9 @@
 from django.contrib import admin
+from django.db import models
 from django.utils.html import format_html
 from django.urls import reverse
 from django.utils.safestring import mark_safe
-from .models import LinhaPesquisa, Pesquisador, Estudante, ConfiguracaoPagina
+from .models import LinhaPesquisa, Pesquisador, PesquisadorLinha, Estudante, ConfiguracaoPagina, PalavraChave
 
 
 @admin.register(Pesquisador)
@@ -63,7 +64,9 @@ class EstudanteAdmin(admin.ModelAdmin):
 
 
 class PesquisadorInline(admin.TabularInline):
-    model = LinhaPesquisa.pesquisadores.through
+    model = PesquisadorLinha
+    fields = ['pesquisador', 'papel', 'ordem']
+    autocomplete_fields = ['pesquisador']
     extra = 1
     verbose_name = "Pesquisador"
     verbose_name_plural = "Pesquisadores"
@@ -95,7 +98,7 @@ class LinhaPesquisaAdmin(admin.ModelAdmin):
             'fields': ('imagem',)
         }),
         ('Relacionamentos', {
-            'fields': ('pesquisadores', 'estudantes')
+            'fields': ('estudantes',)
         }),
         ('Configurações', {
             'fields': ('ativa', 'ordem'),
@@ -103,17 +106,24 @@ class LinhaPesquisaAdmin(admin.ModelAdmin):
         }),
     )
     
-    filter_horizontal = ['pesquisadores', 'estudantes']
+    filter_horizontal = ['estudantes']
+    inlines = [PesquisadorInline]
     
     readonly_fields = ['data_criacao', 'data_atualizacao']
     
+    def get_queryset(self, request):
+        # Totais anotados na listagem, em vez de dois COUNT por linha
+        return super().get_queryset(request).com_totais()
+    
     def total_pesquisadores(self, obj):
-        return obj.pesquisadores.filter(ativo=True).count()
+        return obj.num_pesquisadores
     total_pesquisadores.short_description = "Pesquisadores"
+    total_pesquisadores.admin_order_field = 'num_pesquisadores'
     
     def total_estudantes(self, obj):
-        return obj.estudantes.filter(ativo=True).count()
+        return obj.num_estudantes
     total_estudantes.short_description = "Estudantes"
+    total_estudantes.admin_order_field = 'num_estudantes'
     
     def get_form(self, request, obj=None, **kwargs):
         form = super().get_form(request, obj, **kwargs)
@@ -137,6 +147,26 @@ class LinhaPesquisaAdmin(admin.ModelAdmin):
             self.message_user(request, f'Linha de pesquisa "{obj.titulo}" criada com sucesso.')
 
 
+@admin.register(PalavraChave)
+class PalavraChaveAdmin(admin.ModelAdmin):
+    """Palavras-chave geradas a partir do campo de texto das linhas"""
+    list_display = ['nome', 'termo', 'total_linhas']
+    search_fields = ['termo', 'nome']
+    readonly_fields = ['termo']
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(total_linhas=models.Count('linhas'))
+    
+    def total_linhas(self, obj):
+        return obj.total_linhas
+    total_linhas.short_description = "Linhas"
+    total_linhas.admin_order_field = 'total_linhas'
+    
+    def has_add_permission(self, request):
+        # Criadas ao salvar uma linha de pesquisa
+        return False
+
+
 @admin.register(ConfiguracaoPagina)
 class ConfiguracaoPaginaAdmin(admin.ModelAdmin):
     list_display = ['titulo_pagina']
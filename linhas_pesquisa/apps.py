@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class LinhasPesquisaConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'linhas_pesquisa'
+
+    def ready(self):
+        """Conecta os signals que descartam a configuração em cache"""
+        import linhas_pesquisa.signals  # noqa: F401
@@ -0,0 +1,78 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def definir_coordenadores(apps, schema_editor):
+    """
+    Mantém o que a página já mostrava: o primeiro pesquisador ativo (por nome)
+    de cada linha é o coordenador, e a ordem segue o nome
+    """
+    PesquisadorLinha = apps.get_model('linhas_pesquisa', 'PesquisadorLinha')
+    participacoes = PesquisadorLinha.objects.order_by(
+        'linhapesquisa_id', '-pesquisador__ativo', 'pesquisador__nome'
+    )
+    alteradas, linha_atual, ordem = [], None, 0
+    for participacao in participacoes.iterator():
+        if participacao.linhapesquisa_id != linha_atual:
+            linha_atual, ordem = participacao.linhapesquisa_id, 0
+            participacao.papel = 'COORDENADOR'
+        participacao.ordem = ordem
+        ordem += 1
+        alteradas.append(participacao)
+    PesquisadorLinha.objects.bulk_update(alteradas, ['papel', 'ordem'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('linhas_pesquisa', '0001_initial'),
+    ]
+
+    operations = [
+        # A tabela do ManyToManyField passa a ser o modelo PesquisadorLinha,
+        # sem recriá-la no banco
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='PesquisadorLinha',
+                    fields=[
+                        ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                        ('linhapesquisa', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='participacoes', to='linhas_pesquisa.linhapesquisa', verbose_name='Linha de Pesquisa')),
+                        ('pesquisador', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='participacoes', to='linhas_pesquisa.pesquisador', verbose_name='Pesquisador')),
+                    ],
+                    options={
+                        'verbose_name': 'Pesquisador da Linha',
+                        'verbose_name_plural': 'Pesquisadores da Linha',
+                        'db_table': 'linhas_pesquisa_linhapesquisa_pesquisadores',
+                        'ordering': ['papel', 'ordem', 'pesquisador__nome'],
+                        'unique_together': {('linhapesquisa', 'pesquisador')},
+                    },
+                ),
+                migrations.AlterField(
+                    model_name='linhapesquisa',
+                    name='pesquisadores',
+                    field=models.ManyToManyField(blank=True, through='linhas_pesquisa.PesquisadorLinha', to='linhas_pesquisa.pesquisador', verbose_name='Pesquisadores Relacionados'),
+                ),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='pesquisadorlinha',
+            name='id',
+            field=models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID'),
+        ),
+        migrations.AddField(
+            model_name='pesquisadorlinha',
+            name='papel',
+            field=models.CharField(choices=[('COORDENADOR', 'Coordenador'), ('MEMBRO', 'Membro')], default='MEMBRO', max_length=20, verbose_name='Papel'),
+        ),
+        migrations.AddField(
+            model_name='pesquisadorlinha',
+            name='ordem',
+            field=models.PositiveIntegerField(default=0, verbose_name='Ordem de Exibição'),
+        ),
+        migrations.AddIndex(
+            model_name='pesquisadorlinha',
+            index=models.Index(fields=['linhapesquisa', 'papel', 'ordem'], name='participacao_linha_papel_idx'),
+        ),
+        migrations.RunPython(definir_coordenadores, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.2 on 2026-10-17 11:09
+
+import unicodedata
+
+from django.db import migrations, models
+
+
+def normalizar_palavra(texto):
+    # Cópia de langue.texto.normalizar
+    sem_acentos = ''.join(
+        caractere for caractere in unicodedata.normalize('NFKD', texto)
+        if not unicodedata.combining(caractere)
+    )
+    return ' '.join(sem_acentos.casefold().split())
+
+
+def preencher_palavras(apps, schema_editor):
+    """Cria as palavras-chave a partir do texto de cada linha"""
+    LinhaPesquisa = apps.get_model('linhas_pesquisa', 'LinhaPesquisa')
+    PalavraChave = apps.get_model('linhas_pesquisa', 'PalavraChave')
+    PalavrasLinha = LinhaPesquisa.palavras.through
+
+    palavras, relacoes = {}, set()
+    for linha_id, texto in LinhaPesquisa.objects.values_list('pk', 'palavras_chave'):
+        for nome in (texto or '').split(';'):
+            termo = normalizar_palavra(nome)
+            if termo:
+                palavras.setdefault(termo, nome.strip()[:200])
+                relacoes.add((linha_id, termo))
+
+    PalavraChave.objects.bulk_create(
+        [PalavraChave(nome=nome, termo=termo) for termo, nome in palavras.items()], batch_size=500
+    )
+    ids = dict(PalavraChave.objects.values_list('termo', 'pk'))
+    PalavrasLinha.objects.bulk_create(
+        [PalavrasLinha(linhapesquisa_id=linha_id, palavrachave_id=ids[termo]) for linha_id, termo in relacoes],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('linhas_pesquisa', '0002_pesquisadorlinha'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PalavraChave',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nome', models.CharField(max_length=200, verbose_name='Palavra-chave')),
+                ('termo', models.CharField(max_length=200, unique=True, verbose_name='Termo normalizado')),
+            ],
+            options={
+                'verbose_name': 'Palavra-chave',
+                'verbose_name_plural': 'Palavras-chave',
+                'ordering': ['termo'],
+            },
+        ),
+        migrations.AddField(
+            model_name='linhapesquisa',
+            name='palavras',
+            field=models.ManyToManyField(blank=True, editable=False, related_name='linhas', to='linhas_pesquisa.palavrachave', verbose_name='Palavras-chave normalizadas'),
+        ),
+        migrations.RunPython(preencher_palavras, migrations.RunPython.noop),
+    ]
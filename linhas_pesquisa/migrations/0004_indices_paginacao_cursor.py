@@ -0,0 +1,25 @@
+# Generated by Django 5.2 on 2026-10-17 11:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('linhas_pesquisa', '0003_palavras_chave'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='estudante',
+            index=models.Index(fields=['nivel', 'nome', 'id'], name='estudante_cursor_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='linhapesquisa',
+            index=models.Index(fields=['ordem', 'titulo', 'id'], name='linha_cursor_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pesquisador',
+            index=models.Index(fields=['nome', 'id'], name='pesquisador_cursor_idx'),
+        ),
+    ]
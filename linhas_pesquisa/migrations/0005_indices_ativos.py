@@ -0,0 +1,37 @@
+# Generated by Django 5.2 on 2026-10-17 11:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('linhas_pesquisa', '0004_indices_paginacao_cursor'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='estudante',
+            name='estudante_cursor_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='linhapesquisa',
+            name='linha_cursor_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='pesquisador',
+            name='pesquisador_cursor_idx',
+        ),
+        migrations.AddIndex(
+            model_name='estudante',
+            index=models.Index(condition=models.Q(('ativo', True)), fields=['nivel', 'nome', 'id'], name='estudante_ativos_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='linhapesquisa',
+            index=models.Index(condition=models.Q(('ativa', True)), fields=['ordem', 'titulo', 'id'], name='linha_ativas_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pesquisador',
+            index=models.Index(condition=models.Q(('ativo', True)), fields=['nome', 'id'], name='pesquisador_ativos_idx'),
+        ),
+    ]
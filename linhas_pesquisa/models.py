@@ -1,6 +1,9 @@
-from django.db import models
+from django.db import connections, models
 from django.urls import reverse
 
+from langue import configuracoes
+from langue.texto import normalizar
+
 
 class Pesquisador(models.Model):
     """Modelo para representar pesquisadores"""
@@ -13,6 +16,10 @@ class Pesquisador(models.Model):
         verbose_name = "Pesquisador"
         verbose_name_plural = "Pesquisadores"
         ordering = ['nome']
+        # Listagens e paginação por cursor da API (langue/paginacao.py): só itens ativos
+        indexes = [
+            models.Index(fields=['nome', 'id'], name='pesquisador_ativos_idx', condition=models.Q(ativo=True)),
+        ]
     
     def __str__(self):
         return f"{self.nome} ({self.universidade})"
@@ -38,11 +45,120 @@ class Estudante(models.Model):
         verbose_name = "Estudante"
         verbose_name_plural = "Estudantes"
         ordering = ['nivel', 'nome']
+        # Listagens e paginação por cursor da API (langue/paginacao.py): só itens ativos
+        indexes = [
+            models.Index(
+                fields=['nivel', 'nome', 'id'], name='estudante_ativos_idx', condition=models.Q(ativo=True),
+            ),
+        ]
     
     def __str__(self):
         return f"{self.nome} - {self.get_nivel_display()} ({self.universidade})"
 
 
+class PalavraChaveQuerySet(models.QuerySet):
+    def buscar(self, texto):
+        """Palavras cujo termo começa com `texto`, pelo índice do termo normalizado"""
+        prefixo = normalizar(texto)
+        if connections[self.db].vendor == 'sqlite':
+            # O LIKE do SQLite não usa o índice. O intervalo depende da ordem
+            # por código dos caracteres, que é a da collation BINARY do SQLite
+            # (no PostgreSQL só valeria com a collation "C")
+            return self.filter(termo__gte=prefixo, termo__lt=prefixo + '\uffff')
+        return self.filter(termo__startswith=prefixo)
+    
+    def com_contagem(self):
+        """Palavras usadas por linhas ativas, anotadas com `total_linhas`, das mais usadas às menos"""
+        return self.annotate(
+            total_linhas=models.Count('linhas', filter=models.Q(linhas__ativa=True))
+        ).filter(total_linhas__gt=0).order_by('-total_linhas', 'termo')
+
+
+class PalavraChave(models.Model):
+    """Palavra-chave das linhas de pesquisa, uma linha por termo normalizado"""
+    nome = models.CharField(max_length=200, verbose_name="Palavra-chave")
+    termo = models.CharField(max_length=200, unique=True, verbose_name="Termo normalizado")
+    
+    objects = PalavraChaveQuerySet.as_manager()
+    
+    class Meta:
+        verbose_name = "Palavra-chave"
+        verbose_name_plural = "Palavras-chave"
+        ordering = ['termo']
+    
+    def __str__(self):
+        return self.nome
+    
+    @classmethod
+    def obter_ou_criar(cls, nomes):
+        """Palavras-chave de `nomes`, criando as que ainda não existem"""
+        por_termo = {}
+        for nome in nomes:
+            termo = normalizar(nome)
+            if termo:
+                por_termo.setdefault(termo, nome.strip()[:200])
+        existentes = set(cls.objects.filter(termo__in=por_termo).values_list('termo', flat=True))
+        cls.objects.bulk_create(
+            [cls(nome=nome, termo=termo) for termo, nome in por_termo.items() if termo not in existentes],
+            ignore_conflicts=True,
+        )
+        return list(cls.objects.filter(termo__in=por_termo))
+
+
+class LinhaPesquisaQuerySet(models.QuerySet):
+    def buscar(self, texto):
+        """
+        Linhas com `texto` no título, objetivo ou setores de aplicação, ou com
+        uma palavra-chave que começa com `texto` sem considerar acentos
+        (consulta no índice de termos)
+        """
+        return self.filter(
+            models.Q(titulo__icontains=texto) |
+            models.Q(objetivo__icontains=texto) |
+            models.Q(setores_aplicacao__icontains=texto) |
+            models.Q(palavras__in=PalavraChave.objects.buscar(texto))
+        ).distinct()
+    
+    def com_palavra_chave(self, texto):
+        """Linhas que têm a palavra-chave `texto` (comparada pelo termo normalizado)"""
+        return self.filter(palavras__termo=normalizar(texto))
+    
+    def com_totais(self):
+        """
+        Anota `num_pesquisadores` e `num_estudantes` (ativos) em cada linha,
+        com uma única consulta
+        """
+        return self.annotate(
+            num_pesquisadores=models.Count(
+                'pesquisadores', filter=models.Q(pesquisadores__ativo=True), distinct=True
+            ),
+            num_estudantes=models.Count(
+                'estudantes', filter=models.Q(estudantes__ativo=True), distinct=True
+            ),
+        )
+    
+    def com_equipe(self):
+        """
+        Pré-carrega a equipe ativa de cada linha em `participacoes_ativas`
+        (pesquisadores com papel e ordem) e `estudantes_ativos`, com duas
+        consultas para o queryset inteiro
+        """
+        return self.prefetch_related(
+            models.Prefetch(
+                'participacoes',
+                queryset=PesquisadorLinha.objects.filter(
+                    pesquisador__ativo=True
+                ).select_related('pesquisador'),
+                to_attr='participacoes_ativas',
+            ),
+            models.Prefetch(
+                'estudantes',
+                queryset=Estudante.objects.filter(ativo=True),
+                to_attr='estudantes_ativos',
+            ),
+        )
+
+
 class LinhaPesquisa(models.Model):
     """Modelo para representar linhas de pesquisa"""
     titulo = models.CharField(max_length=300, verbose_name="Título da Linha de Pesquisa")
@@ -56,11 +172,16 @@ class LinhaPesquisa(models.Model):
     
     # Relacionamentos
     pesquisadores = models.ManyToManyField(Pesquisador, 
+                                         through='PesquisadorLinha',
                                          verbose_name="Pesquisadores Relacionados",
                                          blank=True)
     estudantes = models.ManyToManyField(Estudante, 
                                        verbose_name="Estudantes Relacionados",
                                        blank=True)
+    # Preenchido a partir de palavras_chave ao salvar (signals.py)
+    palavras = models.ManyToManyField(PalavraChave, related_name='linhas',
+                                      verbose_name="Palavras-chave normalizadas",
+                                      blank=True, editable=False)
     
     # Campos de controle
     ativa = models.BooleanField(default=True, verbose_name="Linha Ativa")
@@ -69,10 +190,18 @@ class LinhaPesquisa(models.Model):
     data_criacao = models.DateTimeField(auto_now_add=True, verbose_name="Data de Criação")
     data_atualizacao = models.DateTimeField(auto_now=True, verbose_name="Última Atualização")
     
+    objects = LinhaPesquisaQuerySet.as_manager()
+    
     class Meta:
         verbose_name = "Linha de Pesquisa"
         verbose_name_plural = "Linhas de Pesquisa"
         ordering = ['ordem', 'titulo']
+        # Listagens e paginação por cursor da API (langue/paginacao.py): só itens ativos
+        indexes = [
+            models.Index(
+                fields=['ordem', 'titulo', 'id'], name='linha_ativas_idx', condition=models.Q(ativa=True),
+            ),
+        ]
     
     def __str__(self):
         return self.titulo
@@ -86,23 +215,49 @@ class LinhaPesquisa(models.Model):
             return [palavra.strip() for palavra in self.palavras_chave.split(';') if palavra.strip()]
         return []
     
+    def sincronizar_palavras_chave(self):
+        """Atualiza a relação `palavras` com o texto de palavras_chave"""
+        self.palavras.set(PalavraChave.obter_ou_criar(self.get_palavras_chave_list()))
+    
+    def get_participacoes_ativas(self):
+        """
+        Participações dos pesquisadores ativos, coordenadores primeiro; usa o
+        pré-carregamento de com_equipe() se houver
+        """
+        if not hasattr(self, 'participacoes_ativas'):
+            self.participacoes_ativas = list(
+                self.participacoes.filter(pesquisador__ativo=True).select_related('pesquisador')
+            )
+        return self.participacoes_ativas
+    
+    def get_pesquisadores_ativos(self):
+        """Pesquisadores ativos, coordenadores primeiro"""
+        return [participacao.pesquisador for participacao in self.get_participacoes_ativas()]
+    
+    def get_estudantes_ativos(self):
+        """Estudantes ativos; usa o pré-carregamento de com_equipe() se houver"""
+        if not hasattr(self, 'estudantes_ativos'):
+            self.estudantes_ativos = list(self.estudantes.filter(ativo=True))
+        return self.estudantes_ativos
+    
     def get_pesquisadores_coordenadores(self):
-        """Retorna pesquisadores que são coordenadores"""
-        # Assumindo que coordenadores são identificados por algum critério
-        # Por simplicidade, vamos considerar que o primeiro pesquisador é o coordenador
-        return self.pesquisadores.filter(ativo=True).first()
+        """Retorna o coordenador da linha (o primeiro, se houver mais de um)"""
+        for participacao in self.get_participacoes_ativas():
+            if participacao.e_coordenador:
+                return participacao.pesquisador
+        return None
     
     def get_pesquisadores_nao_coordenadores(self):
         """Retorna pesquisadores que não são coordenadores"""
-        coordenador = self.get_pesquisadores_coordenadores()
-        if coordenador:
-            return self.pesquisadores.filter(ativo=True).exclude(pk=coordenador.pk)
-        return self.pesquisadores.filter(ativo=True)
+        return [
+            participacao.pesquisador for participacao in self.get_participacoes_ativas()
+            if not participacao.e_coordenador
+        ]
     
     def get_estudantes_por_nivel(self):
         """Retorna estudantes agrupados por nível"""
         estudantes_dict = {}
-        for estudante in self.estudantes.filter(ativo=True):
+        for estudante in self.get_estudantes_ativos():
             nivel = estudante.get_nivel_display()
             if nivel not in estudantes_dict:
                 estudantes_dict[nivel] = []
@@ -110,6 +265,45 @@ class LinhaPesquisa(models.Model):
         return estudantes_dict
 
 
+class PesquisadorLinha(models.Model):
+    """Participação de um pesquisador numa linha de pesquisa"""
+    COORDENADOR = 'COORDENADOR'
+    MEMBRO = 'MEMBRO'
+    # Em ordem alfabética os coordenadores vêm antes dos membros
+    PAPEL_CHOICES = [
+        (COORDENADOR, 'Coordenador'),
+        (MEMBRO, 'Membro'),
+    ]
+    
+    linhapesquisa = models.ForeignKey(LinhaPesquisa, on_delete=models.CASCADE,
+                                      related_name='participacoes',
+                                      verbose_name="Linha de Pesquisa")
+    pesquisador = models.ForeignKey(Pesquisador, on_delete=models.CASCADE,
+                                    related_name='participacoes',
+                                    verbose_name="Pesquisador")
+    papel = models.CharField(max_length=20, choices=PAPEL_CHOICES, default=MEMBRO,
+                             verbose_name="Papel")
+    ordem = models.PositiveIntegerField(default=0, verbose_name="Ordem de Exibição")
+    
+    class Meta:
+        # Tabela criada pelo ManyToManyField antes de existir este modelo
+        db_table = 'linhas_pesquisa_linhapesquisa_pesquisadores'
+        verbose_name = "Pesquisador da Linha"
+        verbose_name_plural = "Pesquisadores da Linha"
+        ordering = ['papel', 'ordem', 'pesquisador__nome']
+        unique_together = [('linhapesquisa', 'pesquisador')]
+        indexes = [
+            models.Index(fields=['linhapesquisa', 'papel', 'ordem'], name='participacao_linha_papel_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.pesquisador} - {self.get_papel_display()} ({self.linhapesquisa})"
+    
+    @property
+    def e_coordenador(self):
+        return self.papel == self.COORDENADOR
+
+
 class ConfiguracaoPagina(models.Model):
     """Modelo para configurações gerais da página de linhas de pesquisa"""
     titulo_pagina = models.CharField(max_length=200, default="Linhas de Pesquisa", 
@@ -132,4 +326,9 @@ class ConfiguracaoPagina(models.Model):
         if not self.pk and ConfiguracaoPagina.objects.exists():
             raise ValueError('Só pode existir uma configuração de página')
         return super().save(*args, **kwargs)
+    
+    @classmethod
+    def atual(cls):
+        """Configuração da página, lida do cache (langue/configuracoes.py)"""
+        return configuracoes.obter(cls, cls.objects.first)
 
@@ -49,8 +49,9 @@ class EstudanteSerializer(serializers.ModelSerializer):
 
 class LinhaPesquisaSerializer(serializers.ModelSerializer):
     """Serializer para o modelo LinhaPesquisa"""
-    pesquisadores = PesquisadorSerializer(many=True, read_only=True)
-    estudantes = EstudanteSerializer(many=True, read_only=True)
+    # Equipe ativa, pré-carregada por LinhaPesquisa.objects.com_equipe()
+    pesquisadores = PesquisadorSerializer(source='get_pesquisadores_ativos', many=True, read_only=True)
+    estudantes = EstudanteSerializer(source='get_estudantes_ativos', many=True, read_only=True)
     palavras_chave_list = serializers.SerializerMethodField()
     total_pesquisadores = serializers.SerializerMethodField()
     total_estudantes = serializers.SerializerMethodField()
@@ -74,11 +75,16 @@ class LinhaPesquisaSerializer(serializers.ModelSerializer):
     
     def get_total_pesquisadores(self, obj):
         """Retorna total de pesquisadores ativos"""
-        return obj.pesquisadores.filter(ativo=True).count()
+        # Anotado por com_totais(); sem a anotação, usa a equipe (pré-carregada ou não)
+        if hasattr(obj, 'num_pesquisadores'):
+            return obj.num_pesquisadores
+        return len(obj.get_pesquisadores_ativos())
     
     def get_total_estudantes(self, obj):
         """Retorna total de estudantes ativos"""
-        return obj.estudantes.filter(ativo=True).count()
+        if hasattr(obj, 'num_estudantes'):
+            return obj.num_estudantes
+        return len(obj.get_estudantes_ativos())
     
     def get_coordenador(self, obj):
         """Retorna o coordenador da linha de pesquisa"""
@@ -0,0 +1,53 @@
+"""
+Signals que mantêm as palavras-chave normalizadas, descartam a configuração
+da página em cache e passam os modelos da página de linhas de pesquisa para
+uma nova geração de cache
+"""
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from langue import configuracoes, cache_versionado
+from .models import ConfiguracaoPagina, LinhaPesquisa, Pesquisador, PesquisadorLinha, Estudante, PalavraChave
+
+
+@receiver(post_save, sender=LinhaPesquisa)
+def sincronizar_palavras_chave(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Refaz a relação com PalavraChave quando o texto das palavras-chave pode ter mudado"""
+    if raw:
+        return
+    if update_fields is not None and 'palavras_chave' not in update_fields:
+        return
+    instance.sincronizar_palavras_chave()
+
+
+@receiver(post_save, sender=ConfiguracaoPagina)
+@receiver(post_delete, sender=ConfiguracaoPagina)
+def invalidar_configuracao(sender, **kwargs):
+    """A próxima leitura de ConfiguracaoPagina.atual() vai ao banco"""
+    configuracoes.invalidar(sender)
+
+
+@receiver(post_save, sender=ConfiguracaoPagina)
+@receiver(post_delete, sender=ConfiguracaoPagina)
+@receiver(post_save, sender=LinhaPesquisa)
+@receiver(post_delete, sender=LinhaPesquisa)
+@receiver(post_save, sender=Pesquisador)
+@receiver(post_delete, sender=Pesquisador)
+@receiver(post_save, sender=Estudante)
+@receiver(post_delete, sender=Estudante)
+@receiver(post_save, sender=PesquisadorLinha)
+@receiver(post_delete, sender=PesquisadorLinha)
+@receiver(post_save, sender=PalavraChave)
+@receiver(post_delete, sender=PalavraChave)
+def nova_geracao(sender, **kwargs):
+    """As páginas em cache que dependem do modelo são refeitas"""
+    cache_versionado.nova_geracao(sender)
+
+
+@receiver(m2m_changed, sender=LinhaPesquisa.pesquisadores.through)
+@receiver(m2m_changed, sender=LinhaPesquisa.estudantes.through)
+@receiver(m2m_changed, sender=LinhaPesquisa.palavras.through)
+def nova_geracao_relacionamentos(sender, action, **kwargs):
+    """Pesquisadores, estudantes e palavras-chave adicionados ou removidos de uma linha"""
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        cache_versionado.nova_geracao(sender)
@@ -1,3 +1,133 @@
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
 
-# Create your tests here.
+from langue import cache_versionado
+from .models import LinhaPesquisa, PalavraChave, Pesquisador, PesquisadorLinha
+
+
+class CacheVersionadoTest(TestCase):
+    """A página de linhas de pesquisa fica em cache até uma alteração nos modelos"""
+
+    def setUp(self):
+        cache.clear()
+        self.linha = LinhaPesquisa.objects.create(
+            titulo="Ensino de Línguas", objetivo="Estudar o ensino de línguas",
+            palavras_chave="ensino; línguas", setores_aplicacao="Educação", ordem=1
+        )
+
+    def test_pagina_em_cache(self):
+        url = reverse('linhas_pesquisa:linhas_pesquisa')
+        self.assertContains(self.client.get(url), "Ensino de Línguas")
+        with self.assertNumQueries(0):
+            self.assertContains(self.client.get(url), "Ensino de Línguas")
+
+    def test_alteracao_gera_nova_geracao(self):
+        url = reverse('linhas_pesquisa:linhas_pesquisa')
+        self.client.get(url)
+
+        self.linha.titulo = "Linguística Aplicada"
+        self.linha.save()
+        self.assertContains(self.client.get(url), "Linguística Aplicada")
+
+        pesquisador = Pesquisador.objects.create(nome="Ana Lima", universidade="UFRPE")
+        relacionamento = LinhaPesquisa.pesquisadores.through
+        geracao = cache_versionado.geracao(relacionamento)
+        self.linha.pesquisadores.add(pesquisador)
+        self.assertNotEqual(cache_versionado.geracao(relacionamento), geracao)
+        self.assertContains(self.client.get(url), "Ana Lima")
+
+    def test_geracao_recriada_apos_limpar(self):
+        geracao = cache_versionado.geracao(LinhaPesquisa, Pesquisador)
+        self.assertEqual(cache_versionado.geracao(LinhaPesquisa, Pesquisador), geracao)
+        cache.clear()
+        self.assertNotEqual(cache_versionado.geracao(LinhaPesquisa, Pesquisador), geracao)
+
+
+class EquipePreCarregadaTest(TestCase):
+    """Os métodos de equipe usam o pré-carregamento de com_equipe()"""
+
+    def setUp(self):
+        for numero in range(3):
+            linha = LinhaPesquisa.objects.create(
+                titulo=f"Linha {numero}", objetivo="Objetivo", palavras_chave="a; b",
+                setores_aplicacao="Educação", ordem=numero
+            )
+            linha.pesquisadores.create(nome=f"Carla {numero}", universidade="UFPE")
+            linha.pesquisadores.create(nome=f"Bruno {numero}", universidade="UFRPE", ativo=False)
+            linha.pesquisadores.create(
+                nome=f"Davi {numero}", universidade="UFRPE",
+                through_defaults={'papel': PesquisadorLinha.COORDENADOR}
+            )
+            linha.estudantes.create(nome=f"Elis {numero}", nivel='MESTRADO', universidade="UFRPE")
+            linha.estudantes.create(nome=f"Eva {numero}", nivel='DOUTORADO', universidade="UFRPE", ativo=False)
+
+    def test_metodos_sem_consultas_extras(self):
+        with self.assertNumQueries(3):
+            linhas = list(LinhaPesquisa.objects.com_equipe())
+            for linha in linhas:
+                coordenador = linha.get_pesquisadores_coordenadores()
+                outros = linha.get_pesquisadores_nao_coordenadores()
+                por_nivel = linha.get_estudantes_por_nivel()
+
+        self.assertEqual(coordenador.nome, "Davi 2")
+        self.assertEqual([p.nome for p in outros], ["Carla 2"])
+        self.assertEqual(list(por_nivel), ["Mestrado"])
+
+    def test_metodos_sem_pre_carregamento(self):
+        linha = LinhaPesquisa.objects.get(titulo="Linha 0")
+        # Coordenadores primeiro, depois os membros
+        self.assertEqual([p.nome for p in linha.get_pesquisadores_ativos()], ["Davi 0", "Carla 0"])
+        self.assertEqual(len(linha.get_estudantes_ativos()), 1)
+
+
+class PalavraChaveTest(TestCase):
+    """Palavras-chave normalizadas a partir do texto de cada linha"""
+
+    def setUp(self):
+        cache.clear()
+        self.linha = LinhaPesquisa.objects.create(
+            titulo="Ensino de Línguas", objetivo="Objetivo", setores_aplicacao="Educação",
+            palavras_chave="Ensino; Línguas;  ensino ; Gênero"
+        )
+        LinhaPesquisa.objects.create(
+            titulo="Literatura", objetivo="Objetivo", setores_aplicacao="Cultura",
+            palavras_chave="Crítica literária; LINGUAS"
+        )
+
+    def test_termos_normalizados(self):
+        self.assertEqual(
+            sorted(self.linha.palavras.values_list('termo', flat=True)), ['ensino', 'genero', 'linguas']
+        )
+        self.assertEqual(PalavraChave.objects.get(termo='linguas').nome, "Línguas")
+
+        self.linha.palavras_chave = "Gênero"
+        self.linha.save()
+        self.assertEqual(list(self.linha.palavras.values_list('termo', flat=True)), ['genero'])
+
+    def test_facetas_e_busca(self):
+        facetas = PalavraChave.objects.com_contagem()
+        self.assertEqual([(p.termo, p.total_linhas) for p in facetas][:1], [('linguas', 2)])
+        self.assertEqual(LinhaPesquisa.objects.com_palavra_chave("línguas").count(), 2)
+        self.assertEqual(list(LinhaPesquisa.objects.buscar("crít")), [LinhaPesquisa.objects.get(titulo="Literatura")])
+        # Prefixo do termo sem acento, com espaços a mais
+        self.assertEqual(LinhaPesquisa.objects.buscar("genero").get(), self.linha)
+        self.assertEqual(LinhaPesquisa.objects.buscar("Critica  lit").get().titulo, "Literatura")
+        self.assertEqual(list(PalavraChave.objects.buscar("LIN").values_list('termo', flat=True)), ['linguas'])
+
+    def test_edicao_da_palavra_chave_gera_nova_geracao(self):
+        palavra = PalavraChave.objects.get(termo='genero')
+        geracao = cache_versionado.geracao(PalavraChave)
+        palavra.nome = "Gênero e sexualidade"
+        palavra.save()
+        self.assertNotEqual(cache_versionado.geracao(PalavraChave), geracao)
+
+        geracao = cache_versionado.geracao(PalavraChave)
+        palavra.delete()
+        self.assertNotEqual(cache_versionado.geracao(PalavraChave), geracao)
+
+    def test_filtro_na_pagina(self):
+        response = self.client.get(reverse('linhas_pesquisa:linhas_pesquisa'), {'palavra': 'Gênero'})
+        self.assertContains(response, "Ensino de Línguas")
+        self.assertNotContains(response, '<h2 class="linha-pesquisa-title">Literatura</h2>')
+        self.assertContains(response, 'Gênero <span class="palavra-chave-total">(1)</span>')
@@ -1,12 +1,22 @@
 from django.shortcuts import render, get_object_or_404
 from django.http import JsonResponse
 from django.core.paginator import Paginator
-from django.db.models import Q
+from django.db import models
 from django.views.generic import ListView, DetailView
-from django.views.decorators.cache import cache_page
 from django.utils.decorators import method_decorator
 from django.contrib import messages
-from .models import LinhaPesquisa, Pesquisador, Estudante, ConfiguracaoPagina
+from .models import LinhaPesquisa, Pesquisador, Estudante, ConfiguracaoPagina, PalavraChave
+from langue.cache_versionado import cache_por_modelos, contexto_fragmentos
+from langue.texto import normalizar
+
+
+# Palavras-chave listadas como filtro na página
+LIMITE_PALAVRAS_CHAVE = 20
+
+# Modelos exibidos nos cards das linhas, além da própria linha
+MODELOS_CARDS = (
+    Pesquisador, Estudante, LinhaPesquisa.pesquisadores.through, LinhaPesquisa.estudantes.through,
+)
 
 
 class LinhasPesquisaListView(ListView):
@@ -18,19 +28,19 @@ class LinhasPesquisaListView(ListView):
     
     def get_queryset(self):
         """Retorna apenas linhas de pesquisa ativas, ordenadas"""
-        queryset = LinhaPesquisa.objects.filter(ativa=True).prefetch_related(
-            'pesquisadores', 'estudantes'
-        ).order_by('ordem', 'titulo')
+        queryset = LinhaPesquisa.objects.filter(ativa=True).com_equipe().order_by(
+            'ordem', 'titulo'
+        )
         
         # Filtro de busca
         search_query = self.request.GET.get('search')
         if search_query:
-            queryset = queryset.filter(
-                Q(titulo__icontains=search_query) |
-                Q(objetivo__icontains=search_query) |
-                Q(palavras_chave__icontains=search_query) |
-                Q(setores_aplicacao__icontains=search_query)
-            )
+            queryset = queryset.buscar(search_query)
+        
+        # Filtro por palavra-chave
+        palavra = self.request.GET.get('palavra')
+        if palavra:
+            queryset = queryset.com_palavra_chave(palavra)
         
         return queryset
     
@@ -39,10 +49,7 @@ class LinhasPesquisaListView(ListView):
         context = super().get_context_data(**kwargs)
         
         # Configuração da página
-        try:
-            context['configuracao'] = ConfiguracaoPagina.objects.first()
-        except ConfiguracaoPagina.DoesNotExist:
-            context['configuracao'] = None
+        context['configuracao'] = ConfiguracaoPagina.atual()
         
         # Estatísticas
         context['total_linhas'] = LinhaPesquisa.objects.filter(ativa=True).count()
@@ -52,6 +59,13 @@ class LinhasPesquisaListView(ListView):
         # Query de busca para manter no formulário
         context['search_query'] = self.request.GET.get('search', '')
         
+        # Palavras-chave mais usadas, para filtrar a listagem
+        context['palavras_chave'] = PalavraChave.objects.com_contagem()[:LIMITE_PALAVRAS_CHAVE]
+        context['palavra_filter'] = normalizar(self.request.GET.get('palavra', ''))
+        
+        # Chave dos cards em cache
+        context.update(contexto_fragmentos(*MODELOS_CARDS))
+        
         return context
 
 
@@ -63,19 +77,14 @@ class LinhaPesquisaDetailView(DetailView):
     
     def get_queryset(self):
         """Retorna apenas linhas de pesquisa ativas"""
-        return LinhaPesquisa.objects.filter(ativa=True).prefetch_related(
-            'pesquisadores', 'estudantes'
-        )
+        return LinhaPesquisa.objects.filter(ativa=True).com_equipe()
     
     def get_context_data(self, **kwargs):
         """Adiciona contexto extra para o template"""
         context = super().get_context_data(**kwargs)
         
         # Configuração da página
-        try:
-            context['configuracao'] = ConfiguracaoPagina.objects.first()
-        except ConfiguracaoPagina.DoesNotExist:
-            context['configuracao'] = None
+        context['configuracao'] = ConfiguracaoPagina.atual()
         
         # Linhas relacionadas (outras linhas)
         context['outras_linhas'] = LinhaPesquisa.objects.filter(
@@ -85,30 +94,28 @@ class LinhaPesquisaDetailView(DetailView):
         return context
 
 
-@cache_page(60 * 15)  # Cache por 15 minutos
+@cache_por_modelos(
+    LinhaPesquisa, ConfiguracaoPagina, PalavraChave, LinhaPesquisa.palavras.through, *MODELOS_CARDS
+)
 def linhas_pesquisa_view(request):
     """View baseada em função para linhas de pesquisa"""
     # Buscar configuração da página
-    try:
-        configuracao = ConfiguracaoPagina.objects.first()
-    except ConfiguracaoPagina.DoesNotExist:
-        configuracao = None
+    configuracao = ConfiguracaoPagina.atual()
     
     # Buscar linhas de pesquisa ativas
-    linhas_pesquisa = LinhaPesquisa.objects.filter(ativa=True).prefetch_related(
-        'pesquisadores',
-        'estudantes'
-    ).order_by('ordem', 'titulo')
+    linhas_pesquisa = LinhaPesquisa.objects.filter(ativa=True).com_equipe().order_by(
+        'ordem', 'titulo'
+    )
     
     # Filtro de busca
     search_query = request.GET.get('search')
     if search_query:
-        linhas_pesquisa = linhas_pesquisa.filter(
-            Q(titulo__icontains=search_query) |
-            Q(objetivo__icontains=search_query) |
-            Q(palavras_chave__icontains=search_query) |
-            Q(setores_aplicacao__icontains=search_query)
-        )
+        linhas_pesquisa = linhas_pesquisa.buscar(search_query)
+    
+    # Filtro por palavra-chave
+    palavra = request.GET.get('palavra')
+    if palavra:
+        linhas_pesquisa = linhas_pesquisa.com_palavra_chave(palavra)
     
     # Paginação
     paginator = Paginator(linhas_pesquisa, 5)  # 5 linhas por página
@@ -128,6 +135,9 @@ def linhas_pesquisa_view(request):
         'page_obj': page_obj,
         'search_query': search_query or '',
         'estatisticas': estatisticas,
+        'palavras_chave': PalavraChave.objects.com_contagem()[:LIMITE_PALAVRAS_CHAVE],
+        'palavra_filter': normalizar(palavra or ''),
+        **contexto_fragmentos(*MODELOS_CARDS),
     }
     
     return render(request, 'linhas_pesquisa/linhas_pesquisa.html', context)
@@ -136,16 +146,13 @@ def linhas_pesquisa_view(request):
 def linha_pesquisa_detail_view(request, pk):
     """View para detalhes de uma linha de pesquisa específica"""
     linha_pesquisa = get_object_or_404(
-        LinhaPesquisa.objects.prefetch_related('pesquisadores', 'estudantes'),
+        LinhaPesquisa.objects.com_equipe(),
         pk=pk,
         ativa=True
     )
     
     # Buscar configuração da página
-    try:
-        configuracao = ConfiguracaoPagina.objects.first()
-    except ConfiguracaoPagina.DoesNotExist:
-        configuracao = None
+    configuracao = ConfiguracaoPagina.atual()
     
     # Outras linhas de pesquisa
     outras_linhas = LinhaPesquisa.objects.filter(
@@ -244,7 +251,7 @@ from .serializers import LinhaPesquisaSerializer, PesquisadorSerializer, Estudan
 
 class LinhaPesquisaViewSet(viewsets.ReadOnlyModelViewSet):
     """ViewSet para API REST das linhas de pesquisa"""
-    queryset = LinhaPesquisa.objects.filter(ativa=True).order_by('ordem', 'titulo')
+    queryset = LinhaPesquisa.objects.filter(ativa=True).com_equipe().order_by('ordem', 'titulo')
     serializer_class = LinhaPesquisaSerializer
     permission_classes = [permissions.AllowAny]
     
@@ -254,14 +261,20 @@ class LinhaPesquisaViewSet(viewsets.ReadOnlyModelViewSet):
         # Filtros
         search = self.request.query_params.get('search')
         if search:
-            queryset = queryset.filter(
-                Q(titulo__icontains=search) |
-                Q(objetivo__icontains=search) |
-                Q(palavras_chave__icontains=search)
-            )
+            queryset = queryset.buscar(search)
+        
+        palavra = self.request.query_params.get('palavra')
+        if palavra:
+            queryset = queryset.com_palavra_chave(palavra)
         
         return queryset
     
+    @action(detail=False, methods=['get'])
+    def palavras_chave(self, request):
+        """Palavras-chave das linhas ativas com o número de linhas de cada uma"""
+        palavras = PalavraChave.objects.com_contagem().values('nome', 'termo', 'total_linhas')
+        return Response(list(palavras))
+    
     @action(detail=True, methods=['get'])
     def pesquisadores(self, request, pk=None):
         """Endpoint para pesquisadores de uma linha específica"""
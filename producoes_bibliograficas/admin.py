@@ -26,9 +26,14 @@ class AutorAdmin(admin.ModelAdmin):
         return "Não informado"
     lattes_link_display.short_description = "Currículo Lattes"
     
+    def get_queryset(self, request):
+        # Total de produções anotado na listagem, em vez de um COUNT por linha
+        return super().get_queryset(request).com_total_producoes()
+    
     def total_producoes(self, obj):
-        return obj.producoes.filter(ativa=True).count()
+        return obj.num_producoes
     total_producoes.short_description = "Total de Produções"
+    total_producoes.admin_order_field = 'num_producoes'
 
 
 class AutorInline(admin.TabularInline):
@@ -69,12 +74,12 @@ class ProducaoBibliograficaAdmin(admin.ModelAdmin):
     titulo_resumido.short_description = "Título"
     
     def get_autores_display(self, obj):
-        autores = obj.autores.all()[:3]  # Mostrar apenas os 3 primeiros
-        nomes = [a.nome for a in autores]
-        if obj.autores.count() > 3:
-            nomes.append(f"... (+{obj.autores.count() - 3})")
-        return "; ".join(nomes)
+        nomes = obj.autores_nomes.split("; ")
+        if len(nomes) > 3:  # Mostrar apenas os 3 primeiros
+            return "; ".join(nomes[:3] + [f"... (+{len(nomes) - 3})"])
+        return obj.autores_nomes
     get_autores_display.short_description = "Autores"
+    get_autores_display.admin_order_field = 'autores_nomes'
     
     def get_form(self, request, obj=None, **kwargs):
         form = super().get_form(request, obj, **kwargs)
@@ -0,0 +1,145 @@
+"""
+Listagem de produções agrupada por ano
+
+O índice de anos (ano -> total de produções) vem de uma única consulta
+agregada e define as páginas, sempre com anos inteiros. As produções dos anos
+de uma página são lidas de um só cursor, em blocos, e entregues seção por
+seção; nenhuma view precisa montar um dicionário com o catálogo inteiro.
+"""
+from collections import namedtuple
+from functools import cached_property
+from itertools import groupby
+from operator import attrgetter
+
+from django.db.models import Count
+
+
+# Máximo de produções por página; um ano com mais produções que isso ocupa
+# uma página sozinho
+LIMITE_POR_PAGINA = 500
+
+# Linhas lidas do cursor (e autores pré-carregados) por vez
+TAMANHO_BLOCO = 500
+
+SecaoAno = namedtuple('SecaoAno', ['ano', 'total', 'producoes'])
+
+
+class AgrupamentoPorAno:
+    """
+    Produções de um queryset agrupadas por ano, do mais recente ao mais antigo.
+
+    Uso:
+        agrupamento = AgrupamentoPorAno(ProducaoBibliografica.objects.filter(ativa=True))
+        pagina = agrupamento.pagina(request.GET.get('pagina_anos'))
+        for secao in pagina.secoes():
+            secao.ano, secao.total, secao.producoes
+    """
+
+    def __init__(self, queryset, ordenacao=('titulo',), limite_por_pagina=LIMITE_POR_PAGINA):
+        self.queryset = queryset
+        self.ordenacao = ordenacao
+        self.limite_por_pagina = limite_por_pagina
+
+    @cached_property
+    def indice(self):
+        """Lista de (ano, total de produções), do ano mais recente ao mais antigo"""
+        return list(self.consulta_indice())
+
+    def consulta_indice(self):
+        """Consulta agregada que gera o índice de anos"""
+        return (
+            self.queryset.order_by()
+            .values_list('ano_publicacao')
+            .annotate(total=Count('pk', distinct=True))
+            .order_by('-ano_publicacao')
+        )
+
+    @cached_property
+    def paginas(self):
+        """Anos de cada página, acumulando anos inteiros até o limite de produções"""
+        paginas, atual, soma = [], [], 0
+        for ano, total in self.indice:
+            if atual and soma + total > self.limite_por_pagina:
+                paginas.append(atual)
+                atual, soma = [], 0
+            atual.append((ano, total))
+            soma += total
+        if atual:
+            paginas.append(atual)
+        return paginas
+
+    def pagina(self, numero=1):
+        """Página `numero` (a partir de 1); valores inválidos caem na primeira ou na última"""
+        try:
+            numero = int(numero)
+        except (TypeError, ValueError):
+            numero = 1
+        numero = min(max(numero, 1), len(self.paginas) or 1)
+        anos = self.paginas[numero - 1] if self.paginas else []
+        return PaginaAnos(self, numero, anos)
+
+    def secoes(self, anos=None):
+        """
+        Gera uma SecaoAno por ano, lendo as produções de um único cursor.
+        Sem `anos`, percorre todos os anos do índice.
+        """
+        anos = self.indice if anos is None else anos
+        if not anos:
+            return
+        totais = dict(anos)
+        producoes = self.producoes(anos).iterator(chunk_size=TAMANHO_BLOCO)
+
+        for ano, grupo in groupby(producoes, key=attrgetter('ano_publicacao')):
+            yield SecaoAno(ano, totais[ano], list(grupo))
+
+    def producoes(self, anos=None):
+        """Produções em ordem de ano (mais recente primeiro); com `anos`, só as desses anos"""
+        producoes = self.queryset
+        if anos is not None:
+            producoes = producoes.filter(ano_publicacao__in=[ano for ano, _ in anos])
+        return producoes.order_by('-ano_publicacao', *self.ordenacao)
+
+
+class PaginaAnos:
+    """Uma página da listagem por ano, com a mesma interface da Page do Django"""
+
+    def __init__(self, agrupamento, numero, anos):
+        self.agrupamento = agrupamento
+        self.number = numero
+        self.anos = anos
+
+    def __bool__(self):
+        return bool(self.anos)
+
+    def __repr__(self):
+        return f'<PaginaAnos {self.number} de {self.num_pages}: {[ano for ano, _ in self.anos]}>'
+
+    @property
+    def num_pages(self):
+        return len(self.agrupamento.paginas)
+
+    @property
+    def page_range(self):
+        return range(1, self.num_pages + 1)
+
+    @property
+    def total_producoes(self):
+        return sum(total for _, total in self.anos)
+
+    def has_previous(self):
+        return self.number > 1
+
+    def has_next(self):
+        return self.number < self.num_pages
+
+    def has_other_pages(self):
+        return self.num_pages > 1
+
+    def previous_page_number(self):
+        return self.number - 1
+
+    def next_page_number(self):
+        return self.number + 1
+
+    def secoes(self):
+        return self.agrupamento.secoes(self.anos)
@@ -5,3 +5,7 @@ class ProducoesBibliograficasConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'producoes_bibliograficas'
     verbose_name = 'Produções Bibliográficas'
+
+    def ready(self):
+        """Conecta os signals que descartam a configuração em cache"""
+        import producoes_bibliograficas.signals  # noqa: F401
@@ -0,0 +1,29 @@
+# Generated by Django 5.2 on 2026-10-17 11:15
+
+from django.db import migrations, models
+
+
+def preencher_autores_nomes(apps, schema_editor):
+    """Preenche autores_nomes das produções existentes (mesmo formato de get_autores_display)"""
+    ProducaoBibliografica = apps.get_model('producoes_bibliograficas', 'ProducaoBibliografica')
+    producoes = []
+    for producao in ProducaoBibliografica.objects.prefetch_related('autores').iterator(chunk_size=500):
+        producao.autores_nomes = "; ".join(autor.nome for autor in producao.autores.all())
+        producoes.append(producao)
+    ProducaoBibliografica.objects.bulk_update(producoes, ['autores_nomes'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('producoes_bibliograficas', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='producaobibliografica',
+            name='autores_nomes',
+            field=models.TextField(blank=True, default='', editable=False, verbose_name='Autores (exibição)'),
+        ),
+        migrations.RunPython(preencher_autores_nomes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2 on 2026-10-17 11:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('producoes_bibliograficas', '0002_autores_nomes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='producaobibliografica',
+            index=models.Index(fields=['-ano_publicacao', 'titulo', 'id'], name='producao_cursor_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2 on 2026-10-17 11:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('producoes_bibliograficas', '0003_indices_paginacao_cursor'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='producaobibliografica',
+            name='producao_cursor_idx',
+        ),
+        migrations.AddIndex(
+            model_name='producaobibliografica',
+            index=models.Index(condition=models.Q(('ativa', True)), fields=['-ano_publicacao', 'titulo', 'id'], name='producao_ativas_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='producaobibliografica',
+            index=models.Index(fields=['ano_publicacao'], name='producao_ano_idx'),
+        ),
+    ]
@@ -1,12 +1,30 @@
 from django.db import models
+from django.db.models.functions import Coalesce
 from django.urls import reverse
 
+from langue import configuracoes
+
+
+class AutorQuerySet(models.QuerySet):
+    def com_total_producoes(self):
+        """
+        Anota `num_producoes` (produções ativas) em cada autor, com uma única
+        consulta. A contagem é uma subconsulta por autor, e não um GROUP BY,
+        para a ordenação continuar usando o índice (e o Meta.ordering valer)
+        """
+        ligacoes = Autor.producoes.through.objects.filter(
+            autor=models.OuterRef('pk'), producaobibliografica__ativa=True
+        ).order_by().values('autor').annotate(total=models.Count('pk')).values('total')
+        return self.annotate(num_producoes=Coalesce(models.Subquery(ligacoes), 0))
+
 
 class Autor(models.Model):
     """Modelo para representar autores de produções bibliográficas"""
     nome = models.CharField(max_length=200, unique=True, verbose_name="Nome Completo")
     lattes_link = models.URLField(blank=True, null=True, verbose_name="Link para Currículo Lattes")
     
+    objects = AutorQuerySet.as_manager()
+    
     class Meta:
         verbose_name = "Autor"
         verbose_name_plural = "Autores"
@@ -16,6 +34,30 @@ class Autor(models.Model):
         return self.nome
 
 
+class ProducaoBibliograficaQuerySet(models.QuerySet):
+    def com_autores(self):
+        """
+        Pré-carrega os autores de cada produção, já anotados com `num_producoes`
+        (AutorSerializer.total_producoes), com uma consulta para o queryset inteiro
+        """
+        return self.prefetch_related(
+            models.Prefetch('autores', queryset=Autor.objects.com_total_producoes().order_by('nome'))
+        )
+    
+    def atualizar_autores_nomes(self, tamanho_lote=500):
+        """
+        Recalcula `autores_nomes` das produções do queryset, em lotes e sem
+        disparar signals (usado quando um autor muda e após bulk_create)
+        """
+        alteradas = []
+        for producao in self.prefetch_related('autores').iterator(chunk_size=tamanho_lote):
+            nomes = producao.montar_autores_nomes()
+            if nomes != producao.autores_nomes:
+                producao.autores_nomes = nomes
+                alteradas.append(producao)
+        self.model.objects.bulk_update(alteradas, ['autores_nomes'], batch_size=tamanho_lote)
+
+
 class ProducaoBibliografica(models.Model):
     """Modelo para representar uma produção bibliográfica"""
     TIPO_CHOICES = [
@@ -29,6 +71,8 @@ class ProducaoBibliografica(models.Model):
     ]
     
     autores = models.ManyToManyField(Autor, related_name="producoes", verbose_name="Autores")
+    # Nomes dos autores já formatados, mantidos pelos signals (producoes_bibliograficas/signals.py)
+    autores_nomes = models.TextField(blank=True, default='', editable=False, verbose_name="Autores (exibição)")
     titulo = models.CharField(max_length=500, verbose_name="Título da Produção")
     link_producao = models.URLField(blank=True, null=True, verbose_name="Link para a Produção")
     
@@ -46,19 +90,42 @@ class ProducaoBibliografica(models.Model):
     data_criacao = models.DateTimeField(auto_now_add=True, verbose_name="Data de Criação")
     data_atualizacao = models.DateTimeField(auto_now=True, verbose_name="Última Atualização")
     
+    objects = ProducaoBibliograficaQuerySet.as_manager()
+    
     class Meta:
         verbose_name = "Produção Bibliográfica"
         verbose_name_plural = "Produções Bibliográficas"
         ordering = ["-ano_publicacao", "titulo"]
+        indexes = [
+            # Listagens, agrupamento por ano e paginação por cursor da API
+            # (langue/paginacao.py): só produções ativas
+            models.Index(
+                fields=['-ano_publicacao', 'titulo', 'id'], name='producao_ativas_idx',
+                condition=models.Q(ativa=True),
+            ),
+            # Produção mais recente da página inicial e filtros do admin
+            models.Index(fields=['ano_publicacao'], name='producao_ano_idx'),
+        ]
         
     def __str__(self):
-        autores_str = ", ".join([a.nome for a in self.autores.all()])
+        autores_str = self.autores_nomes.replace("; ", ", ")
         return f"{autores_str} ({self.ano_publicacao}) {self.titulo}"
         
     def get_autores_display(self):
         """Retorna a string formatada dos autores"""
+        return self.autores_nomes
+    
+    def montar_autores_nomes(self):
+        """Nomes dos autores separados por "; ", lidos do banco (ou do pré-carregamento)"""
         return "; ".join([a.nome for a in self.autores.all()])
     
+    def atualizar_autores_nomes(self):
+        """Recalcula `autores_nomes` após mudar os autores, sem alterar data_atualizacao"""
+        # Descarta os autores pré-carregados, que podem estar desatualizados
+        getattr(self, '_prefetched_objects_cache', {}).pop('autores', None)
+        self.autores_nomes = self.montar_autores_nomes()
+        ProducaoBibliografica.objects.filter(pk=self.pk).update(autores_nomes=self.autores_nomes)
+    
     def get_absolute_url(self):
         return reverse('producoes_bibliograficas:producao_detail', args=[str(self.id)])
 
@@ -85,5 +152,10 @@ class ConfiguracaoPaginaProducoes(models.Model):
         if not self.pk and ConfiguracaoPaginaProducoes.objects.exists():
             raise ValueError('Só pode existir uma configuração de página de produções')
         return super().save(*args, **kwargs)
+    
+    @classmethod
+    def atual(cls):
+        """Configuração da página, lida do cache (langue/configuracoes.py)"""
+        return configuracoes.obter(cls, cls.objects.first)
 
 
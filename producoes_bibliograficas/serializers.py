@@ -12,6 +12,9 @@ class AutorSerializer(serializers.ModelSerializer):
     
     def get_total_producoes(self, obj):
         """Retorna o total de produções ativas do autor"""
+        # Anotado por Autor.objects.com_total_producoes(); sem a anotação, conta no banco
+        if hasattr(obj, 'num_producoes'):
+            return obj.num_producoes
         return obj.producoes.filter(ativa=True).count()
 
 
@@ -45,7 +48,7 @@ class ProducaoBibliograficaDetailSerializer(ProducaoBibliograficaSerializer):
         relacionadas = ProducaoBibliografica.objects.filter(
             Q(ano_publicacao=obj.ano_publicacao) | Q(tipo=obj.tipo),
             ativa=True
-        ).exclude(pk=obj.pk).prefetch_related('autores')[:5]
+        ).exclude(pk=obj.pk).com_autores()[:5]
         
         return ProducaoBibliograficaSerializer(relacionadas, many=True, context=self.context).data
 
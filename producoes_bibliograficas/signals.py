@@ -0,0 +1,92 @@
+"""
+Signals que descartam a configuração da página em cache, passam os modelos
+da página de produções para uma nova geração de cache e mantêm
+ProducaoBibliografica.autores_nomes em dia
+"""
+from django.db.models.signals import post_save, pre_delete, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from langue import configuracoes, cache_versionado
+from .models import ConfiguracaoPaginaProducoes, ProducaoBibliografica, Autor
+
+
+@receiver(post_save, sender=ConfiguracaoPaginaProducoes)
+@receiver(post_delete, sender=ConfiguracaoPaginaProducoes)
+def invalidar_configuracao(sender, **kwargs):
+    """A próxima leitura de ConfiguracaoPaginaProducoes.atual() vai ao banco"""
+    configuracoes.invalidar(sender)
+
+
+@receiver(post_save, sender=ConfiguracaoPaginaProducoes)
+@receiver(post_delete, sender=ConfiguracaoPaginaProducoes)
+@receiver(post_save, sender=ProducaoBibliografica)
+@receiver(post_delete, sender=ProducaoBibliografica)
+@receiver(post_save, sender=Autor)
+@receiver(post_delete, sender=Autor)
+def nova_geracao(sender, **kwargs):
+    """As páginas em cache que dependem do modelo são refeitas"""
+    cache_versionado.nova_geracao(sender)
+
+
+@receiver(m2m_changed, sender=ProducaoBibliografica.autores.through)
+def nova_geracao_autores(sender, action, **kwargs):
+    """Autores adicionados ou removidos de uma produção"""
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        cache_versionado.nova_geracao(sender)
+
+
+@receiver(m2m_changed, sender=ProducaoBibliografica.autores.through)
+def atualizar_autores_nomes(sender, instance, action, reverse, pk_set, **kwargs):
+    """Recalcula os nomes das produções cujos autores mudaram"""
+    if action == 'pre_clear' and reverse:
+        # Em um clear reverso o pk_set não é informado, então guardamos os ids antes
+        instance._producoes_autores_nomes = list(instance.producoes.values_list('pk', flat=True))
+        return
+
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if not reverse:
+        instance.atualizar_autores_nomes()
+    else:
+        if action == 'post_clear':
+            pk_set = getattr(instance, '_producoes_autores_nomes', [])
+        ProducaoBibliografica.objects.filter(pk__in=pk_set).atualizar_autores_nomes()
+
+
+@receiver(post_save, sender=ProducaoBibliografica)
+def corrigir_autores_nomes(sender, instance, created=False, raw=False, update_fields=None, **kwargs):
+    """
+    Um save() completo grava o autores_nomes que a instância tinha ao ser lida,
+    que fica velho se os autores mudaram depois (pelo lado do autor, por
+    exemplo): recalcula a coluna a partir do banco
+    """
+    if created or raw:
+        return
+    if update_fields is not None and 'autores_nomes' not in update_fields:
+        return
+    instance.atualizar_autores_nomes()
+
+
+@receiver(post_save, sender=Autor)
+def atualizar_nome_autor(sender, instance, created=False, raw=False, update_fields=None, **kwargs):
+    """O novo nome do autor aparece nas produções dele"""
+    if created or raw:
+        return
+    if update_fields is not None and 'nome' not in update_fields:
+        return
+    instance.producoes.all().atualizar_autores_nomes()
+
+
+@receiver(pre_delete, sender=Autor)
+def guardar_producoes_autor(sender, instance, **kwargs):
+    """As ligações somem na exclusão sem m2m_changed: guarda as produções antes"""
+    instance._producoes_autores_nomes = list(instance.producoes.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Autor)
+def remover_nome_autor(sender, instance, **kwargs):
+    """Tira o autor excluído dos nomes das produções dele"""
+    ProducaoBibliografica.objects.filter(
+        pk__in=getattr(instance, '_producoes_autores_nomes', [])
+    ).atualizar_autores_nomes()
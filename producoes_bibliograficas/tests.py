@@ -1,3 +1,147 @@
+import json
+from unittest import mock
+
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
+
+from .agrupamento import AgrupamentoPorAno
+from .models import Autor, ProducaoBibliografica
+
+
+class AgrupamentoPorAnoTest(TestCase):
+    """Testes para a listagem agrupada e paginada por ano"""
+
+    def setUp(self):
+        autor = Autor.objects.create(nome="Maria Souza")
+        # 2024: 3 produções, 2023: 2, 2022: 1
+        for ano, quantidade in ((2024, 3), (2023, 2), (2022, 1)):
+            for numero in range(quantidade):
+                producao = ProducaoBibliografica.objects.create(
+                    titulo=f"Estudo {ano}-{numero}", tipo='ARTIGO', ano_publicacao=ano
+                )
+                producao.autores.add(autor)
+
+    def test_indice_de_anos(self):
+        agrupamento = AgrupamentoPorAno(ProducaoBibliografica.objects.all())
+        self.assertEqual(agrupamento.indice, [(2024, 3), (2023, 2), (2022, 1)])
+
+    def test_paginas_com_anos_inteiros(self):
+        """Os anos são acumulados até o limite, sem dividir um ano entre páginas"""
+        agrupamento = AgrupamentoPorAno(ProducaoBibliografica.objects.all(), limite_por_pagina=4)
+        self.assertEqual(agrupamento.paginas, [[(2024, 3)], [(2023, 2), (2022, 1)]])
+
+        pagina = agrupamento.pagina(2)
+        secoes = list(pagina.secoes())
+        self.assertEqual([(secao.ano, secao.total) for secao in secoes], [(2023, 2), (2022, 1)])
+        self.assertEqual([p.titulo for p in secoes[0].producoes], ["Estudo 2023-0", "Estudo 2023-1"])
+        self.assertFalse(pagina.has_next())
+        self.assertEqual(agrupamento.pagina('x').number, 1)
+
+    def test_secoes_em_consultas_constantes(self):
+        """Índice, produções e autores: três consultas, qualquer que seja o número de anos"""
+        agrupamento = AgrupamentoPorAno(ProducaoBibliografica.objects.prefetch_related('autores'))
+        with self.assertNumQueries(3):
+            for secao in agrupamento.secoes():
+                for producao in secao.producoes:
+                    list(producao.autores.all())
+
+    def test_links_de_pagina_mantem_filtros(self):
+        """Os links das páginas de anos repetem a busca e os filtros da listagem"""
+        with mock.patch.object(AgrupamentoPorAno.__init__, '__defaults__', (('titulo',), 4)):
+            response = self.client.get(
+                reverse('producoes_bibliograficas:lista'), {'search': 'Estudo', 'tipo': 'ARTIGO'}
+            )
+        self.assertContains(response, 'href="?search=Estudo&amp;tipo=ARTIGO&amp;pagina_anos=2"')
+        self.assertNotContains(response, 'href="?pagina_anos=')
+
+    def test_cards_em_cache(self):
+        """Cada card fica em cache até a produção ou seus autores mudarem"""
+        cache.clear()
+        url = reverse('producoes_bibliograficas:producoes_e_publicacoes')
+        self.client.get(url)
+
+        # update() não passa pelos signals nem muda data_atualizacao: o card antigo é servido
+        ProducaoBibliografica.objects.filter(titulo="Estudo 2022-0").update(titulo="Alterado")
+        self.assertContains(self.client.get(url), "Estudo 2022-0")
+
+        autor = Autor.objects.get()
+        autor.nome = "Maria Souza Lima"
+        autor.save()
+        response = self.client.get(url)
+        self.assertContains(response, "MARIA SOUZA LIMA")
+        self.assertContains(response, "Alterado")
+
+    def test_pagina_agrupada(self):
+        response = self.client.get(reverse('producoes_bibliograficas:producoes_e_publicacoes'))
+        self.assertContains(response, 'id="ano-2024"')
+        self.assertContains(response, '3 produções')
+        self.assertContains(response, '1 produção<')
+
+    def test_por_ano_em_streaming(self):
+        """A API por_ano é gerada aos pedaços, com o mesmo formato {ano: [...]}"""
+        response = self.client.get(reverse('producoes_bibliograficas:producaobibliografica-por-ano'))
+        self.assertTrue(response.streaming)
+        dados = json.loads(response.getvalue())
+        self.assertEqual(list(dados), ['2024', '2023', '2022'])
+        self.assertEqual([p['titulo'] for p in dados['2023']], ["Estudo 2023-0", "Estudo 2023-1"])
+        self.assertEqual(dados['2022'][0]['autores'][0]['nome'], "Maria Souza")
+
+        pagina = self.client.get(
+            reverse('producoes_bibliograficas:producaobibliografica-por-ano'), {'pagina_anos': 1}
+        )
+        self.assertEqual(list(json.loads(pagina.getvalue())), ['2024', '2023', '2022'])
+
+    def test_total_producoes_anotado(self):
+        """O total de produções vem da anotação, sem uma consulta por autor"""
+        ProducaoBibliografica.objects.filter(ano_publicacao=2022).update(ativa=False)
+        Autor.objects.create(nome="Ana Lima")
+        url = reverse('producoes_bibliograficas:autor-list')
+        with self.assertNumQueries(1):
+            dados = self.client.get(url).json()
+        totais = {autor['nome']: autor['total_producoes'] for autor in dados['results']}
+        self.assertEqual(totais, {"Ana Lima": 0, "Maria Souza": 5})
+
+
+class AutoresNomesTest(TestCase):
+    """autores_nomes acompanha as mudanças nos autores de cada produção"""
+
+    def setUp(self):
+        self.maria = Autor.objects.create(nome="Maria Souza")
+        self.joao = Autor.objects.create(nome="João Lima")
+        self.producao = ProducaoBibliografica.objects.create(titulo="Estudo", ano_publicacao=2024)
+        self.producao.autores.add(self.maria, self.joao)
+
+    def nomes(self):
+        return ProducaoBibliografica.objects.get(pk=self.producao.pk).get_autores_display()
+
+    def test_autores_adicionados(self):
+        self.assertEqual(self.producao.get_autores_display(), "João Lima; Maria Souza")
+        self.assertEqual(self.nomes(), "João Lima; Maria Souza")
+        self.assertEqual(str(self.producao), "João Lima, Maria Souza (2024) Estudo")
+
+    def test_autor_renomeado_e_excluido(self):
+        self.joao.nome = "João Lima Neto"
+        self.joao.save()
+        self.assertEqual(self.nomes(), "João Lima Neto; Maria Souza")
+
+        self.joao.delete()
+        self.assertEqual(self.nomes(), "Maria Souza")
+
+    def test_clear_reverso(self):
+        self.maria.producoes.clear()
+        self.assertEqual(self.nomes(), "João Lima")
+
+    def test_save_de_instancia_antiga_mantem_nomes(self):
+        producao = ProducaoBibliografica.objects.create(titulo="Outro estudo", ano_publicacao=2023)
+        self.maria.producoes.add(producao)
+        producao.titulo = "Outro estudo revisto"
+        producao.save()
+        producao = ProducaoBibliografica.objects.get(pk=producao.pk)
+        self.assertEqual(producao.titulo, "Outro estudo revisto")
+        self.assertEqual(producao.get_autores_display(), "Maria Souza")
 
-# Create your tests here.
+    def test_listagem_sem_consultas_de_autores(self):
+        with self.assertNumQueries(1):
+            nomes = [p.get_autores_display() for p in ProducaoBibliografica.objects.all()]
+        self.assertEqual(nomes, ["João Lima; Maria Souza"])
@@ -3,33 +3,39 @@ from django.http import JsonResponse
 from django.core.paginator import Paginator
 from django.db.models import Q, Count
 from django.views.generic import ListView, DetailView
-from django.views.decorators.cache import cache_page
 from django.utils.decorators import method_decorator
 from django.contrib import messages
-from collections import OrderedDict
 from .models import ProducaoBibliografica, Autor, ConfiguracaoPaginaProducoes
+from .agrupamento import AgrupamentoPorAno
+from itertools import groupby
+from langue import streaming
+from langue.cache_versionado import cache_por_modelos, contexto_fragmentos
 from publicacoes.models import PublicacaoPDF
 
+# Modelos exibidos nos cards das produções, além da própria produção
+MODELOS_CARDS = (Autor, ProducaoBibliografica.autores.through)
+
+
 def producoes_e_publicacoes_view(request):
-    # Lógica para Produções Bibliográficas
-    producoes_por_ano = {}
-    for producao in ProducaoBibliografica.objects.all().order_by('-ano_publicacao'):
-        if producao.ano_publicacao not in producoes_por_ano:
-            producoes_por_ano[producao.ano_publicacao] = []
-        producoes_por_ano[producao.ano_publicacao].append(producao)
+    # Lógica para Produções Bibliográficas (paginadas por ano)
+    agrupamento = AgrupamentoPorAno(ProducaoBibliografica.objects.filter(ativa=True).prefetch_related('autores'))
+    pagina_anos = agrupamento.pagina(request.GET.get('pagina_anos'))
 
     # Lógica para Publicações PDF
-    publicacoes_pdf = PublicacaoPDF.objects.all().order_by('-ano_publicacao')
+    publicacoes_pdf = PublicacaoPDF.objects.filter(ativa=True).prefetch_related('organizadores').order_by(
+        '-ano_publicacao', '-criado_em'
+    )
     anos_disponiveis_pdf = sorted(list(set(publicacoes_pdf.values_list('ano_publicacao', flat=True))), reverse=True)
 
     context = {
-        'producoes_por_ano': producoes_por_ano,
+        'pagina_anos': pagina_anos,
         'publicacoes_pdf': publicacoes_pdf,
         'anos_disponiveis_pdf': anos_disponiveis_pdf,
         'configuracao': None,  # Adicione sua lógica de configuração se houver
         'estatisticas_producoes': None, # Adicione sua lógica de estatísticas se houver
         'estatisticas_publicacoes_pdf': None, # Adicione sua lógica de estatísticas se houver
-        'is_paginated_pdf': False # Adicione sua lógica de paginação se houver
+        'is_paginated_pdf': False, # Adicione sua lógica de paginação se houver
+        **contexto_fragmentos(*MODELOS_CARDS),
     }
     return render(request, 'producoes_bibliograficas/producoes_bibliograficas.html', context)
 
@@ -39,7 +45,8 @@ class ProducoesBibliograficasListView(ListView):
     model = ProducaoBibliografica
     template_name = 'producoes_bibliograficas/producoes_bibliograficas.html'
     context_object_name = 'producoes_bibliograficas'
-    paginate_by = 50
+    # A paginação é feita por ano (AgrupamentoPorAno), não por produção
+    paginate_by = None
     
     def get_queryset(self):
         """Retorna apenas produções ativas, ordenadas por ano decrescente"""
@@ -74,22 +81,12 @@ class ProducoesBibliograficasListView(ListView):
         context = super().get_context_data(**kwargs)
         
         # Configuração da página
-        try:
-            context['configuracao'] = ConfiguracaoPaginaProducoes.objects.first()
-        except ConfiguracaoPaginaProducoes.DoesNotExist:
-            context['configuracao'] = None
+        context['configuracao'] = ConfiguracaoPaginaProducoes.atual()
         
-        # Agrupar produções por ano
-        producoes = self.get_queryset()
-        producoes_por_ano = OrderedDict()
-        
-        for producao in producoes:
-            ano = producao.ano_publicacao
-            if ano not in producoes_por_ano:
-                producoes_por_ano[ano] = []
-            producoes_por_ano[ano].append(producao)
-        
-        context['producoes_por_ano'] = producoes_por_ano
+        # Produções agrupadas e paginadas por ano
+        context['pagina_anos'] = AgrupamentoPorAno(self.object_list).pagina(
+            self.request.GET.get('pagina_anos')
+        )
         
         # Estatísticas
         context['estatisticas'] = self.get_estatisticas()
@@ -106,6 +103,9 @@ class ProducoesBibliograficasListView(ListView):
         context['tipo_filter'] = self.request.GET.get('tipo', '')
         context['ano_filter'] = self.request.GET.get('ano', '')
         
+        # Chave dos cards em cache
+        context.update(contexto_fragmentos(*MODELOS_CARDS))
+        
         return context
     
     def get_estatisticas(self):
@@ -142,10 +142,7 @@ class ProducaoBibliograficaDetailView(DetailView):
         context = super().get_context_data(**kwargs)
         
         # Configuração da página
-        try:
-            context['configuracao'] = ConfiguracaoPaginaProducoes.objects.first()
-        except ConfiguracaoPaginaProducoes.DoesNotExist:
-            context['configuracao'] = None
+        context['configuracao'] = ConfiguracaoPaginaProducoes.atual()
         
         # Produções relacionadas (mesmo ano ou mesmo tipo)
         context['producoes_relacionadas'] = ProducaoBibliografica.objects.filter(
@@ -156,14 +153,11 @@ class ProducaoBibliograficaDetailView(DetailView):
         return context
 
 
-@cache_page(60 * 15)  # Cache por 15 minutos
+@cache_por_modelos(ProducaoBibliografica, ConfiguracaoPaginaProducoes, *MODELOS_CARDS)
 def producoes_bibliograficas_view(request):
     """View baseada em função para produções bibliográficas"""
     # Buscar configuração da página
-    try:
-        configuracao = ConfiguracaoPaginaProducoes.objects.first()
-    except ConfiguracaoPaginaProducoes.DoesNotExist:
-        configuracao = None
+    configuracao = ConfiguracaoPaginaProducoes.atual()
     
     # Buscar produções ativas
     producoes = ProducaoBibliografica.objects.filter(ativa=True).prefetch_related(
@@ -189,13 +183,8 @@ def producoes_bibliograficas_view(request):
     if ano_filter:
         producoes = producoes.filter(ano_publicacao=ano_filter)
     
-    # Agrupar por ano
-    producoes_por_ano = OrderedDict()
-    for producao in producoes:
-        ano = producao.ano_publicacao
-        if ano not in producoes_por_ano:
-            producoes_por_ano[ano] = []
-        producoes_por_ano[ano].append(producao)
+    # Agrupar e paginar por ano
+    pagina_anos = AgrupamentoPorAno(producoes).pagina(request.GET.get('pagina_anos'))
     
     # Estatísticas
     producoes_ativas = ProducaoBibliografica.objects.filter(ativa=True)
@@ -219,13 +208,14 @@ def producoes_bibliograficas_view(request):
     
     context = {
         'configuracao': configuracao,
-        'producoes_por_ano': producoes_por_ano,
+        'pagina_anos': pagina_anos,
         'estatisticas': estatisticas,
         'anos_disponiveis': anos_disponiveis,
         'tipos_disponiveis': ProducaoBibliografica.TIPO_CHOICES,
         'search_query': search_query or '',
         'tipo_filter': tipo_filter or '',
         'ano_filter': ano_filter or '',
+        **contexto_fragmentos(*MODELOS_CARDS),
     }
     
     return render(request, 'producoes_bibliograficas/producoes_bibliograficas.html', context)
@@ -240,10 +230,7 @@ def producao_detail_view(request, pk):
     )
     
     # Buscar configuração da página
-    try:
-        configuracao = ConfiguracaoPaginaProducoes.objects.first()
-    except ConfiguracaoPaginaProducoes.DoesNotExist:
-        configuracao = None
+    configuracao = ConfiguracaoPaginaProducoes.atual()
     
     # Produções relacionadas
     producoes_relacionadas = ProducaoBibliografica.objects.filter(
@@ -267,13 +254,13 @@ def autores_ajax_view(request):
         
         autores = Autor.objects.filter(
             nome__icontains=search_term
-        ).order_by('nome')[:10]
+        ).com_total_producoes().order_by('nome')[:10]
         
         data = [{
             'id': a.id,
             'nome': a.nome,
             'lattes_link': a.lattes_link or '',
-            'total_producoes': a.producoes.filter(ativa=True).count()
+            'total_producoes': a.num_producoes
         } for a in autores]
         
         return JsonResponse({'autores': data})
@@ -366,7 +353,9 @@ from .serializers import ProducaoBibliograficaSerializer, AutorSerializer
 
 class ProducaoBibliograficaViewSet(viewsets.ReadOnlyModelViewSet):
     """ViewSet para API REST das produções bibliográficas"""
-    queryset = ProducaoBibliografica.objects.filter(ativa=True).order_by('-ano_publicacao', 'titulo')
+    queryset = ProducaoBibliografica.objects.filter(ativa=True).com_autores().order_by(
+        '-ano_publicacao', 'titulo'
+    )
     serializer_class = ProducaoBibliograficaSerializer
     permission_classes = [permissions.AllowAny]
     
@@ -394,19 +383,23 @@ class ProducaoBibliograficaViewSet(viewsets.ReadOnlyModelViewSet):
     
     @action(detail=False, methods=['get'])
     def por_ano(self, request):
-        """Endpoint para produções agrupadas por ano"""
-        producoes = self.get_queryset()
-        producoes_por_ano = {}
-        
-        for producao in producoes:
-            ano = str(producao.ano_publicacao)
-            if ano not in producoes_por_ano:
-                producoes_por_ano[ano] = []
-            producoes_por_ano[ano].append(
-                ProducaoBibliograficaSerializer(producao, context={'request': request}).data
-            )
-        
-        return Response(producoes_por_ano)
+        """
+        Endpoint para produções agrupadas por ano (?pagina_anos=N limita a uma
+        página de anos). A resposta é gerada em streaming: {"2024": [...], ...}
+        """
+        agrupamento = AgrupamentoPorAno(self.get_queryset())
+        anos = None
+        if 'pagina_anos' in request.query_params:
+            anos = agrupamento.pagina(request.query_params['pagina_anos']).anos
+        
+        linhas = streaming.serializar_em_blocos(
+            agrupamento.producoes(anos), ProducaoBibliograficaSerializer, {'request': request}
+        )
+        grupos = groupby(linhas, key=lambda linha: linha[0].ano_publicacao)
+        return streaming.resposta_json(streaming.objeto_json(
+            (ano, streaming.lista_json(streaming.valor_json(dados) for _, dados in grupo))
+            for ano, grupo in grupos
+        ))
     
     @action(detail=False, methods=['get'])
     def estatisticas(self, request):
@@ -429,7 +422,7 @@ class ProducaoBibliograficaViewSet(viewsets.ReadOnlyModelViewSet):
 
 class AutorViewSet(viewsets.ReadOnlyModelViewSet):
     """ViewSet para API REST dos autores"""
-    queryset = Autor.objects.all().order_by('nome')
+    queryset = Autor.objects.com_total_producoes().order_by('nome')
     serializer_class = AutorSerializer
     permission_classes = [permissions.AllowAny]
     
@@ -437,7 +430,7 @@ class AutorViewSet(viewsets.ReadOnlyModelViewSet):
     def producoes(self, request, pk=None):
         """Endpoint para produções de um autor específico"""
         autor = self.get_object()
-        producoes = autor.producoes.filter(ativa=True).order_by('-ano_publicacao')
+        producoes = autor.producoes.filter(ativa=True).com_autores().order_by('-ano_publicacao')
         serializer = ProducaoBibliograficaSerializer(producoes, many=True, context={'request': request})
         return Response(serializer.data)
 
@@ -2,7 +2,7 @@ from django.contrib import admin
 from django.utils.html import format_html
 from django.urls import reverse
 from django.utils.safestring import mark_safe
-from .models import PublicacaoPDF, Organizador, ConfiguracaoPaginaPublicacoes
+from .models import PublicacaoPDF, Organizador, ConfiguracaoPaginaPublicacoes, DownloadDiario, EstatisticasPublicacoes
 
 
 @admin.register(Organizador)
@@ -63,9 +63,15 @@ class OrganizadorAdmin(admin.ModelAdmin):
         )
     tem_lattes.short_description = 'Tem Lattes'
     
+    def get_queryset(self, request):
+        # Total de publicações anotado na listagem, em vez de um COUNT por linha
+        return super().get_queryset(request).com_total_publicacoes()
+    
     def total_publicacoes(self, obj):
         """Retorna o total de publicações do organizador"""
-        total = obj.publicacoes.filter(ativa=True).count()
+        total = getattr(obj, 'num_publicacoes', None)
+        if total is None:
+            total = obj.publicacoes.filter(ativa=True).count()
         if total > 0:
             url = reverse('admin:publicacoes_publicacaopdf_changelist')
             return format_html(
@@ -77,6 +83,7 @@ class OrganizadorAdmin(admin.ModelAdmin):
             )
         return '0 publicações'
     total_publicacoes.short_description = 'Total de Publicações'
+    total_publicacoes.admin_order_field = 'num_publicacoes'
 
 
 class OrganizadorInline(admin.TabularInline):
@@ -107,6 +114,7 @@ class PublicacaoPDFAdmin(admin.ModelAdmin):
         'ano_publicacao',
         'destaque',
         'ativa',
+        'thumbnail_status',
         'criado_em',
         'organizadores'
     ]
@@ -130,6 +138,8 @@ class PublicacaoPDFAdmin(admin.ModelAdmin):
         'criado_em',
         'atualizado_em',
         'preview_thumbnail_large',
+        'thumbnail_status',
+        'thumbnail_erro',
         'tamanho_arquivo_mb',
         'link_download'
     ]
@@ -150,7 +160,9 @@ class PublicacaoPDFAdmin(admin.ModelAdmin):
             'fields': (
                 'descricao',
                 'arquivo_pdf',
-                'preview_thumbnail_large'
+                'preview_thumbnail_large',
+                'thumbnail_status',
+                'thumbnail_erro'
             )
         }),
         ('Informações da Publicação', {
@@ -196,16 +208,9 @@ class PublicacaoPDFAdmin(admin.ModelAdmin):
     
     def organizadores_display(self, obj):
         """Exibe os organizadores na lista"""
-        organizadores = obj.organizadores.filter(ativo=True)[:3]
-        if not organizadores:
-            return "Sem organizadores"
-        
-        nomes = [org.nome for org in organizadores]
-        if obj.organizadores.filter(ativo=True).count() > 3:
-            nomes.append("...")
-        
-        return ", ".join(nomes)
+        return obj.get_organizadores_display()
     organizadores_display.short_description = 'Organizadores'
+    organizadores_display.admin_order_field = 'organizadores_nomes'
     
     def preview_thumbnail(self, obj):
         """Exibe thumbnail pequeno na lista"""
@@ -231,7 +236,7 @@ class PublicacaoPDFAdmin(admin.ModelAdmin):
             )
         return format_html(
             '<div style="margin: 10px 0; padding: 20px; background: #f8f9fa; border: 1px solid #dee2e6; border-radius: 8px; text-align: center;">'
-            '<p style="color: #6c757d; margin: 0;">Thumbnail será gerado automaticamente após o upload do PDF</p>'
+            '<p style="color: #6c757d; margin: 0;">Thumbnail será gerado em segundo plano após o upload do PDF</p>'
             '</div>'
         )
     preview_thumbnail_large.short_description = 'Preview do Thumbnail'
@@ -269,6 +274,8 @@ class PublicacaoPDFAdmin(admin.ModelAdmin):
     def ativar_publicacoes(self, request, queryset):
         """Ação para ativar publicações"""
         updated = queryset.update(ativa=True)
+        # update() não dispara os signals
+        EstatisticasPublicacoes.invalidar()
         self.message_user(
             request,
             f'{updated} publicação(ões) ativada(s).'
@@ -278,6 +285,8 @@ class PublicacaoPDFAdmin(admin.ModelAdmin):
     def desativar_publicacoes(self, request, queryset):
         """Ação para desativar publicações"""
         updated = queryset.update(ativa=False)
+        # update() não dispara os signals
+        EstatisticasPublicacoes.invalidar()
         self.message_user(
             request,
             f'{updated} publicação(ões) desativada(s).'
@@ -285,46 +294,87 @@ class PublicacaoPDFAdmin(admin.ModelAdmin):
     desativar_publicacoes.short_description = "Desativar publicações"
     
     def regenerar_thumbnails(self, request, queryset):
-        """Ação para regenerar thumbnails das publicações"""
-        count = 0
-        for publicacao in queryset:
-            if publicacao.arquivo_pdf:
-                try:
-                    publicacao.gerar_thumbnail()
-                    count += 1
-                except Exception as e:
-                    self.message_user(
-                        request,
-                        f'Erro ao regenerar thumbnail para "{publicacao.titulo}": {str(e)}',
-                        level='ERROR'
-                    )
-        
-        if count > 0:
-            self.message_user(
-                request,
-                f'{count} thumbnail(s) regenerado(s) com sucesso.'
-            )
+        """Ação para colocar os thumbnails das publicações na fila de regeneração"""
+        count = queryset.exclude(arquivo_pdf='').update(
+            thumbnail_status='PENDENTE',
+            thumbnail_erro=''
+        )
+        self.message_user(
+            request,
+            f'{count} thumbnail(s) adicionado(s) à fila de processamento.'
+        )
     regenerar_thumbnails.short_description = "Regenerar thumbnails"
     
     def save_model(self, request, obj, form, change):
-        """Override para gerar thumbnail após salvar"""
+        """Override para enfileirar o thumbnail após salvar"""
         super().save_model(request, obj, form, change)
         
-        # Se é uma nova publicação ou o PDF foi alterado, gera thumbnail
-        if not change or 'arquivo_pdf' in form.changed_data:
-            if obj.arquivo_pdf:
-                try:
-                    obj.gerar_thumbnail()
-                    self.message_user(
-                        request,
-                        f'Thumbnail gerado automaticamente para "{obj.titulo}".'
-                    )
-                except Exception as e:
-                    self.message_user(
-                        request,
-                        f'Erro ao gerar thumbnail: {str(e)}',
-                        level='ERROR'
-                    )
+        # Se o PDF foi alterado, o thumbnail é refeito pelo worker (manage.py thumbnail_worker)
+        if change and 'arquivo_pdf' in form.changed_data and obj.arquivo_pdf:
+            obj.enfileirar_thumbnail()
+        
+        if obj.thumbnail_status == 'PENDENTE':
+            self.message_user(
+                request,
+                f'Thumbnail de "{obj.titulo}" adicionado à fila de processamento.'
+            )
+
+
+@admin.register(DownloadDiario)
+class DownloadDiarioAdmin(admin.ModelAdmin):
+    """Configuração do admin para DownloadDiario (somente leitura)"""
+    
+    list_display = [
+        'publicacao',
+        'data',
+        'quantidade'
+    ]
+    
+    list_filter = [
+        'data'
+    ]
+    
+    search_fields = [
+        'publicacao__titulo'
+    ]
+    
+    date_hierarchy = 'data'
+    list_select_related = ['publicacao']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(EstatisticasPublicacoes)
+class EstatisticasPublicacoesAdmin(admin.ModelAdmin):
+    """Configuração do admin para EstatisticasPublicacoes (somente leitura)"""
+    
+    list_display = [
+        'total_publicacoes',
+        'total_organizadores',
+        'anos_publicacao',
+        'downloads_total',
+        'categoria_mais_comum',
+        'desatualizada',
+        'atualizado_em'
+    ]
+    
+    actions = ['recalcular']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    def recalcular(self, request, queryset):
+        """Ação para recalcular as estatísticas imediatamente"""
+        EstatisticasPublicacoes.recalcular()
+        self.message_user(request, 'Estatísticas recalculadas.')
+    recalcular.short_description = "Recalcular estatísticas"
 
 
 @admin.register(ConfiguracaoPaginaPublicacoes)
@@ -7,8 +7,6 @@ class PublicacoesConfig(AppConfig):
     verbose_name = 'Publicações PDF'
     
     def ready(self):
-        """Configurações executadas quando a aplicação está pronta"""
-        # Importar signals se houver
-        # import publicacoes.signals
-        pass
+        """Conecta os signals que mantêm as estatísticas atualizadas"""
+        import publicacoes.signals  # noqa: F401
 
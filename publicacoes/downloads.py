@@ -0,0 +1,126 @@
+"""
+Contagem de downloads das publicações
+
+Cada clique em "Baixar" só soma 1 em um buffer em memória. O buffer é gravado
+no banco em lote, com UPDATEs atômicos (F()), quando passa o intervalo
+DOWNLOADS_INTERVALO_GRAVACAO (segundos) ou quando acumula
+DOWNLOADS_LIMITE_BUFFER publicações. Assim a maioria das requisições não abre
+transação de escrita, o que no SQLite serializaria os downloads simultâneos.
+
+Um temporizador grava o buffer um intervalo depois do primeiro download
+pendente, mesmo que não venha outro clique. O que estiver pendente também é
+gravado ao final do processo.
+
+Cada processo do servidor tem o próprio buffer, e total() só soma o buffer do
+processo atual: nos outros, o número aparece depois da gravação, em até um
+intervalo. Se o processo for morto (SIGKILL, falta de memória), perdem-se os
+downloads ainda no buffer, no máximo os de um intervalo.
+"""
+import atexit
+import logging
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from .models import DownloadDiario
+
+
+logger = logging.getLogger(__name__)
+
+_trava = threading.Lock()
+_pendentes = Counter()
+_ultima_gravacao = time.monotonic()
+_temporizador = None
+
+
+def _intervalo():
+    return getattr(settings, 'DOWNLOADS_INTERVALO_GRAVACAO', 10)
+
+
+def _limite():
+    return getattr(settings, 'DOWNLOADS_LIMITE_BUFFER', 500)
+
+
+def registrar(publicacao_id):
+    """Conta um download da publicação, gravando o buffer se estiver na hora"""
+    with _trava:
+        _pendentes[(publicacao_id, timezone.localdate())] += 1
+        gravar_agora = (
+            len(_pendentes) >= _limite()
+            or time.monotonic() - _ultima_gravacao >= _intervalo()
+        )
+        if not gravar_agora:
+            _agendar()
+    if gravar_agora:
+        descarregar()
+
+
+def _agendar():
+    """Agenda a gravação do buffer para daqui a um intervalo (chamada com a trava)"""
+    global _temporizador
+    if _temporizador is None:
+        _temporizador = threading.Timer(_intervalo(), _gravar_pelo_temporizador)
+        _temporizador.daemon = True
+        _temporizador.start()
+
+
+def _gravar_pelo_temporizador():
+    global _temporizador
+    with _trava:
+        _temporizador = None
+    try:
+        descarregar()
+    except Exception:
+        # Os downloads voltaram ao buffer e a gravação foi reagendada
+        logger.exception("Erro ao gravar os downloads pendentes")
+    finally:
+        # A conexão é da thread do temporizador, que termina aqui
+        connection.close()
+
+
+def pendentes(publicacao_id):
+    """Downloads da publicação que ainda estão no buffer"""
+    with _trava:
+        return sum(
+            quantidade for (pk, _), quantidade in _pendentes.items()
+            if pk == publicacao_id
+        )
+
+
+def total(publicacao):
+    """Total de downloads da publicação, incluindo os que ainda não foram gravados"""
+    return publicacao.downloads + pendentes(publicacao.pk)
+
+
+def descarregar():
+    """Grava o buffer no banco. Retorna o número de downloads gravados"""
+    global _ultima_gravacao, _temporizador
+    with _trava:
+        lote = dict(_pendentes)
+        _pendentes.clear()
+        _ultima_gravacao = time.monotonic()
+        if _temporizador is not None:
+            # O buffer agendado está sendo gravado agora
+            _temporizador.cancel()
+            _temporizador = None
+
+    gravados = 0
+    itens = list(lote.items())
+    for posicao, ((publicacao_id, data), quantidade) in enumerate(itens):
+        try:
+            if DownloadDiario.registrar(publicacao_id, data, quantidade):
+                gravados += quantidade
+        except Exception:
+            # Devolve ao buffer o que não foi gravado, para tentar de novo depois
+            with _trava:
+                _pendentes.update(dict(itens[posicao:]))
+                _agendar()
+            raise
+    return gravados
+
+
+atexit.register(descarregar)
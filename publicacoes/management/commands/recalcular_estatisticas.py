@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from publicacoes.models import EstatisticasPublicacoes
+
+
+class Command(BaseCommand):
+    help = "Recalcula as estatísticas pré-calculadas da página de publicações (para rodar periodicamente)"
+
+    def handle(self, *args, **options):
+        estatisticas = EstatisticasPublicacoes.recalcular()
+        self.stdout.write(self.style.SUCCESS(
+            f"Estatísticas recalculadas: {estatisticas.total_publicacoes} publicação(ões), "
+            f"{estatisticas.total_organizadores} organizador(es), {estatisticas.downloads_total} download(s)."
+        ))
@@ -0,0 +1,91 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from publicacoes.models import PublicacaoPDF
+from publicacoes.thumbnails import processar_pdf
+
+
+class Command(BaseCommand):
+    help = (
+        "Regenera em paralelo os thumbnails das publicações PDF, pulando os PDFs "
+        "cujo conteúdo não mudou desde a última renderização"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processos',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Número de processos de renderização (padrão: número de CPUs)',
+        )
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=200,
+            help='Quantidade de publicações enviadas aos processos por vez (padrão: 200)',
+        )
+        parser.add_argument(
+            '--forcar',
+            action='store_true',
+            help='Renderiza todos os PDFs, mesmo os que não mudaram',
+        )
+        parser.add_argument(
+            'ids',
+            nargs='*',
+            type=int,
+            help='Ids das publicações a regenerar (padrão: todas)',
+        )
+
+    def handle(self, *args, **options):
+        queryset = PublicacaoPDF.objects.exclude(arquivo_pdf='').order_by('pk')
+        if options['ids']:
+            queryset = queryset.filter(pk__in=options['ids'])
+
+        pendentes = list(queryset.values_list('pk', 'arquivo_pdf', 'thumbnail', 'thumbnail_hash', 'thumbnail_status'))
+        storage = PublicacaoPDF._meta.get_field('arquivo_pdf').storage
+        tamanho_lote = max(options['lote'], 1)
+        renderizados = inalterados = erros = 0
+        inicio = time.perf_counter()
+
+        self.stdout.write(f"Verificando {len(pendentes)} publicação(ões) com {options['processos']} processo(s)...")
+        with ProcessPoolExecutor(max_workers=options['processos']) as executor:
+            for posicao in range(0, len(pendentes), tamanho_lote):
+                lote = pendentes[posicao:posicao + tamanho_lote]
+                caminhos = [storage.path(arquivo) for _, arquivo, _, _, _ in lote]
+                # Sem miniatura salva, o hash anterior não vale: renderiza de qualquer forma
+                hashes = [
+                    '' if options['forcar'] or not thumbnail else thumbnail_hash
+                    for _, _, thumbnail, thumbnail_hash, _ in lote
+                ]
+                resultados = executor.map(
+                    processar_pdf, caminhos, hashes,
+                    chunksize=max(len(lote) // (options['processos'] * 4), 1),
+                )
+
+                publicacoes = PublicacaoPDF.objects.in_bulk([pk for pk, _, _, _, _ in lote])
+                for (pk, arquivo, _, _, status), (hash_pdf, conteudo, erro) in zip(lote, resultados):
+                    if not conteudo and not erro:
+                        inalterados += 1
+                        continue
+                    publicacao = publicacoes.get(pk)
+                    if publicacao is None:
+                        # Excluída enquanto o PDF era renderizado
+                        continue
+                    # Grava só se o PDF e o status não mudaram desde a leitura acima
+                    if publicacao.registrar_thumbnail(conteudo, hash_pdf, erro, arquivo_pdf=arquivo, status=status):
+                        renderizados += 1
+                    elif erro:
+                        erros += 1
+                        self.stderr.write(f"Publicação {pk}: {erro}")
+
+                self.stdout.write(f"{posicao + len(lote)}/{len(pendentes)} verificada(s)...")
+
+        duracao = time.perf_counter() - inicio
+        por_segundo = (renderizados + inalterados + erros) / duracao if duracao else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"{renderizados} thumbnail(s) renderizado(s), {inalterados} sem alteração, "
+            f"{erros} erro(s) em {duracao:.1f}s ({por_segundo:.1f} PDFs/s)."
+        ))
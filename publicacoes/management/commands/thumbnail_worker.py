@@ -0,0 +1,10 @@
+from langue.filas import ComandoWorker
+from publicacoes import tarefas
+
+
+class Command(ComandoWorker):
+    help = "Processa a fila de geração de thumbnails das publicações PDF"
+    fila = tarefas.fila
+    nome = "Worker de thumbnails"
+    mensagem_lote = "{sucessos} thumbnail(s) gerado(s), {erros} erro(s)."
+    ajuda_threads = 'Número de thumbnails gerados em paralelo (padrão: 2)'
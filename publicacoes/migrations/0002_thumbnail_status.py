@@ -0,0 +1,41 @@
+# Generated by Django 5.2 on 2026-10-17 10:31
+
+from django.db import migrations, models
+
+
+def marcar_thumbnails_existentes(apps, schema_editor):
+    """Publicações que já têm miniatura não precisam passar pela fila"""
+    PublicacaoPDF = apps.get_model('publicacoes', 'PublicacaoPDF')
+    PublicacaoPDF.objects.exclude(thumbnail='').exclude(thumbnail__isnull=True).update(
+        thumbnail_status='CONCLUIDO'
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('publicacoes', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='publicacaopdf',
+            name='thumbnail_erro',
+            field=models.TextField(blank=True, default='', help_text='Mensagem do último erro na geração da miniatura', verbose_name='Erro da Miniatura'),
+        ),
+        migrations.AddField(
+            model_name='publicacaopdf',
+            name='thumbnail_processado_em',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Status da Miniatura Alterado em'),
+        ),
+        migrations.AddField(
+            model_name='publicacaopdf',
+            name='thumbnail_status',
+            field=models.CharField(choices=[('PENDENTE', 'Pendente'), ('PROCESSANDO', 'Processando'), ('CONCLUIDO', 'Concluído'), ('ERRO', 'Erro')], default='PENDENTE', help_text='Situação da geração da miniatura na fila de processamento', max_length=20, verbose_name='Status da Miniatura'),
+        ),
+        migrations.AddIndex(
+            model_name='publicacaopdf',
+            index=models.Index(fields=['thumbnail_status'], name='publicacoes_thumbna_b22fca_idx'),
+        ),
+        migrations.RunPython(marcar_thumbnails_existentes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-17 10:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('publicacoes', '0002_thumbnail_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='publicacaopdf',
+            name='thumbnail_hash',
+            field=models.CharField(blank=True, default='', help_text='SHA-256 do PDF usado para gerar a miniatura atual', max_length=64, verbose_name='Hash do PDF da Miniatura'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2 on 2026-10-17 10:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('publicacoes', '0003_thumbnail_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DownloadDiario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data', models.DateField(verbose_name='Data')),
+                ('quantidade', models.PositiveIntegerField(default=0, verbose_name='Downloads')),
+                ('publicacao', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='downloads_diarios', to='publicacoes.publicacaopdf', verbose_name='Publicação')),
+            ],
+            options={
+                'verbose_name': 'Download Diário',
+                'verbose_name_plural': 'Downloads Diários',
+                'ordering': ['-data'],
+                'constraints': [models.UniqueConstraint(fields=('publicacao', 'data'), name='download_diario_unico')],
+            },
+        ),
+    ]
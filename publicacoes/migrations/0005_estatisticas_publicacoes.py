@@ -0,0 +1,33 @@
+# Generated by Django 5.2 on 2026-10-17 10:55
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('publicacoes', '0004_download_diario'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EstatisticasPublicacoes',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_publicacoes', models.PositiveIntegerField(default=0, verbose_name='Publicações ativas')),
+                ('total_organizadores', models.PositiveIntegerField(default=0, verbose_name='Organizadores')),
+                ('anos_publicacao', models.PositiveIntegerField(default=0, verbose_name='Anos com publicações')),
+                ('downloads_total', models.PositiveBigIntegerField(default=0, verbose_name='Downloads')),
+                ('categoria_mais_comum', models.CharField(blank=True, choices=[('LIVRO', 'Livro'), ('REVISTA', 'Revista'), ('ANAIS', 'Anais de Evento'), ('RELATORIO', 'Relatório'), ('MANUAL', 'Manual'), ('GUIA', 'Guia'), ('OUTROS', 'Outros')], max_length=20, verbose_name='Categoria mais comum')),
+                ('categoria_mais_comum_total', models.PositiveIntegerField(default=0, verbose_name='Publicações da categoria mais comum')),
+                ('desatualizada', models.BooleanField(default=False, verbose_name='Desatualizada')),
+                ('versao', models.PositiveIntegerField(default=0, help_text='Incrementada a cada alteração, para não gravar um recálculo feito com dados antigos', verbose_name='Versão')),
+                ('atualizado_em', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Calculado em')),
+            ],
+            options={
+                'verbose_name': 'Estatísticas das Publicações',
+                'verbose_name_plural': 'Estatísticas das Publicações',
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2 on 2026-10-17 11:15
+
+from django.db import migrations, models
+
+
+def preencher_organizadores_nomes(apps, schema_editor):
+    """Preenche organizadores_nomes das publicações existentes (formato "A, B e C")"""
+    PublicacaoPDF = apps.get_model('publicacoes', 'PublicacaoPDF')
+    Organizador = apps.get_model('publicacoes', 'Organizador')
+    ativos = models.Prefetch('organizadores', queryset=Organizador.objects.filter(ativo=True))
+    publicacoes = []
+    for publicacao in PublicacaoPDF.objects.prefetch_related(ativos).iterator(chunk_size=500):
+        nomes = [organizador.nome for organizador in publicacao.organizadores.all()]
+        if len(nomes) < 2:
+            publicacao.organizadores_nomes = ''.join(nomes)
+        else:
+            publicacao.organizadores_nomes = f"{', '.join(nomes[:-1])} e {nomes[-1]}"
+        publicacoes.append(publicacao)
+    PublicacaoPDF.objects.bulk_update(publicacoes, ['organizadores_nomes'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('publicacoes', '0005_estatisticas_publicacoes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='publicacaopdf',
+            name='organizadores_nomes',
+            field=models.TextField(blank=True, default='', editable=False, verbose_name='Organizadores (exibição)'),
+        ),
+        migrations.RunPython(preencher_organizadores_nomes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2 on 2026-10-17 11:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('publicacoes', '0006_organizadores_nomes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='organizador',
+            index=models.Index(fields=['nome', 'id'], name='organizador_cursor_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='publicacaopdf',
+            index=models.Index(fields=['-ano_publicacao', '-criado_em', '-id'], name='publicacao_cursor_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2 on 2026-10-17 11:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('publicacoes', '0007_indices_paginacao_cursor'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='organizador',
+            name='organizador_cursor_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='publicacaopdf',
+            name='publicacoes_categor_8c8f28_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='publicacaopdf',
+            name='publicacoes_ativa_c1dfd4_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='publicacaopdf',
+            name='publicacao_cursor_idx',
+        ),
+        migrations.AddIndex(
+            model_name='organizador',
+            index=models.Index(condition=models.Q(('ativo', True)), fields=['nome', 'id'], name='organizador_ativos_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='publicacaopdf',
+            index=models.Index(condition=models.Q(('ativa', True)), fields=['-ano_publicacao', '-criado_em', '-id'], name='publicacao_ativas_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='publicacaopdf',
+            index=models.Index(condition=models.Q(('ativa', True)), fields=['categoria', '-ano_publicacao', '-criado_em'], name='publicacao_categoria_idx'),
+        ),
+    ]
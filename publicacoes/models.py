@@ -1,13 +1,19 @@
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, Exists, F, Sum
+from django.db.models.functions import Coalesce
 from django.core.validators import FileExtensionValidator
 from django.core.exceptions import ValidationError
-from PIL import Image
-import fitz  # PyMuPDF
+import logging
 import os
-from io import BytesIO
 from django.core.files.base import ContentFile
 from django.conf import settings
 from django.urls import reverse
+from django.utils import timezone
+from langue import configuracoes
+from .thumbnails import processar_pdf
+
+
+logger = logging.getLogger(__name__)
 
 
 def validate_pdf_file(file):
@@ -30,6 +36,19 @@ def upload_thumbnail_path(instance, filename):
     return f'publicacoes/thumbnails/{filename}'
 
 
+class OrganizadorQuerySet(models.QuerySet):
+    def com_total_publicacoes(self):
+        """
+        Anota `num_publicacoes` (publicações ativas) em cada organizador, com
+        uma única consulta. A contagem é uma subconsulta por organizador, e não
+        um GROUP BY, para a ordenação continuar usando o índice
+        """
+        ligacoes = Organizador.publicacoes.through.objects.filter(
+            organizador=models.OuterRef('pk'), publicacaopdf__ativa=True
+        ).order_by().values('organizador').annotate(total=models.Count('pk')).values('total')
+        return self.annotate(num_publicacoes=Coalesce(models.Subquery(ligacoes), 0))
+
+
 class Organizador(models.Model):
     """Modelo para representar os organizadores das publicações"""
     nome = models.CharField(
@@ -75,15 +94,49 @@ class Organizador(models.Model):
         verbose_name="Atualizado em"
     )
     
+    objects = OrganizadorQuerySet.as_manager()
+    
     class Meta:
         verbose_name = "Organizador"
         verbose_name_plural = "Organizadores"
         ordering = ['nome']
+        # Listagens e paginação por cursor da API (langue/paginacao.py): só itens ativos
+        indexes = [
+            models.Index(fields=['nome', 'id'], name='organizador_ativos_idx', condition=models.Q(ativo=True)),
+        ]
     
     def __str__(self):
         return self.nome
 
 
+class PublicacaoPDFQuerySet(models.QuerySet):
+    def com_organizadores(self):
+        """
+        Pré-carrega os organizadores ativos de cada publicação em
+        `organizadores_ativos`, com uma consulta para o queryset inteiro
+        """
+        return self.prefetch_related(
+            models.Prefetch(
+                'organizadores',
+                queryset=Organizador.objects.filter(ativo=True),
+                to_attr='organizadores_ativos',
+            )
+        )
+    
+    def atualizar_organizadores_nomes(self, tamanho_lote=500):
+        """
+        Recalcula `organizadores_nomes` das publicações do queryset, em lotes e
+        sem disparar signals (usado quando um organizador muda e após bulk_create)
+        """
+        alteradas = []
+        for publicacao in self.com_organizadores().iterator(chunk_size=tamanho_lote):
+            nomes = publicacao.montar_organizadores_nomes()
+            if nomes != publicacao.organizadores_nomes:
+                publicacao.organizadores_nomes = nomes
+                alteradas.append(publicacao)
+        self.model.objects.bulk_update(alteradas, ['organizadores_nomes'], batch_size=tamanho_lote)
+
+
 class PublicacaoPDF(models.Model):
     """Modelo para representar as publicações em PDF"""
     
@@ -97,6 +150,13 @@ class PublicacaoPDF(models.Model):
         ('OUTROS', 'Outros'),
     ]
     
+    THUMBNAIL_STATUS_CHOICES = [
+        ('PENDENTE', 'Pendente'),
+        ('PROCESSANDO', 'Processando'),
+        ('CONCLUIDO', 'Concluído'),
+        ('ERRO', 'Erro'),
+    ]
+    
     titulo = models.CharField(
         max_length=300,
         verbose_name="Título da Publicação",
@@ -118,6 +178,15 @@ class PublicacaoPDF(models.Model):
         related_name="publicacoes"
     )
     
+    # Nomes dos organizadores ativos já formatados, mantidos pelos signals
+    # (publicacoes/signals.py)
+    organizadores_nomes = models.TextField(
+        blank=True,
+        default='',
+        editable=False,
+        verbose_name="Organizadores (exibição)"
+    )
+    
     categoria = models.CharField(
         max_length=20,
         choices=CATEGORIA_CHOICES,
@@ -179,6 +248,35 @@ class PublicacaoPDF(models.Model):
         help_text="Miniatura da primeira página (gerada automaticamente)"
     )
     
+    thumbnail_status = models.CharField(
+        max_length=20,
+        choices=THUMBNAIL_STATUS_CHOICES,
+        default='PENDENTE',
+        verbose_name="Status da Miniatura",
+        help_text="Situação da geração da miniatura na fila de processamento"
+    )
+    
+    thumbnail_erro = models.TextField(
+        blank=True,
+        default='',
+        verbose_name="Erro da Miniatura",
+        help_text="Mensagem do último erro na geração da miniatura"
+    )
+    
+    thumbnail_processado_em = models.DateTimeField(
+        blank=True,
+        null=True,
+        verbose_name="Status da Miniatura Alterado em"
+    )
+    
+    thumbnail_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        default='',
+        verbose_name="Hash do PDF da Miniatura",
+        help_text="SHA-256 do PDF usado para gerar a miniatura atual"
+    )
+    
     destaque = models.BooleanField(
         default=False,
         verbose_name="Publicação em Destaque",
@@ -207,90 +305,126 @@ class PublicacaoPDF(models.Model):
         verbose_name="Atualizado em"
     )
     
+    objects = PublicacaoPDFQuerySet.as_manager()
+    
     class Meta:
         verbose_name = "Publicação PDF"
         verbose_name_plural = "Publicações PDF"
         ordering = ['-ano_publicacao', '-criado_em']
         indexes = [
             models.Index(fields=['ano_publicacao']),
-            models.Index(fields=['categoria']),
-            models.Index(fields=['ativa']),
             models.Index(fields=['destaque']),
+            models.Index(fields=['thumbnail_status']),
+            # Listagens e paginação por cursor da API (langue/paginacao.py):
+            # só publicações ativas, com e sem filtro de categoria
+            models.Index(
+                fields=['-ano_publicacao', '-criado_em', '-id'], name='publicacao_ativas_idx',
+                condition=models.Q(ativa=True),
+            ),
+            models.Index(
+                fields=['categoria', '-ano_publicacao', '-criado_em'], name='publicacao_categoria_idx',
+                condition=models.Q(ativa=True),
+            ),
         ]
     
     def __str__(self):
         return f"{self.titulo} ({self.ano_publicacao})"
     
     def save(self, *args, **kwargs):
-        """Override do save para gerar thumbnail automaticamente"""
-        gerar_thumb_depois = False
-        if not self.pk: # Se é um novo objeto
-            gerar_thumb_depois = True
+        """Override do save para enfileirar a geração do thumbnail"""
+        # A miniatura é gerada pelo worker (manage.py thumbnail_worker), fora do request
+        if not self.pk:
+            self.thumbnail_status = 'CONCLUIDO' if self.thumbnail else 'PENDENTE'
         
         super().save(*args, **kwargs)
-        
-        # Gera thumbnail se for um novo objeto, tiver PDF e não tiver thumbnail
-        if gerar_thumb_depois and self.arquivo_pdf and not self.thumbnail:
-            self.gerar_thumbnail()
+
+    def enfileirar_thumbnail(self):
+        """Coloca a publicação na fila de geração de thumbnail"""
+        self.thumbnail_status = 'PENDENTE'
+        self.thumbnail_erro = ''
+        self.thumbnail_processado_em = timezone.now()
+        PublicacaoPDF.objects.filter(pk=self.pk).update(
+            thumbnail_status=self.thumbnail_status,
+            thumbnail_erro=self.thumbnail_erro,
+            thumbnail_processado_em=self.thumbnail_processado_em
+        )
 
     def gerar_thumbnail(self):
-        """Gera thumbnail da primeira página do PDF"""
-        try:
-            pdf_path = self.arquivo_pdf.path
-            pdf_document = fitz.open(pdf_path)
-            
-            first_page = pdf_document[0]
-            
-            mat = fitz.Matrix(2.0, 2.0)
-            pix = first_page.get_pixmap(matrix=mat)
-            
-            img_data = pix.tobytes("png")
-            img = Image.open(BytesIO(img_data))
-            
-            img.thumbnail((400, 600), Image.Resampling.LANCZOS)
-            
-            buffer = BytesIO()
-            img.save(buffer, format='PNG', optimize=True, quality=85)
-            buffer.seek(0)
-            
-            thumbnail_name = f"thumb_{os.path.splitext(os.path.basename(self.arquivo_pdf.name))[0]}.png"
-            
-            self.thumbnail.save(
-                thumbnail_name,
-                ContentFile(buffer.getvalue()),
-                save=False
-            )
-            
-            super().save(update_fields=['thumbnail'])
-            
-            pdf_document.close()
-            
-        except Exception as e:
-            print(f"Erro ao gerar thumbnail para {self.titulo}: {str(e)}")
+        """Gera thumbnail da primeira página do PDF e registra o status da tarefa"""
+        hash_pdf, conteudo, erro = processar_pdf(self.arquivo_pdf.path)
+        if not conteudo:
+            logger.error("Erro ao gerar thumbnail para %s: %s", self.titulo, erro)
+        return self.registrar_thumbnail(conteudo, hash_pdf, erro)
+    
+    def registrar_thumbnail(self, conteudo, hash_pdf='', erro='', arquivo_pdf=None, status='PROCESSANDO'):
+        """
+        Salva a miniatura renderizada (ou o erro da renderização) na publicação.
+        Só grava se a publicação continua com o `status` e o `arquivo_pdf` de
+        quando a renderização começou (por padrão: reservada pelo worker, com o
+        PDF atual). Se o PDF foi trocado no meio, ele voltou para a fila e o
+        resultado é descartado. Retorna True se a miniatura foi salva.
+        """
+        if arquivo_pdf is None:
+            arquivo_pdf = self.arquivo_pdf.name
+        campos = {'thumbnail_processado_em': timezone.now()}
+        if conteudo:
+            campos.update(thumbnail_status='CONCLUIDO', thumbnail_erro='', thumbnail_hash=hash_pdf)
+        else:
+            campos.update(thumbnail_status='ERRO', thumbnail_erro=erro)
+        
+        with transaction.atomic():
+            gravadas = PublicacaoPDF.objects.filter(
+                pk=self.pk, thumbnail_status=status, arquivo_pdf=arquivo_pdf
+            ).update(**campos)
+            if not gravadas:
+                return False
+            if conteudo:
+                thumbnail_name = f"thumb_{os.path.splitext(os.path.basename(arquivo_pdf))[0]}.png"
+                self.thumbnail.save(thumbnail_name, ContentFile(conteudo), save=False)
+                PublicacaoPDF.objects.filter(pk=self.pk).update(thumbnail=self.thumbnail.name)
+        
+        for campo, valor in campos.items():
+            setattr(self, campo, valor)
+        return self.thumbnail_status == 'CONCLUIDO'
+    
+    def get_organizadores_ativos(self):
+        """
+        Organizadores ativos; usa o pré-carregamento de com_organizadores() ou
+        de prefetch_related('organizadores') se houver
+        """
+        if not hasattr(self, 'organizadores_ativos'):
+            if 'organizadores' in getattr(self, '_prefetched_objects_cache', {}):
+                self.organizadores_ativos = [org for org in self.organizadores.all() if org.ativo]
+            else:
+                self.organizadores_ativos = list(self.organizadores.filter(ativo=True))
+        return self.organizadores_ativos
     
     def get_organizadores_display(self):
         """Retorna string formatada com os nomes dos organizadores de forma segura."""
-        # Primeiro, converte o QuerySet para uma lista. Isso permite usar índices negativos.
-        organizadores_lista = list(self.organizadores.filter(ativo=True))
-        count = len(organizadores_lista)
+        return self.organizadores_nomes or "Sem organizadores"
+    
+    def montar_organizadores_nomes(self):
+        """Nomes dos organizadores ativos no formato "A, B e C" ('' se não houver)"""
+        nomes = [org.nome for org in self.get_organizadores_ativos()]
+        if len(nomes) < 2:
+            return ''.join(nomes)
+        return f"{', '.join(nomes[:-1])} e {nomes[-1]}"
+    
+    def atualizar_organizadores_nomes(self):
+        """Recalcula `organizadores_nomes` após mudar os organizadores"""
+        # Descarta a lista de organizadores ativos já lida, que pode estar desatualizada
+        self.__dict__.pop('organizadores_ativos', None)
+        getattr(self, '_prefetched_objects_cache', {}).pop('organizadores', None)
+        self.organizadores_nomes = self.montar_organizadores_nomes()
+        PublicacaoPDF.objects.filter(pk=self.pk).update(organizadores_nomes=self.organizadores_nomes)
 
-        if count == 0:
-            return "Sem organizadores"
-        elif count == 1:
-            return organizadores_lista[0].nome
-        elif count == 2:
-            # Acessando a lista, não o queryset
-            return f"{organizadores_lista[0].nome} e {organizadores_lista[1].nome}"
-        else:
-            # O fatiamento e a indexação agora são feitos na lista, o que é seguro
-            nomes_iniciais = [org.nome for org in organizadores_lista[:-1]]
-            ultimo_nome = organizadores_lista[-1].nome
-            return f"{', '.join(nomes_iniciais)} e {ultimo_nome}"
-
-    def incrementar_download(self):
-        """Incrementa o contador de downloads"""
-        self.downloads += 1
-        self.save(update_fields=['downloads'])
+    def incrementar_download(self, quantidade=1):
+        """
+        Incrementa o contador de downloads com um UPDATE atômico (F()).
+        As views usam o buffer de publicacoes/downloads.py, que agrupa as gravações.
+        """
+        DownloadDiario.registrar(self.pk, timezone.localdate(), quantidade)
+        self.downloads += quantidade
     
     @property
     def titulo_completo(self):
@@ -313,6 +447,195 @@ class PublicacaoPDF(models.Model):
         return reverse('publicacoes:detalhes', args=[str(self.id)])
 
 
+class DownloadDiario(models.Model):
+    """Quantidade de downloads de uma publicação em um dia"""
+    publicacao = models.ForeignKey(
+        PublicacaoPDF,
+        on_delete=models.CASCADE,
+        related_name='downloads_diarios',
+        verbose_name="Publicação"
+    )
+    
+    data = models.DateField(
+        verbose_name="Data"
+    )
+    
+    quantidade = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Downloads"
+    )
+    
+    class Meta:
+        verbose_name = "Download Diário"
+        verbose_name_plural = "Downloads Diários"
+        ordering = ['-data']
+        constraints = [
+            models.UniqueConstraint(fields=['publicacao', 'data'], name='download_diario_unico'),
+        ]
+    
+    def __str__(self):
+        return f"{self.publicacao_id} em {self.data}: {self.quantidade}"
+    
+    @classmethod
+    def registrar(cls, publicacao_id, data, quantidade):
+        """
+        Soma `quantidade` downloads ao total da publicação e ao dia informado.
+        Retorna False se a publicação não existe mais.
+        """
+        with transaction.atomic():
+            atualizadas = PublicacaoPDF.objects.filter(pk=publicacao_id).update(
+                downloads=F('downloads') + quantidade
+            )
+            if not atualizadas:
+                return False
+            
+            dia = cls.objects.filter(publicacao_id=publicacao_id, data=data)
+            if not dia.update(quantidade=F('quantidade') + quantidade):
+                try:
+                    with transaction.atomic():
+                        cls.objects.create(publicacao_id=publicacao_id, data=data, quantidade=quantidade)
+                except IntegrityError:
+                    # Outro processo criou a linha do dia ao mesmo tempo
+                    dia.update(quantidade=F('quantidade') + quantidade)
+            EstatisticasPublicacoes.somar_downloads(publicacao_id, quantidade)
+        return True
+
+
+class EstatisticasPublicacoes(models.Model):
+    """
+    Estatísticas da página de publicações, pré-calculadas em uma única linha.
+
+    As páginas e a API leem a linha com obter() em uma consulta. Os signals
+    (publicacoes/signals.py) marcam a linha como desatualizada quando uma
+    publicação ou organizador muda, e ela é recalculada na leitura seguinte;
+    os downloads são somados diretamente. O comando recalcular_estatisticas
+    refaz tudo periodicamente (e depois de cargas com bulk_create).
+    """
+    total_publicacoes = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Publicações ativas"
+    )
+    
+    total_organizadores = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Organizadores"
+    )
+    
+    anos_publicacao = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Anos com publicações"
+    )
+    
+    downloads_total = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name="Downloads"
+    )
+    
+    categoria_mais_comum = models.CharField(
+        max_length=20,
+        choices=PublicacaoPDF.CATEGORIA_CHOICES,
+        blank=True,
+        verbose_name="Categoria mais comum"
+    )
+    
+    categoria_mais_comum_total = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Publicações da categoria mais comum"
+    )
+    
+    desatualizada = models.BooleanField(
+        default=False,
+        verbose_name="Desatualizada"
+    )
+    
+    versao = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Versão",
+        help_text="Incrementada a cada alteração, para não gravar um recálculo feito com dados antigos"
+    )
+    
+    atualizado_em = models.DateTimeField(
+        default=timezone.now,
+        verbose_name="Calculado em"
+    )
+    
+    class Meta:
+        verbose_name = "Estatísticas das Publicações"
+        verbose_name_plural = "Estatísticas das Publicações"
+    
+    def __str__(self):
+        return f"Estatísticas de {self.atualizado_em:%d/%m/%Y %H:%M}"
+    
+    @classmethod
+    def obter(cls):
+        """Linha de estatísticas, recalculada só se estiver desatualizada"""
+        estatisticas = cls.objects.filter(pk=1).first()
+        if estatisticas is None or estatisticas.desatualizada:
+            estatisticas = cls.recalcular()
+        return estatisticas
+    
+    @classmethod
+    def recalcular(cls):
+        """Recalcula todas as estatísticas a partir das publicações"""
+        versao = cls.objects.filter(pk=1).values_list('versao', flat=True).first()
+        
+        ativas = PublicacaoPDF.objects.filter(ativa=True)
+        valores = ativas.aggregate(
+            total_publicacoes=Count('pk'),
+            anos_publicacao=Count('ano_publicacao', distinct=True),
+            downloads_total=Coalesce(Sum('downloads'), 0),
+        )
+        valores['total_organizadores'] = Organizador.objects.filter(
+            publicacoes__ativa=True, ativo=True
+        ).distinct().count()
+        categoria = ativas.values('categoria').annotate(
+            total=Count('pk')
+        ).order_by('-total', 'categoria').first()
+        valores['categoria_mais_comum'] = categoria['categoria'] if categoria else ''
+        valores['categoria_mais_comum_total'] = categoria['total'] if categoria else 0
+        valores['atualizado_em'] = timezone.now()
+        
+        if versao is None:
+            versao = 0
+            try:
+                with transaction.atomic():
+                    cls.objects.create(pk=1, **valores)
+            except IntegrityError:
+                # Outro processo criou a linha ao mesmo tempo
+                cls.objects.filter(pk=1, versao=versao).update(desatualizada=False, **valores)
+        else:
+            # Se a linha foi invalidada durante o cálculo, continua desatualizada
+            cls.objects.filter(pk=1, versao=versao).update(desatualizada=False, **valores)
+        
+        return cls(pk=1, versao=versao, **valores)
+    
+    @classmethod
+    def invalidar(cls):
+        """Marca as estatísticas para serem recalculadas na próxima leitura"""
+        cls.objects.filter(pk=1).update(desatualizada=True, versao=F('versao') + 1)
+    
+    @classmethod
+    def somar_downloads(cls, publicacao_id, quantidade):
+        """
+        Soma os downloads ao total se a publicação está ativa (como em recalcular()).
+        A versão também muda, para um recálculo já em andamento não gravar por cima.
+        """
+        ativa = PublicacaoPDF.objects.filter(pk=publicacao_id, ativa=True)
+        cls.objects.filter(Exists(ativa), pk=1).update(
+            downloads_total=F('downloads_total') + quantidade,
+            versao=F('versao') + 1
+        )
+    
+    def como_contexto(self):
+        """Variáveis usadas pelo template publicacoes.html"""
+        return {
+            'total_publicacoes': self.total_publicacoes,
+            'total_organizadores': self.total_organizadores,
+            'anos_publicacao': self.anos_publicacao,
+            'categoria_mais_comum': {'nome': self.get_categoria_mais_comum_display() or 'N/A'},
+        }
+
+
 class ConfiguracaoPaginaPublicacoes(models.Model):
     """Modelo para configurações gerais da página de publicações"""
     titulo_pagina = models.CharField(
@@ -377,4 +700,9 @@ class ConfiguracaoPaginaPublicacoes(models.Model):
         if self.ativa:
             # Exclui o objeto atual da consulta para evitar problemas em updates
             ConfiguracaoPaginaPublicacoes.objects.exclude(pk=self.pk).filter(ativa=True).update(ativa=False)
-        super().save(*args, **kwargs)
\ No newline at end of file
+        super().save(*args, **kwargs)
+    
+    @classmethod
+    def atual(cls):
+        """Configuração ativa, lida do cache (langue/configuracoes.py)"""
+        return configuracoes.obter(cls, cls.objects.filter(ativa=True).first)
\ No newline at end of file
@@ -23,6 +23,9 @@ class OrganizadorSerializer(serializers.ModelSerializer):
     
     def get_total_publicacoes(self, obj):
         """Retorna o total de publicações ativas do organizador"""
+        # Anotado por Organizador.objects.com_total_publicacoes(); sem a anotação, conta no banco
+        if hasattr(obj, 'num_publicacoes'):
+            return obj.num_publicacoes
         return obj.publicacoes.filter(ativa=True).count()
 
 
@@ -37,7 +40,9 @@ class OrganizadorSimplificadoSerializer(serializers.ModelSerializer):
 class PublicacaoPDFSerializer(serializers.ModelSerializer):
     """Serializer para o modelo PublicacaoPDF"""
     
-    organizadores = OrganizadorSimplificadoSerializer(many=True, read_only=True)
+    organizadores = OrganizadorSimplificadoSerializer(
+        source='get_organizadores_ativos', many=True, read_only=True
+    )
     categoria_display = serializers.CharField(source='get_categoria_display', read_only=True)
     titulo_completo = serializers.CharField(read_only=True)
     organizadores_display = serializers.CharField(source='get_organizadores_display', read_only=True)
@@ -0,0 +1,107 @@
+"""
+Signals que mantêm as estatísticas das publicações e
+PublicacaoPDF.organizadores_nomes atualizados e descartam a configuração da
+página em cache
+"""
+from django.db.models.signals import post_save, pre_delete, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from langue import configuracoes
+from .models import PublicacaoPDF, Organizador, EstatisticasPublicacoes, ConfiguracaoPaginaPublicacoes
+
+
+# Campos que alteram as estatísticas; saves restritos a outros campos
+# (thumbnail, por exemplo) não invalidam a linha
+CAMPOS_ESTATISTICAS = {
+    PublicacaoPDF: {'ativa', 'ano_publicacao', 'categoria', 'downloads'},
+    Organizador: {'ativo'},
+}
+
+
+@receiver(post_save, sender=PublicacaoPDF)
+@receiver(post_save, sender=Organizador)
+def invalidar_ao_salvar(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Marca as estatísticas como desatualizadas ao salvar"""
+    if raw:
+        return
+    if update_fields is not None and not CAMPOS_ESTATISTICAS[sender] & set(update_fields):
+        return
+    EstatisticasPublicacoes.invalidar()
+
+
+@receiver(post_delete, sender=PublicacaoPDF)
+@receiver(post_delete, sender=Organizador)
+def invalidar_ao_excluir(sender, instance, **kwargs):
+    """Marca as estatísticas como desatualizadas ao excluir"""
+    EstatisticasPublicacoes.invalidar()
+
+
+@receiver(m2m_changed, sender=PublicacaoPDF.organizadores.through)
+def invalidar_organizadores(sender, action, **kwargs):
+    """Organizadores adicionados ou removidos mudam o total de organizadores"""
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        EstatisticasPublicacoes.invalidar()
+
+
+@receiver(post_save, sender=ConfiguracaoPaginaPublicacoes)
+@receiver(post_delete, sender=ConfiguracaoPaginaPublicacoes)
+def invalidar_configuracao(sender, **kwargs):
+    """A próxima leitura de ConfiguracaoPaginaPublicacoes.atual() vai ao banco"""
+    configuracoes.invalidar(sender)
+
+
+@receiver(m2m_changed, sender=PublicacaoPDF.organizadores.through)
+def atualizar_organizadores_nomes(sender, instance, action, reverse, pk_set, **kwargs):
+    """Recalcula os nomes das publicações cujos organizadores mudaram"""
+    if action == 'pre_clear' and reverse:
+        # Em um clear reverso o pk_set não é informado, então guardamos os ids antes
+        instance._publicacoes_organizadores_nomes = list(instance.publicacoes.values_list('pk', flat=True))
+        return
+
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if not reverse:
+        instance.atualizar_organizadores_nomes()
+    else:
+        if action == 'post_clear':
+            pk_set = getattr(instance, '_publicacoes_organizadores_nomes', [])
+        PublicacaoPDF.objects.filter(pk__in=pk_set).atualizar_organizadores_nomes()
+
+
+@receiver(post_save, sender=PublicacaoPDF)
+def corrigir_organizadores_nomes(sender, instance, created=False, raw=False, update_fields=None, **kwargs):
+    """
+    Um save() completo grava o organizadores_nomes que a instância tinha ao ser
+    lida, que fica velho se os organizadores mudaram depois (pelo lado do
+    organizador, por exemplo): recalcula a coluna a partir do banco
+    """
+    if created or raw:
+        return
+    if update_fields is not None and 'organizadores_nomes' not in update_fields:
+        return
+    instance.atualizar_organizadores_nomes()
+
+
+@receiver(post_save, sender=Organizador)
+def atualizar_nome_organizador(sender, instance, created=False, raw=False, update_fields=None, **kwargs):
+    """Nome novo ou organizador ativado/desativado mudam os nomes das publicações dele"""
+    if created or raw:
+        return
+    if update_fields is not None and not {'nome', 'ativo'} & set(update_fields):
+        return
+    instance.publicacoes.all().atualizar_organizadores_nomes()
+
+
+@receiver(pre_delete, sender=Organizador)
+def guardar_publicacoes_organizador(sender, instance, **kwargs):
+    """As ligações somem na exclusão sem m2m_changed: guarda as publicações antes"""
+    instance._publicacoes_organizadores_nomes = list(instance.publicacoes.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Organizador)
+def remover_nome_organizador(sender, instance, **kwargs):
+    """Tira o organizador excluído dos nomes das publicações dele"""
+    PublicacaoPDF.objects.filter(
+        pk__in=getattr(instance, '_publicacoes_organizadores_nomes', [])
+    ).atualizar_organizadores_nomes()
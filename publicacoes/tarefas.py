@@ -0,0 +1,37 @@
+"""
+Fila de geração de thumbnails das publicações
+
+A fila é a própria tabela de PublicacaoPDF (langue/filas.py): o campo
+thumbnail_status indica o que está pendente, e cada worker reserva as
+publicações com um UPDATE condicional (PENDENTE -> PROCESSANDO).
+"""
+from django.utils import timezone
+
+from langue.filas import Fila
+from .models import PublicacaoPDF
+
+
+def processar_thumbnail(publicacao):
+    """Gera o thumbnail de uma publicação reservada. Retorna True em caso de sucesso"""
+    if not publicacao.arquivo_pdf:
+        PublicacaoPDF.objects.filter(pk=publicacao.pk).update(
+            thumbnail_status='ERRO',
+            thumbnail_erro='Publicação sem arquivo PDF',
+            thumbnail_processado_em=timezone.now()
+        )
+        return False
+
+    return publicacao.gerar_thumbnail()
+
+
+fila = Fila(
+    PublicacaoPDF, processar_thumbnail, 'thumbnail_status', 'thumbnail_processado_em',
+    ordenacao='criado_em',
+)
+liberar_travados = fila.liberar_travados
+processar_pendentes = fila.processar_pendentes
+
+
+def reservar_pendentes(limite):
+    """Reserva até `limite` publicações pendentes e retorna seus ids"""
+    return [pk for _, pk in fila.reservar_pendentes(limite)]
@@ -274,10 +274,9 @@ def criar_dados_teste():
     print("\n⚠️ Nota: Para que as miniaturas sejam geradas automaticamente,")
     print("   você precisará fazer upload de arquivos PDF reais através do admin.")
 
-# Executar a função
-if __name__ == '__main__':
-    criar_dados_teste()
-else:
-    # Quando executado via exec() no Django shell
+# Executar a função (também via exec() no Django shell). Importado como
+# módulo, pela busca de testes do manage.py test, não faz nada: rodaria no
+# banco de desenvolvimento
+if __name__ != 'publicacoes.test_data':
     criar_dados_teste()
 
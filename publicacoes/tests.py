@@ -1,8 +1,19 @@
-from django.test import TestCase, Client
+from django.test import TestCase, TransactionTestCase, Client, override_settings
 from django.urls import reverse
 from django.contrib.auth.models import User
+from django.core.management import call_command
 from django.core.files.uploadedfile import SimpleUploadedFile
-from .models import PublicacaoPDF, Organizador, ConfiguracaoPaginaPublicacoes
+from django.utils import timezone
+from django.core.cache import cache
+from langue import configuracoes
+from .models import PublicacaoPDF, Organizador, ConfiguracaoPaginaPublicacoes, DownloadDiario, EstatisticasPublicacoes
+from . import downloads
+from .tarefas import processar_pendentes, reservar_pendentes
+from io import StringIO
+from unittest import mock
+import json
+import fitz
+import shutil
 import tempfile
 import os
 
@@ -102,6 +113,128 @@ class PublicacaoPDFModelTest(TestCase):
         downloads_inicial = self.publicacao.downloads
         self.publicacao.incrementar_download()
         self.assertEqual(self.publicacao.downloads, downloads_inicial + 1)
+        
+        # A gravação é um UPDATE com F(), então uma instância desatualizada não sobrescreve o total
+        copia = PublicacaoPDF.objects.get(pk=self.publicacao.pk)
+        self.publicacao.incrementar_download()
+        copia.incrementar_download()
+        copia.refresh_from_db()
+        self.assertEqual(copia.downloads, downloads_inicial + 3)
+        self.assertEqual(self.publicacao.downloads_diarios.get().quantidade, 3)
+
+
+class FilaThumbnailTest(TransactionTestCase):
+    """Testes para a fila de geração de thumbnails (TransactionTestCase: as threads do worker usam conexões próprias)"""
+    
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.override = override_settings(MEDIA_ROOT=self.media_root)
+        self.override.enable()
+        
+        documento = fitz.open()
+        pagina = documento.new_page()
+        pagina.insert_text((72, 72), "Publicação de teste")
+        conteudo = documento.tobytes()
+        documento.close()
+        
+        self.publicacao = PublicacaoPDF.objects.create(
+            titulo="Publicação com PDF",
+            categoria="LIVRO",
+            ano_publicacao=2024,
+            arquivo_pdf=SimpleUploadedFile("real.pdf", conteudo, content_type="application/pdf")
+        )
+    
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+    
+    def test_upload_nao_gera_thumbnail_na_requisicao(self):
+        """O thumbnail fica pendente até o worker processar"""
+        self.assertEqual(self.publicacao.thumbnail_status, 'PENDENTE')
+        self.assertFalse(self.publicacao.thumbnail)
+    
+    def test_reserva_nao_repete_publicacao(self):
+        """Uma publicação reservada não é entregue a outro worker"""
+        self.assertEqual(reservar_pendentes(10), [self.publicacao.pk])
+        self.assertEqual(reservar_pendentes(10), [])
+    
+    def test_processar_pendentes(self):
+        """O worker gera o thumbnail e marca a publicação como concluída"""
+        self.assertEqual(processar_pendentes(threads=2, limite=10), (1, 0))
+        self.publicacao.refresh_from_db()
+        self.assertEqual(self.publicacao.thumbnail_status, 'CONCLUIDO')
+        self.assertTrue(self.publicacao.thumbnail)
+    
+    def test_pdf_invalido_marca_erro(self):
+        """Falhas de renderização ficam registradas na publicação"""
+        self.publicacao.arquivo_pdf.save("invalido.pdf", SimpleUploadedFile("invalido.pdf", b"nao e pdf"))
+        self.publicacao.enfileirar_thumbnail()
+        with self.assertLogs('publicacoes.models', level='ERROR'):
+            self.assertEqual(processar_pendentes(threads=2, limite=10), (0, 1))
+        self.publicacao.refresh_from_db()
+        self.assertEqual(self.publicacao.thumbnail_status, 'ERRO')
+        self.assertNotEqual(self.publicacao.thumbnail_erro, '')
+    
+    def test_pdf_trocado_durante_o_processamento(self):
+        """O thumbnail do PDF antigo é descartado se o arquivo mudou enquanto era renderizado"""
+        self.assertEqual(reservar_pendentes(10), [self.publicacao.pk])
+        do_worker = PublicacaoPDF.objects.get(pk=self.publicacao.pk)
+
+        self.publicacao.arquivo_pdf.save("novo.pdf", SimpleUploadedFile("novo.pdf", b"%PDF-1.4"))
+        self.publicacao.enfileirar_thumbnail()
+
+        self.assertFalse(do_worker.gerar_thumbnail())
+        self.publicacao.refresh_from_db()
+        self.assertEqual(self.publicacao.thumbnail_status, 'PENDENTE')
+        self.assertFalse(self.publicacao.thumbnail)
+
+    def test_regenerate_thumbnails_pula_pdf_inalterado(self):
+        """O comando só renderiza de novo PDFs cujo conteúdo mudou"""
+        saida = StringIO()
+        call_command('regenerate_thumbnails', processos=1, stdout=saida)
+        self.assertIn('1 thumbnail(s) renderizado(s), 0 sem alteração', saida.getvalue())
+        self.publicacao.refresh_from_db()
+        self.assertEqual(self.publicacao.thumbnail_status, 'CONCLUIDO')
+        self.assertEqual(len(self.publicacao.thumbnail_hash), 64)
+        
+        saida = StringIO()
+        call_command('regenerate_thumbnails', processos=1, stdout=saida)
+        self.assertIn('0 thumbnail(s) renderizado(s), 1 sem alteração', saida.getvalue())
+    
+    def test_regenerate_thumbnails_erro_e_publicacao_excluida(self):
+        """Erros saem uma vez, no stderr; publicações excluídas durante a renderização são puladas"""
+        invalida = PublicacaoPDF.objects.create(
+            titulo="PDF inválido", ano_publicacao=2024,
+            arquivo_pdf=SimpleUploadedFile("invalido.pdf", b"nao e pdf", content_type="application/pdf")
+        )
+        saida, erros = StringIO(), StringIO()
+        call_command('regenerate_thumbnails', invalida.pk, processos=1, stdout=saida, stderr=erros)
+        self.assertIn('0 thumbnail(s) renderizado(s), 0 sem alteração, 1 erro(s)', saida.getvalue())
+        self.assertEqual(erros.getvalue().count(f'Publicação {invalida.pk}:'), 1)
+        self.assertNotIn('Erro ao gerar thumbnail', saida.getvalue())
+        
+        saida = StringIO()
+        with mock.patch.object(PublicacaoPDF.objects, 'in_bulk', return_value={}):
+            call_command('regenerate_thumbnails', processos=1, forcar=True, stdout=saida)
+        self.assertIn('0 thumbnail(s) renderizado(s), 0 sem alteração, 0 erro(s)', saida.getvalue())
+
+
+class GravacaoDownloadsTest(TransactionTestCase):
+    """O buffer de downloads é gravado pelo temporizador (em outra thread), sem esperar outro clique"""
+    
+    @override_settings(DOWNLOADS_INTERVALO_GRAVACAO=0.05)
+    def test_temporizador_grava_sem_novo_download(self):
+        publicacao = PublicacaoPDF.objects.create(titulo="Anais", ano_publicacao=2024)
+        downloads.descarregar()
+        downloads.registrar(publicacao.pk)
+        temporizador = downloads._temporizador
+        self.assertIsNotNone(temporizador)
+        temporizador.join(5)
+        
+        publicacao.refresh_from_db()
+        self.assertEqual(publicacao.downloads, 1)
+        self.assertEqual(downloads.pendentes(publicacao.pk), 0)
+        self.assertIsNone(downloads._temporizador)
 
 
 class PublicacoesViewTest(TestCase):
@@ -162,10 +295,34 @@ class PublicacoesViewTest(TestCase):
         response = self.client.post(url)
         
         self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['downloads'], 1)
         
-        # Verificar se o download foi incrementado
+        # O download fica no buffer até a próxima gravação em lote
+        downloads.descarregar()
         self.publicacao.refresh_from_db()
         self.assertEqual(self.publicacao.downloads, 1)
+        self.assertEqual(
+            DownloadDiario.objects.get(publicacao=self.publicacao, data=timezone.localdate()).quantidade,
+            1
+        )
+    
+    @override_settings(DOWNLOADS_INTERVALO_GRAVACAO=3600)
+    def test_downloads_gravados_em_lote(self):
+        """Vários downloads viram uma única gravação por publicação e dia"""
+        downloads.descarregar()
+        url = reverse('publicacoes:incrementar_download', args=[self.publicacao.id])
+        api_url = reverse('publicacoes:publicacaopdf-incrementar-download', args=[self.publicacao.id])
+        
+        # Cada requisição só lê a publicação; nenhuma escrita até a gravação do buffer
+        with self.assertNumQueries(3):
+            self.client.post(url)
+            self.client.post(url)
+            response = self.client.post(api_url)
+        self.assertEqual(response.json()['downloads'], 3)
+        
+        self.assertEqual(downloads.descarregar(), 3)
+        self.publicacao.refresh_from_db()
+        self.assertEqual(self.publicacao.downloads, 3)
     
     def test_buscar_publicacoes_ajax(self):
         """Testa o endpoint AJAX de busca"""
@@ -178,6 +335,68 @@ class PublicacoesViewTest(TestCase):
         self.assertTrue(len(data['results']) > 0)
 
 
+class EstatisticasPublicacoesTest(TestCase):
+    """Testes para as estatísticas pré-calculadas"""
+    
+    def setUp(self):
+        self.organizador = Organizador.objects.create(nome="Dra. Estatística")
+        self.publicacao = PublicacaoPDF.objects.create(
+            titulo="Anais", categoria="ANAIS", ano_publicacao=2023, downloads=5
+        )
+        self.publicacao.organizadores.add(self.organizador)
+        PublicacaoPDF.objects.create(titulo="Livro", categoria="LIVRO", ano_publicacao=2024)
+        PublicacaoPDF.objects.create(titulo="Outros anais", categoria="ANAIS", ano_publicacao=2024)
+    
+    def test_recalcular(self):
+        estatisticas = EstatisticasPublicacoes.recalcular()
+        self.assertEqual(estatisticas.total_publicacoes, 3)
+        self.assertEqual(estatisticas.total_organizadores, 1)
+        self.assertEqual(estatisticas.anos_publicacao, 2)
+        self.assertEqual(estatisticas.downloads_total, 5)
+        self.assertEqual(estatisticas.categoria_mais_comum, 'ANAIS')
+        self.assertEqual(estatisticas.categoria_mais_comum_total, 2)
+    
+    def test_leitura_em_uma_consulta(self):
+        """Com a linha atualizada, as estatísticas custam uma consulta"""
+        EstatisticasPublicacoes.recalcular()
+        with self.assertNumQueries(1):
+            self.client.get(reverse('publicacoes:publicacaopdf-estatisticas'))
+    
+    def test_signals_invalidam(self):
+        """Alterar uma publicação faz a próxima leitura recalcular"""
+        EstatisticasPublicacoes.recalcular()
+        self.publicacao.ativa = False
+        self.publicacao.save()
+        self.assertTrue(EstatisticasPublicacoes.objects.get().desatualizada)
+        self.assertEqual(EstatisticasPublicacoes.obter().total_publicacoes, 2)
+        self.assertFalse(EstatisticasPublicacoes.objects.get().desatualizada)
+    
+    def test_downloads_somados_sem_recalculo(self):
+        EstatisticasPublicacoes.recalcular()
+        self.publicacao.incrementar_download(3)
+        estatisticas = EstatisticasPublicacoes.objects.get()
+        self.assertFalse(estatisticas.desatualizada)
+        self.assertEqual(estatisticas.downloads_total, 8)
+    
+    def test_downloads_de_publicacao_inativa_fora_do_total(self):
+        """O total somado é o mesmo que o recálculo chegaria"""
+        inativa = PublicacaoPDF.objects.create(titulo="Rascunho", ano_publicacao=2024, ativa=False)
+        EstatisticasPublicacoes.recalcular()
+        inativa.incrementar_download(4)
+        self.assertEqual(EstatisticasPublicacoes.objects.get().downloads_total, 5)
+        self.assertEqual(EstatisticasPublicacoes.recalcular().downloads_total, 5)
+    
+    def test_recalculo_antigo_nao_apaga_downloads(self):
+        """Downloads gravados durante um recálculo não são perdidos"""
+        EstatisticasPublicacoes.recalcular()
+        versao = EstatisticasPublicacoes.objects.get().versao
+        self.publicacao.incrementar_download(3)
+        # Gravação de um recálculo que leu a versão antes dos downloads
+        gravadas = EstatisticasPublicacoes.objects.filter(pk=1, versao=versao).update(downloads_total=5)
+        self.assertEqual(gravadas, 0)
+        self.assertEqual(EstatisticasPublicacoes.objects.get().downloads_total, 8)
+
+
 class ConfiguracaoPaginaTest(TestCase):
     """Testes para o modelo ConfiguracaoPaginaPublicacoes"""
     
@@ -199,6 +418,28 @@ class ConfiguracaoPaginaTest(TestCase):
         config1.refresh_from_db()
         self.assertFalse(config1.ativa)
         self.assertTrue(config2.ativa)
+    
+    def test_configuracao_em_cache(self):
+        """atual() só vai ao banco na primeira leitura e depois de uma alteração"""
+        cache.clear()
+        configuracoes.limpar()
+        config = ConfiguracaoPaginaPublicacoes.objects.create(titulo_pagina="Publicações", ativa=True)
+        
+        with self.assertNumQueries(1):
+            ConfiguracaoPaginaPublicacoes.atual()
+            self.assertEqual(ConfiguracaoPaginaPublicacoes.atual().titulo_pagina, "Publicações")
+        
+        # Outro processo, sem a cópia em memória, lê do cache compartilhado
+        configuracoes.limpar()
+        with self.assertNumQueries(0):
+            ConfiguracaoPaginaPublicacoes.atual()
+        
+        config.titulo_pagina = "Acervo"
+        config.save()
+        self.assertEqual(ConfiguracaoPaginaPublicacoes.atual().titulo_pagina, "Acervo")
+        
+        config.delete()
+        self.assertIsNone(ConfiguracaoPaginaPublicacoes.atual())
 
 
 class AdminTest(TestCase):
@@ -269,4 +510,109 @@ class APITest(TestCase):
         data = response.json()
         self.assertIn('total_publicacoes', data)
         self.assertIn('total_organizadores', data)
+    
+    def test_api_por_ano_em_streaming(self):
+        """O endpoint por_ano é gerado aos pedaços, no formato [{ano, publicacoes}]"""
+        PublicacaoPDF.objects.create(titulo="Anais 2022", ano_publicacao=2022, ativa=True)
+        response = self.client.get(reverse('publicacoes:publicacaopdf-por-ano'))
+        
+        self.assertTrue(response.streaming)
+        data = json.loads(response.getvalue())
+        self.assertEqual([grupo['ano'] for grupo in data], [2024, 2022])
+        self.assertEqual(data[0]['publicacoes'][0]['organizadores'][0]['nome'], "Dr. API Teste")
+    
+    def test_api_organizadores_ativos_pre_carregados(self):
+        """Organizadores ativos vêm de um único pré-carregamento, qualquer que seja o número de publicações"""
+        inativo = Organizador.objects.create(nome="Dr. Inativo", ativo=False)
+        self.publicacao.organizadores.add(inativo)
+        for numero in range(3):
+            outra = PublicacaoPDF.objects.create(titulo=f"Outra {numero}", ano_publicacao=2023, ativa=True)
+            outra.organizadores.add(self.organizador)
+        
+        with self.assertNumQueries(2):
+            data = self.client.get(reverse('publicacoes:publicacaopdf-list')).json()
+        publicacao = next(p for p in data['results'] if p['id'] == self.publicacao.pk)
+        self.assertEqual([o['nome'] for o in publicacao['organizadores']], ["Dr. API Teste"])
+        self.assertEqual(publicacao['organizadores_display'], "Dr. API Teste")
+
+
+class OrganizadoresNomesTest(TestCase):
+    """organizadores_nomes acompanha as mudanças nos organizadores de cada publicação"""
+
+    def setUp(self):
+        self.ana = Organizador.objects.create(nome="Ana Costa")
+        self.bruno = Organizador.objects.create(nome="Bruno Dias")
+        self.carla = Organizador.objects.create(nome="Carla Reis")
+        self.publicacao = PublicacaoPDF.objects.create(titulo="Anais", ano_publicacao=2024)
+        self.publicacao.organizadores.add(self.ana, self.bruno, self.carla)
+
+    def nomes(self):
+        return PublicacaoPDF.objects.get(pk=self.publicacao.pk).get_organizadores_display()
+
+    def test_organizadores_adicionados(self):
+        self.assertEqual(self.publicacao.get_organizadores_display(), "Ana Costa, Bruno Dias e Carla Reis")
+        self.assertEqual(self.nomes(), "Ana Costa, Bruno Dias e Carla Reis")
+
+    def test_organizador_desativado_renomeado_e_excluido(self):
+        self.carla.ativo = False
+        self.carla.save()
+        self.assertEqual(self.nomes(), "Ana Costa e Bruno Dias")
+
+        self.bruno.nome = "Bruno Dias Filho"
+        self.bruno.save(update_fields=['nome'])
+        self.assertEqual(self.nomes(), "Ana Costa e Bruno Dias Filho")
+
+        self.bruno.delete()
+        self.assertEqual(self.nomes(), "Ana Costa")
+
+    def test_sem_organizadores(self):
+        self.publicacao.organizadores.clear()
+        self.assertEqual(self.publicacao.get_organizadores_display(), "Sem organizadores")
+        self.assertEqual(self.nomes(), "Sem organizadores")
+
+    def test_save_de_instancia_antiga_mantem_nomes(self):
+        publicacao = PublicacaoPDF.objects.create(titulo="Revista", ano_publicacao=2023)
+        self.ana.publicacoes.add(publicacao)
+        self.bruno.nome = "Bruno Dias Filho"
+        self.bruno.save()
+        self.bruno.publicacoes.add(publicacao)
+        publicacao.titulo = "Revista revista"
+        publicacao.save()
+        publicacao = PublicacaoPDF.objects.get(pk=publicacao.pk)
+        self.assertEqual(publicacao.titulo, "Revista revista")
+        self.assertEqual(publicacao.get_organizadores_display(), "Ana Costa e Bruno Dias Filho")
+
+
+class PaginacaoPorCursorTest(TestCase):
+    """A API percorre o acervo por cursor, sem COUNT nem OFFSET"""
+
+    def setUp(self):
+        for numero in range(45):
+            PublicacaoPDF.objects.create(titulo=f"Publicação {numero}", ano_publicacao=2020 + numero % 2)
+        # Empates em ano e data de criação: a ordem é decidida pelo id
+        PublicacaoPDF.objects.update(criado_em=timezone.now())
+        self.esperado = list(
+            PublicacaoPDF.objects.order_by('-ano_publicacao', '-criado_em', '-id').values_list('id', flat=True)
+        )
+        self.url = reverse('publicacoes:publicacaopdf-list')
+
+    def test_percorre_e_volta(self):
+        paginas, url = [], self.url
+        while url:
+            with self.assertNumQueries(2):
+                data = self.client.get(url).json()
+            paginas.append(data)
+            url = data['next']
+
+        self.assertEqual([len(pagina['results']) for pagina in paginas], [20, 20, 5])
+        ids = [p['id'] for pagina in paginas for p in pagina['results']]
+        self.assertEqual(ids, self.esperado)
+        self.assertNotIn('count', paginas[0])
+        self.assertIsNone(paginas[0]['previous'])
+
+        anterior = self.client.get(paginas[2]['previous']).json()
+        self.assertEqual(anterior['results'], paginas[1]['results'])
+        self.assertEqual(self.client.get(anterior['previous']).json()['results'], paginas[0]['results'])
 
+    def test_cursor_invalido(self):
+        self.assertEqual(self.client.get(self.url, {'cursor': 'invalido'}).status_code, 404)
@@ -0,0 +1,56 @@
+"""
+Renderização das miniaturas de PublicacaoPDF
+
+As funções deste módulo não acessam o banco de dados, para que possam rodar
+tanto em threads do worker quanto em processos separados.
+"""
+import hashlib
+from io import BytesIO
+
+import fitz  # PyMuPDF
+from PIL import Image
+
+
+TAMANHO_MAXIMO = (400, 600)
+
+
+def renderizar_thumbnail(caminho_pdf):
+    """Renderiza a primeira página do PDF e retorna o PNG da miniatura em bytes"""
+    with fitz.open(caminho_pdf) as pdf_document:
+        first_page = pdf_document[0]
+        
+        mat = fitz.Matrix(2.0, 2.0)
+        pix = first_page.get_pixmap(matrix=mat)
+        img_data = pix.tobytes("png")
+    
+    img = Image.open(BytesIO(img_data))
+    img.thumbnail(TAMANHO_MAXIMO, Image.Resampling.LANCZOS)
+    
+    buffer = BytesIO()
+    img.save(buffer, format='PNG', optimize=True, quality=85)
+    return buffer.getvalue()
+
+
+def calcular_hash(caminho_pdf):
+    """Retorna o SHA-256 do conteúdo do PDF"""
+    sha256 = hashlib.sha256()
+    with open(caminho_pdf, 'rb') as arquivo:
+        for bloco in iter(lambda: arquivo.read(1024 * 1024), b''):
+            sha256.update(bloco)
+    return sha256.hexdigest()
+
+
+def processar_pdf(caminho_pdf, hash_anterior=''):
+    """
+    Calcula o hash do PDF e renderiza a miniatura se o conteúdo mudou.
+    Retorna uma tupla (hash, png, erro); png é None quando o hash é igual a
+    `hash_anterior` ou quando a renderização falha (e então erro é preenchido).
+    """
+    try:
+        hash_pdf = calcular_hash(caminho_pdf)
+        if hash_pdf == hash_anterior:
+            return hash_pdf, None, ''
+        return hash_pdf, renderizar_thumbnail(caminho_pdf), ''
+    except Exception as e:
+        # Devolve só a mensagem: exceções do PyMuPDF nem sempre podem ser serializadas entre processos
+        return '', None, str(e) or e.__class__.__name__
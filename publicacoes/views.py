@@ -1,7 +1,7 @@
 from django.shortcuts import render, get_object_or_404
 from django.http import JsonResponse, Http404
 from django.core.paginator import Paginator
-from django.db.models import Q, Count
+from django.db.models import Q
 from django.views.decorators.http import require_POST
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
@@ -10,8 +10,11 @@ from django.contrib import messages
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from .models import PublicacaoPDF, Organizador, ConfiguracaoPaginaPublicacoes
+from .models import PublicacaoPDF, Organizador, ConfiguracaoPaginaPublicacoes, EstatisticasPublicacoes
 from .serializers import PublicacaoPDFSerializer, OrganizadorSerializer
+from . import downloads
+from itertools import groupby
+from langue import streaming
 import json
 
 
@@ -72,9 +75,8 @@ class PublicacoesListView(ListView):
         context = super().get_context_data(**kwargs)
         
         # Configuração da página
-        try:
-            configuracao = ConfiguracaoPaginaPublicacoes.objects.get(ativa=True)
-        except ConfiguracaoPaginaPublicacoes.DoesNotExist:
+        configuracao = ConfiguracaoPaginaPublicacoes.atual()
+        if configuracao is None:
             configuracao = ConfiguracaoPaginaPublicacoes(
                 titulo_pagina="Publicações",
                 descricao_pagina="Explore nossa coleção de publicações acadêmicas em PDF."
@@ -107,54 +109,15 @@ class PublicacoesListView(ListView):
         return context
 
     def get_estatisticas(self):
-        """Calcula estatísticas das publicações de forma segura."""
-        publicacoes_ativas = PublicacaoPDF.objects.filter(ativa=True)
-        
-        # Total de publicações
-        total_publicacoes = publicacoes_ativas.count()
-        
-        # Total de organizadores únicos
-        total_organizadores = Organizador.objects.filter(
-            publicacoes__ativa=True,
-            ativo=True
-        ).distinct().count()
-        
-        # Contagem de anos distintos com publicações
-        anos_publicacao_count = publicacoes_ativas.values_list(
-            'ano_publicacao', flat=True
-        ).distinct().count()
-        
-        # Categoria mais comum (lógica corrigida e segura)
-        categoria_info = {'nome': 'N/A'} # Valor padrão
-        if publicacoes_ativas.exists():
-            # .first() é usado para pegar o primeiro item ou None, evitando erros.
-            categoria_query = publicacoes_ativas.values('categoria').annotate(
-                count=Count('categoria')
-            ).order_by('-count').first()
-            
-            if categoria_query:
-                nome_categoria = dict(PublicacaoPDF.CATEGORIA_CHOICES).get(
-                    categoria_query['categoria'], 'N/A'
-                )
-                categoria_info = {'nome': nome_categoria}
-        
-        return {
-            'total_publicacoes': total_publicacoes,
-            'total_organizadores': total_organizadores,
-            'anos_publicacao': anos_publicacao_count, # Nome da variável claro
-            'categoria_mais_comum': categoria_info,
-        }
+        """Estatísticas pré-calculadas (EstatisticasPublicacoes)"""
+        return EstatisticasPublicacoes.obter().como_contexto()
 
 
 def publicacoes_view(request):
     """View baseada em função (alternativa à ListView)"""
     # Obter configuração
-    try:
-        configuracao = ConfiguracaoPaginaPublicacoes.objects.get(ativa=True)
-        paginate_by = configuracao.publicacoes_por_pagina
-    except ConfiguracaoPaginaPublicacoes.DoesNotExist:
-        configuracao = None
-        paginate_by = 12
+    configuracao = ConfiguracaoPaginaPublicacoes.atual()
+    paginate_by = configuracao.publicacoes_por_pagina if configuracao else 12
     
     # Obter publicações
     publicacoes = PublicacaoPDF.objects.filter(ativa=True).select_related().prefetch_related('organizadores')
@@ -204,27 +167,7 @@ def publicacoes_view(request):
     # Estatísticas
     estatisticas = {}
     if configuracao and configuracao.mostrar_estatisticas:
-        publicacoes_ativas = PublicacaoPDF.objects.filter(ativa=True)
-        estatisticas['total_publicacoes'] = publicacoes_ativas.count()
-        estatisticas['total_organizadores'] = Organizador.objects.filter(
-            publicacoes__ativa=True, ativo=True
-        ).distinct().count()
-        estatisticas['anos_publicacao'] = publicacoes_ativas.values_list(
-            'ano_publicacao', flat=True
-        ).distinct().count()
-        
-        # Categoria mais comum
-        categoria_info = {'nome': 'N/A'}
-        if publicacoes_ativas.exists():
-            categoria_mais_comum = publicacoes_ativas.values('categoria').annotate(
-                count=Count('categoria')
-            ).order_by('-count').first()
-            if categoria_mais_comum:
-                categoria_nome = dict(PublicacaoPDF.CATEGORIA_CHOICES).get(
-                    categoria_mais_comum['categoria'], 'N/A'
-                )
-                categoria_info = {'nome': categoria_nome}
-        estatisticas['categoria_mais_comum'] = categoria_info
+        estatisticas = EstatisticasPublicacoes.obter().como_contexto()
     
     context = {
         'publicacoes': page_obj,
@@ -249,11 +192,11 @@ def incrementar_download(request, publicacao_id):
     """Incrementa o contador de downloads de uma publicação"""
     try:
         publicacao = get_object_or_404(PublicacaoPDF, id=publicacao_id, ativa=True)
-        publicacao.incrementar_download()
+        downloads.registrar(publicacao.pk)
         
         return JsonResponse({
             'success': True,
-            'downloads': publicacao.downloads,
+            'downloads': downloads.total(publicacao),
             'message': 'Download incrementado com sucesso'
         })
     
@@ -327,47 +270,41 @@ class PublicacaoPDFViewSet(viewsets.ReadOnlyModelViewSet):
     ordering_fields = ['ano_publicacao', 'titulo', 'downloads', 'criado_em']
     ordering = ['-ano_publicacao', '-criado_em']
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        # incrementar_download só precisa da publicação, não dos organizadores
+        if self.action == 'incrementar_download':
+            return queryset
+        return queryset.com_organizadores()
+
     @action(detail=True, methods=['post'])
     def incrementar_download(self, request, pk=None):
         """Endpoint para incrementar downloads via API"""
         publicacao = self.get_object()
-        publicacao.incrementar_download()
+        downloads.registrar(publicacao.pk)
         
         return Response({
-            'downloads': publicacao.downloads,
+            'downloads': downloads.total(publicacao),
             'message': 'Download incrementado com sucesso'
         })
 
     @action(detail=False)
     def estatisticas(self, request):
         """Endpoint para obter estatísticas das publicações"""
-        publicacoes_ativas = self.get_queryset()
+        estatisticas = EstatisticasPublicacoes.obter()
         
         stats = {
-            'total_publicacoes': publicacoes_ativas.count(),
-            'total_organizadores': Organizador.objects.filter(
-                publicacoes__ativa=True, ativo=True
-            ).distinct().count(),
-            'anos_publicacao': publicacoes_ativas.values_list(
-                'ano_publicacao', flat=True
-            ).distinct().count(),
-            'downloads_total': sum(pub.downloads for pub in publicacoes_ativas),
+            'total_publicacoes': estatisticas.total_publicacoes,
+            'total_organizadores': estatisticas.total_organizadores,
+            'anos_publicacao': estatisticas.anos_publicacao,
+            'downloads_total': estatisticas.downloads_total,
         }
         
-        # Categoria mais comum
-        # Verifica se há publicações ativas antes de tentar acessar o primeiro elemento
-        categoria_mais_comum_query = publicacoes_ativas.values('categoria').annotate(
-            count=Count('categoria')
-        ).order_by('-count')
-        
-        if categoria_mais_comum_query.exists():
-            categoria_mais_comum = categoria_mais_comum_query.first()
+        if estatisticas.categoria_mais_comum:
             stats['categoria_mais_comum'] = {
-                'categoria': categoria_mais_comum['categoria'],
-                'nome': dict(PublicacaoPDF.CATEGORIA_CHOICES).get(
-                    categoria_mais_comum['categoria']
-                ),
-                'count': categoria_mais_comum['count']
+                'categoria': estatisticas.categoria_mais_comum,
+                'nome': estatisticas.get_categoria_mais_comum_display(),
+                'count': estatisticas.categoria_mais_comum_total
             }
         else:
             stats['categoria_mais_comum'] = {'nome': 'N/A'}
@@ -376,34 +313,29 @@ class PublicacaoPDFViewSet(viewsets.ReadOnlyModelViewSet):
 
     @action(detail=False)
     def por_ano(self, request):
-        """Endpoint para obter publicações agrupadas por ano"""
-        publicacoes_por_ano = {}
-        
-        for publicacao in self.get_queryset():
-            ano = publicacao.ano_publicacao
-            if ano not in publicacoes_por_ano:
-                publicacoes_por_ano[ano] = []
-            
-            publicacoes_por_ano[ano].append(
-                self.get_serializer(publicacao).data
-            )
-        
-        # Ordenar por ano (mais recente primeiro)
-        resultado = [
-            {'ano': ano, 'publicacoes': publicacoes}
-            for ano, publicacoes in sorted(
-                publicacoes_por_ano.items(), 
-                key=lambda x: x[0], 
-                reverse=True
-            )
-        ]
-        
-        return Response(resultado)
+        """
+        Endpoint para obter publicações agrupadas por ano, gerado em streaming:
+        [{"ano": 2024, "publicacoes": [...]}, ...]
+        """
+        publicacoes = self.get_queryset().order_by(
+            '-ano_publicacao', '-criado_em'
+        )
+        linhas = streaming.serializar_em_blocos(
+            publicacoes, self.get_serializer_class(), self.get_serializer_context()
+        )
+        grupos = groupby(linhas, key=lambda linha: linha[0].ano_publicacao)
+        return streaming.resposta_json(streaming.lista_json(
+            streaming.objeto_json([
+                ('ano', streaming.valor_json(ano)),
+                ('publicacoes', streaming.lista_json(streaming.valor_json(dados) for _, dados in grupo)),
+            ])
+            for ano, grupo in grupos
+        ))
 
 
 class OrganizadorViewSet(viewsets.ReadOnlyModelViewSet):
     """ViewSet para API REST dos organizadores"""
-    queryset = Organizador.objects.filter(ativo=True)
+    queryset = Organizador.objects.filter(ativo=True).com_total_publicacoes().order_by('nome')
     serializer_class = OrganizadorSerializer
     search_fields = ['nome', 'biografia']
     ordering = ['nome']
@@ -412,7 +344,7 @@ class OrganizadorViewSet(viewsets.ReadOnlyModelViewSet):
     def publicacoes(self, request, pk=None):
         """Endpoint para obter publicações de um organizador"""
         organizador = self.get_object()
-        publicacoes = organizador.publicacoes.filter(ativa=True)
+        publicacoes = organizador.publicacoes.filter(ativa=True).com_organizadores()
         
         serializer = PublicacaoPDFSerializer(publicacoes, many=True)
         return Response(serializer.data)
\ No newline at end of file
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class SearchConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'search'
+
+    def ready(self):
+        """Conecta os signals que mantêm o índice de busca atualizado"""
+        import search.signals  # noqa: F401
@@ -0,0 +1,270 @@
+"""
+Índice de busca textual do site - LANGUE UFRPE
+
+Cada LinhaPesquisa, ProducaoBibliografica e PublicacaoPDF é espelhada em um
+DocumentoBusca. No SQLite o texto desses documentos é indexado por uma tabela
+virtual FTS5 e no PostgreSQL por uma coluna tsvector com índice GIN (as duas
+estruturas são criadas pela migração 0001 deste app). Os signals em
+search/signals.py mantêm os documentos sincronizados com os modelos.
+"""
+import re
+from collections import namedtuple
+
+from django.db import connection, transaction
+from django.db.models import Q
+
+from langue.texto import normalizar
+from linhas_pesquisa.models import LinhaPesquisa
+from producoes_bibliograficas.models import ProducaoBibliografica
+from publicacoes.models import PublicacaoPDF
+from .models import DocumentoBusca
+
+
+TABELA_FTS = 'search_documentobusca_fts'
+
+def _juntar(*partes):
+    """Concatena as partes de texto não vazias"""
+    return ' '.join(str(parte) for parte in partes if parte)
+
+
+def documento_linha_pesquisa(linha):
+    """Campos indexados de uma linha de pesquisa"""
+    return {
+        'titulo': linha.titulo,
+        'conteudo': _juntar(linha.objetivo, linha.palavras_chave, linha.setores_aplicacao),
+        'ativo': linha.ativa,
+    }
+
+
+def documento_producao(producao):
+    """Campos indexados de uma produção bibliográfica"""
+    return {
+        'titulo': producao.titulo,
+        'conteudo': _juntar(
+            producao.local_publicacao,
+            *[autor.nome for autor in producao.autores.all()]
+        ),
+        'ativo': producao.ativa,
+    }
+
+
+def documento_publicacao(publicacao):
+    """Campos indexados de uma publicação PDF"""
+    return {
+        'titulo': publicacao.titulo,
+        'conteudo': _juntar(
+            publicacao.categoria,
+            publicacao.get_categoria_display(),
+            *[organizador.nome for organizador in publicacao.organizadores.all()]
+        ),
+        'ativo': publicacao.ativa,
+    }
+
+
+TipoIndexado = namedtuple('TipoIndexado', ['modelo', 'documento', 'relacionados'])
+
+TIPOS = {
+    'linha_pesquisa': TipoIndexado(LinhaPesquisa, documento_linha_pesquisa, []),
+    'producao': TipoIndexado(ProducaoBibliografica, documento_producao, ['autores']),
+    'publicacao': TipoIndexado(PublicacaoPDF, documento_publicacao, ['organizadores']),
+}
+
+
+def tipo_do_modelo(modelo):
+    """Retorna a chave de TIPOS correspondente ao modelo, ou None"""
+    for tipo, definicao in TIPOS.items():
+        if definicao.modelo is modelo:
+            return tipo
+    return None
+
+
+def _campos_documento(tipo, instancia):
+    """Campos do DocumentoBusca, com o texto já normalizado (sem acentos)"""
+    campos = TIPOS[tipo].documento(instancia)
+    campos['titulo'] = normalizar(campos['titulo'])[:500]
+    campos['conteudo'] = normalizar(campos['conteudo'])
+    return campos
+
+
+def indexar(instancia):
+    """Cria ou atualiza o documento de busca de uma instância"""
+    tipo = tipo_do_modelo(type(instancia))
+    if tipo is None:
+        return
+    DocumentoBusca.objects.update_or_create(
+        tipo=tipo,
+        objeto_id=instancia.pk,
+        defaults=_campos_documento(tipo, instancia),
+    )
+
+
+def indexar_objetos(modelo, ids):
+    """Reindexa os objetos do modelo com os ids informados"""
+    tipo = tipo_do_modelo(modelo)
+    if tipo is None or not ids:
+        return
+    definicao = TIPOS[tipo]
+    queryset = modelo.objects.filter(pk__in=ids).prefetch_related(*definicao.relacionados)
+    for instancia in queryset:
+        indexar(instancia)
+
+
+def remover(instancia):
+    """Remove do índice o documento de uma instância"""
+    tipo = tipo_do_modelo(type(instancia))
+    if tipo is not None:
+        DocumentoBusca.objects.filter(tipo=tipo, objeto_id=instancia.pk).delete()
+
+
+def reconstruir(tamanho_lote=1000):
+    """
+    Recria todos os documentos de busca a partir dos modelos.
+    Retorna um dicionário com o total de documentos por tipo.
+    """
+    totais = {}
+    with transaction.atomic():
+        DocumentoBusca.objects.all().delete()
+        for tipo, definicao in TIPOS.items():
+            queryset = definicao.modelo.objects.order_by('pk').prefetch_related(*definicao.relacionados)
+            lote = []
+            totais[tipo] = 0
+            for instancia in queryset.iterator(chunk_size=tamanho_lote):
+                lote.append(DocumentoBusca(
+                    tipo=tipo,
+                    objeto_id=instancia.pk,
+                    **_campos_documento(tipo, instancia)
+                ))
+                if len(lote) >= tamanho_lote:
+                    DocumentoBusca.objects.bulk_create(lote)
+                    totais[tipo] += len(lote)
+                    lote = []
+            if lote:
+                DocumentoBusca.objects.bulk_create(lote)
+                totais[tipo] += len(lote)
+        obter_backend().otimizar()
+    return totais
+
+
+def extrair_termos(consulta):
+    """Quebra a consulta em termos normalizados (descarta operadores e pontuação)"""
+    return re.findall(r'\w+', normalizar(consulta))
+
+
+# Colunas devolvidas pelos backends para cada documento encontrado. Os totais são
+# calculados por funções de janela sobre todos os resultados, na mesma consulta
+# que devolve a página.
+LinhaResultado = namedtuple(
+    'LinhaResultado',
+    ['id', 'tipo', 'objeto_id', 'relevancia', 'total'] + [f'total_{tipo}' for tipo in TIPOS],
+)
+
+_COLUNAS_TOTAIS = ',\n'.join(
+    f"SUM(CASE WHEN tipo = '{tipo}' THEN 1 ELSE 0 END) OVER () AS total_{tipo}"
+    for tipo in TIPOS
+)
+
+
+class BackendBusca:
+    """Busca por substring nos documentos, usada quando o banco não tem índice textual"""
+
+    def consultar(self, termos, posicao, limite):
+        """
+        Retorna até `limite` LinhaResultado em ordem decrescente de relevância,
+        começando depois de `posicao` (tupla relevância, id) quando informada.
+        """
+        queryset = DocumentoBusca.objects.filter(ativo=True)
+        for termo in termos:
+            queryset = queryset.filter(Q(titulo__contains=termo) | Q(conteudo__contains=termo))
+
+        encontrados = []
+        totais = dict.fromkeys(TIPOS, 0)
+        for id_, tipo, objeto_id, titulo, conteudo in queryset.values_list(
+            'id', 'tipo', 'objeto_id', 'titulo', 'conteudo'
+        ):
+            relevancia = float(sum(10 * titulo.count(t) + conteudo.count(t) for t in termos))
+            encontrados.append((relevancia, id_, tipo, objeto_id))
+            totais[tipo] += 1
+
+        encontrados.sort(key=lambda item: (-item[0], item[1]))
+        if posicao is not None:
+            encontrados = [
+                item for item in encontrados
+                if item[0] < posicao[0] or (item[0] == posicao[0] and item[1] > posicao[1])
+            ]
+        return [
+            LinhaResultado(id_, tipo, objeto_id, relevancia, sum(totais.values()), *totais.values())
+            for relevancia, id_, tipo, objeto_id in encontrados[:limite]
+        ]
+
+    def otimizar(self):
+        """Compacta o índice após uma reconstrução completa"""
+
+    def _executar(self, origem, parametros, posicao, limite):
+        """Aplica totais, cursor e limite sobre a subconsulta `origem` (id, tipo, objeto_id, relevancia)"""
+        filtro = 'TRUE'
+        if posicao is not None:
+            filtro = 'relevancia < %s OR (relevancia = %s AND id > %s)'
+            parametros = parametros + [posicao[0], posicao[0], posicao[1]]
+
+        sql = f"""
+            SELECT * FROM (
+                SELECT id, tipo, objeto_id, relevancia,
+                       COUNT(*) OVER () AS total,
+                       {_COLUNAS_TOTAIS}
+                FROM ({origem}) AS encontrados
+            ) AS resultados
+            WHERE {filtro}
+            ORDER BY relevancia DESC, id
+            LIMIT %s
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(sql, parametros + [limite])
+            return [LinhaResultado(*linha) for linha in cursor.fetchall()]
+
+
+class BackendSQLite(BackendBusca):
+    """Busca na tabela virtual FTS5, com relevância BM25 (título com peso 10)"""
+
+    ORIGEM = f"""
+        SELECT d.id, d.tipo, d.objeto_id, -bm25({TABELA_FTS}, 10.0, 1.0) AS relevancia
+        FROM {TABELA_FTS}
+        JOIN search_documentobusca d ON d.id = {TABELA_FTS}.rowid
+        WHERE {TABELA_FTS} MATCH %s AND d.ativo
+    """
+
+    def consultar(self, termos, posicao, limite):
+        # Cada termo vira um prefixo entre aspas, o que neutraliza a sintaxe do FTS5
+        expressao = ' AND '.join(f'"{termo}"*' for termo in termos)
+        return self._executar(self.ORIGEM, [expressao], posicao, limite)
+
+    def otimizar(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {TABELA_FTS}({TABELA_FTS}) VALUES ('rebuild')")
+            cursor.execute(f"INSERT INTO {TABELA_FTS}({TABELA_FTS}) VALUES ('optimize')")
+
+
+class BackendPostgreSQL(BackendBusca):
+    """Busca na coluna tsvector (índice GIN), com relevância ts_rank_cd"""
+
+    ORIGEM = """
+        SELECT id, tipo, objeto_id, ts_rank_cd(vetor, consulta)::float8 AS relevancia
+        FROM search_documentobusca, to_tsquery('portuguese', %s) AS consulta
+        WHERE ativo AND vetor @@ consulta
+    """
+
+    def consultar(self, termos, posicao, limite):
+        expressao = ' & '.join(f'{termo}:*' for termo in termos)
+        return self._executar(self.ORIGEM, [expressao], posicao, limite)
+
+    def otimizar(self):
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE search_documentobusca')
+
+
+def obter_backend():
+    """Escolhe o backend de busca de acordo com o banco de dados em uso"""
+    if connection.vendor == 'sqlite':
+        return BackendSQLite()
+    if connection.vendor == 'postgresql':
+        return BackendPostgreSQL()
+    return BackendBusca()
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from search import indice
+
+
+class Command(BaseCommand):
+    help = (
+        "Recria o índice de busca textual a partir das linhas de pesquisa, "
+        "produções bibliográficas e publicações PDF"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tamanho-lote',
+            type=int,
+            default=1000,
+            help='Quantidade de documentos inseridos por lote (padrão: 1000)',
+        )
+
+    def handle(self, *args, **options):
+        totais = indice.reconstruir(tamanho_lote=options['tamanho_lote'])
+
+        for tipo, total in totais.items():
+            self.stdout.write(f"{tipo}: {total} documento(s) indexado(s)")
+        self.stdout.write(self.style.SUCCESS(
+            f"Índice de busca reconstruído com {sum(totais.values())} documento(s)."
+        ))
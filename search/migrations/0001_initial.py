@@ -0,0 +1,109 @@
+# Generated by Django 5.2 on 2026-10-17 10:28
+
+from django.db import migrations, models
+
+
+# As triggers mantêm a tabela FTS5 sincronizada com search_documentobusca.
+# Atenção: alterações futuras neste modelo que façam o SQLite recriar a tabela
+# descartam as triggers; nesse caso recrie-as e rode rebuild_search_index.
+SQL_SQLITE = [
+    """
+    CREATE VIRTUAL TABLE search_documentobusca_fts USING fts5(
+        titulo, conteudo,
+        content='search_documentobusca', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER search_documentobusca_ai AFTER INSERT ON search_documentobusca BEGIN
+        INSERT INTO search_documentobusca_fts(rowid, titulo, conteudo)
+        VALUES (new.id, new.titulo, new.conteudo);
+    END
+    """,
+    """
+    CREATE TRIGGER search_documentobusca_ad AFTER DELETE ON search_documentobusca BEGIN
+        INSERT INTO search_documentobusca_fts(search_documentobusca_fts, rowid, titulo, conteudo)
+        VALUES ('delete', old.id, old.titulo, old.conteudo);
+    END
+    """,
+    """
+    CREATE TRIGGER search_documentobusca_au AFTER UPDATE ON search_documentobusca BEGIN
+        INSERT INTO search_documentobusca_fts(search_documentobusca_fts, rowid, titulo, conteudo)
+        VALUES ('delete', old.id, old.titulo, old.conteudo);
+        INSERT INTO search_documentobusca_fts(rowid, titulo, conteudo)
+        VALUES (new.id, new.titulo, new.conteudo);
+    END
+    """,
+]
+
+SQL_SQLITE_REVERSO = [
+    'DROP TRIGGER IF EXISTS search_documentobusca_au',
+    'DROP TRIGGER IF EXISTS search_documentobusca_ad',
+    'DROP TRIGGER IF EXISTS search_documentobusca_ai',
+    'DROP TABLE IF EXISTS search_documentobusca_fts',
+]
+
+SQL_POSTGRESQL = [
+    """
+    ALTER TABLE search_documentobusca ADD COLUMN vetor tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('portuguese', coalesce(titulo, '')), 'A') ||
+        setweight(to_tsvector('portuguese', coalesce(conteudo, '')), 'B')
+    ) STORED
+    """,
+    'CREATE INDEX search_documentobusca_vetor ON search_documentobusca USING GIN (vetor)',
+]
+
+SQL_POSTGRESQL_REVERSO = [
+    'DROP INDEX IF EXISTS search_documentobusca_vetor',
+    'ALTER TABLE search_documentobusca DROP COLUMN IF EXISTS vetor',
+]
+
+
+def _executar(schema_editor, comandos):
+    for sql in comandos:
+        schema_editor.execute(sql)
+
+
+def criar_indice_textual(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        _executar(schema_editor, SQL_SQLITE)
+    elif vendor == 'postgresql':
+        _executar(schema_editor, SQL_POSTGRESQL)
+
+
+def remover_indice_textual(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        _executar(schema_editor, SQL_SQLITE_REVERSO)
+    elif vendor == 'postgresql':
+        _executar(schema_editor, SQL_POSTGRESQL_REVERSO)
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentoBusca',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('linha_pesquisa', 'Linha de Pesquisa'), ('producao', 'Produção Bibliográfica'), ('publicacao', 'Publicação PDF')], max_length=20, verbose_name='Tipo de Conteúdo')),
+                ('objeto_id', models.PositiveBigIntegerField(verbose_name='ID do Objeto')),
+                ('titulo', models.CharField(max_length=500, verbose_name='Título')),
+                ('conteudo', models.TextField(blank=True, verbose_name='Conteúdo Indexado')),
+                ('ativo', models.BooleanField(default=True, verbose_name='Ativo')),
+                ('atualizado_em', models.DateTimeField(auto_now=True, verbose_name='Atualizado em')),
+            ],
+            options={
+                'verbose_name': 'Documento de Busca',
+                'verbose_name_plural': 'Documentos de Busca',
+                'constraints': [models.UniqueConstraint(fields=('tipo', 'objeto_id'), name='documento_busca_unico')],
+            },
+        ),
+        migrations.RunPython(criar_indice_textual, remover_indice_textual),
+    ]
@@ -1,3 +1,27 @@
 from django.db import models
 
-# Create your models here.
+
+class DocumentoBusca(models.Model):
+    """Entrada do índice de busca textual (um registro por objeto indexado)"""
+    TIPO_CHOICES = [
+        ('linha_pesquisa', 'Linha de Pesquisa'),
+        ('producao', 'Produção Bibliográfica'),
+        ('publicacao', 'Publicação PDF'),
+    ]
+
+    tipo = models.CharField(max_length=20, choices=TIPO_CHOICES, verbose_name="Tipo de Conteúdo")
+    objeto_id = models.PositiveBigIntegerField(verbose_name="ID do Objeto")
+    titulo = models.CharField(max_length=500, verbose_name="Título")
+    conteudo = models.TextField(blank=True, verbose_name="Conteúdo Indexado")
+    ativo = models.BooleanField(default=True, verbose_name="Ativo")
+    atualizado_em = models.DateTimeField(auto_now=True, verbose_name="Atualizado em")
+
+    class Meta:
+        verbose_name = "Documento de Busca"
+        verbose_name_plural = "Documentos de Busca"
+        constraints = [
+            models.UniqueConstraint(fields=['tipo', 'objeto_id'], name='documento_busca_unico'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_tipo_display()}: {self.titulo}"
@@ -0,0 +1,105 @@
+"""
+Motor de busca unificada - LANGUE UFRPE
+
+Consulta o índice textual (search/indice.py) e devolve uma única lista de
+resultados das três áreas do site, ordenada por relevância. Contagens e
+página de resultados vêm da mesma consulta, e a paginação é feita por cursor
+(relevância e id do último documento exibido), sem OFFSET.
+"""
+import base64
+import binascii
+import json
+from collections import namedtuple
+
+from . import indice
+
+
+TAMANHO_PAGINA = 20
+
+Resultado = namedtuple('Resultado', ['tipo', 'objeto', 'relevancia'])
+
+
+class PaginaResultados:
+    """Uma página de resultados da busca unificada"""
+
+    def __init__(self, resultados, total=0, totais_por_tipo=None, proximo_cursor=None):
+        self.resultados = resultados
+        self.total = total
+        self.totais_por_tipo = totais_por_tipo or dict.fromkeys(indice.TIPOS, 0)
+        self.proximo_cursor = proximo_cursor
+
+    def __iter__(self):
+        return iter(self.resultados)
+
+    def __len__(self):
+        return len(self.resultados)
+
+    @property
+    def tem_proxima(self):
+        return self.proximo_cursor is not None
+
+
+def codificar_cursor(relevancia, documento_id):
+    """Gera o cursor opaco que aponta para depois do documento informado"""
+    dados = json.dumps([relevancia, documento_id]).encode()
+    return base64.urlsafe_b64encode(dados).decode().rstrip('=')
+
+
+def decodificar_cursor(cursor):
+    """Converte o cursor de volta em (relevância, id); cursores inválidos viram None"""
+    if not cursor:
+        return None
+    try:
+        dados = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        relevancia, documento_id = json.loads(dados)
+        return float(relevancia), int(documento_id)
+    except (binascii.Error, ValueError, TypeError):
+        return None
+
+
+def _carregar_objetos(linhas):
+    """Busca os objetos da página com uma consulta por tipo"""
+    ids_por_tipo = {}
+    for linha in linhas:
+        ids_por_tipo.setdefault(linha.tipo, []).append(linha.objeto_id)
+
+    objetos = {}
+    for tipo, ids in ids_por_tipo.items():
+        definicao = indice.TIPOS[tipo]
+        queryset = definicao.modelo.objects.prefetch_related(*definicao.relacionados)
+        for pk, objeto in queryset.in_bulk(ids).items():
+            objetos[(tipo, pk)] = objeto
+    return objetos
+
+
+def buscar(consulta, cursor=None, tamanho_pagina=TAMANHO_PAGINA):
+    """
+    Executa a busca unificada e retorna a PaginaResultados pedida.
+    A consulta é comparada sem acentos e sem diferenciar maiúsculas.
+    """
+    termos = indice.extrair_termos(consulta)
+    if not termos:
+        return PaginaResultados([])
+
+    # Pede um item a mais para saber se existe próxima página
+    linhas = indice.obter_backend().consultar(termos, decodificar_cursor(cursor), tamanho_pagina + 1)
+    tem_proxima = len(linhas) > tamanho_pagina
+    linhas = linhas[:tamanho_pagina]
+    if not linhas:
+        return PaginaResultados([])
+
+    objetos = _carregar_objetos(linhas)
+    resultados = [
+        Resultado(linha.tipo, objetos[(linha.tipo, linha.objeto_id)], linha.relevancia)
+        for linha in linhas
+        if (linha.tipo, linha.objeto_id) in objetos
+    ]
+
+    primeira = linhas[0]
+    ultima = linhas[-1]
+    return PaginaResultados(
+        resultados,
+        total=primeira.total,
+        totais_por_tipo={tipo: getattr(primeira, f'total_{tipo}') for tipo in indice.TIPOS},
+        proximo_cursor=codificar_cursor(ultima.relevancia, ultima.id) if tem_proxima else None,
+    )
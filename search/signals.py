@@ -0,0 +1,81 @@
+"""
+Signals que mantêm o índice de busca sincronizado com os modelos indexados
+"""
+from django.db.models.signals import post_save, pre_delete, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from linhas_pesquisa.models import LinhaPesquisa
+from producoes_bibliograficas.models import ProducaoBibliografica, Autor
+from publicacoes.models import PublicacaoPDF, Organizador
+from . import indice
+
+
+@receiver(post_save, sender=LinhaPesquisa)
+@receiver(post_save, sender=ProducaoBibliografica)
+@receiver(post_save, sender=PublicacaoPDF)
+def indexar_objeto(sender, instance, raw=False, **kwargs):
+    """Atualiza o documento de busca ao salvar um objeto indexado"""
+    if not raw:
+        indice.indexar(instance)
+
+
+@receiver(post_delete, sender=LinhaPesquisa)
+@receiver(post_delete, sender=ProducaoBibliografica)
+@receiver(post_delete, sender=PublicacaoPDF)
+def remover_objeto(sender, instance, **kwargs):
+    """Remove o documento de busca ao excluir um objeto indexado"""
+    indice.remover(instance)
+
+
+@receiver(m2m_changed, sender=ProducaoBibliografica.autores.through)
+@receiver(m2m_changed, sender=PublicacaoPDF.organizadores.through)
+def reindexar_relacionamento(sender, instance, action, reverse, model, pk_set, **kwargs):
+    """Reindexa as publicações/produções quando autores ou organizadores mudam"""
+    if action == 'pre_clear' and reverse:
+        # Em um clear reverso o pk_set não é informado, então guardamos os ids antes
+        relacionados = _relacionados_reversos(instance)
+        instance._ids_reindexar_busca = list(relacionados.values_list('pk', flat=True))
+        return
+
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if not reverse:
+        indice.indexar(instance)
+    elif action == 'post_clear':
+        indice.indexar_objetos(_relacionados_reversos(instance).model,
+                               getattr(instance, '_ids_reindexar_busca', []))
+    else:
+        indice.indexar_objetos(model, pk_set)
+
+
+@receiver(post_save, sender=Autor)
+@receiver(post_save, sender=Organizador)
+def reindexar_pessoa(sender, instance, created=False, raw=False, **kwargs):
+    """Reindexa o que cita o autor/organizador quando o nome dele muda"""
+    if created or raw:
+        return
+    relacionados = _relacionados_reversos(instance)
+    indice.indexar_objetos(relacionados.model, list(relacionados.values_list('pk', flat=True)))
+
+
+@receiver(pre_delete, sender=Autor)
+@receiver(pre_delete, sender=Organizador)
+def guardar_relacionados_pessoa(sender, instance, **kwargs):
+    """As ligações somem na exclusão sem m2m_changed: guarda os ids antes"""
+    instance._ids_reindexar_busca = list(_relacionados_reversos(instance).values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Autor)
+@receiver(post_delete, sender=Organizador)
+def reindexar_pessoa_excluida(sender, instance, **kwargs):
+    """Tira o nome do autor/organizador excluído do índice do que o citava"""
+    indice.indexar_objetos(_relacionados_reversos(instance).model,
+                           getattr(instance, '_ids_reindexar_busca', []))
+
+
+def _relacionados_reversos(pessoa):
+    """Produções de um autor ou publicações de um organizador"""
+    if isinstance(pessoa, Autor):
+        return pessoa.producoes.all()
+    return pessoa.publicacoes.all()
@@ -1,3 +1,102 @@
 from django.test import TestCase
+from django.core.management import call_command
+from django.urls import reverse
+from io import StringIO
+from linhas_pesquisa.models import LinhaPesquisa
+from producoes_bibliograficas.models import ProducaoBibliografica, Autor
+from .models import DocumentoBusca
+from . import motor
 
-# Create your tests here.
+
+class IndiceBuscaTest(TestCase):
+    """Testes para o índice de busca textual"""
+    
+    def setUp(self):
+        self.linha = LinhaPesquisa.objects.create(
+            titulo="Linguística Aplicada",
+            objetivo="Estudar o ensino de línguas",
+            palavras_chave="ensino; aprendizagem",
+            setores_aplicacao="Educação"
+        )
+        self.autor = Autor.objects.create(nome="Maria Souza")
+        self.producao = ProducaoBibliografica.objects.create(
+            titulo="Variação linguística no Nordeste",
+            ano_publicacao=2023
+        )
+        self.producao.autores.add(self.autor)
+    
+    def test_documentos_criados_por_signals(self):
+        """Testa se salvar os modelos cria os documentos de busca"""
+        self.assertTrue(DocumentoBusca.objects.filter(tipo='linha_pesquisa', objeto_id=self.linha.pk).exists())
+        documento = DocumentoBusca.objects.get(tipo='producao', objeto_id=self.producao.pk)
+        self.assertIn("maria souza", documento.conteudo)
+    
+    def test_busca_ignora_acentos(self):
+        """Testa se a busca encontra termos sem acentuação"""
+        pagina = motor.buscar("LINGUISTICA")
+        self.assertEqual(pagina.total, 2)
+        self.assertEqual(pagina.totais_por_tipo['linha_pesquisa'], 1)
+        self.assertEqual(pagina.totais_por_tipo['producao'], 1)
+        self.assertEqual({r.objeto for r in pagina}, {self.linha, self.producao})
+    
+    def test_renomear_autor_reindexa_producao(self):
+        """Testa se alterar o nome do autor atualiza o índice das produções"""
+        self.autor.nome = "Maria Oliveira"
+        self.autor.save()
+        self.assertEqual(motor.buscar("Oliveira").totais_por_tipo['producao'], 1)
+    
+    def test_excluir_autor_reindexa_producao(self):
+        """Testa se excluir o autor tira o nome dele do índice das produções"""
+        self.autor.delete()
+        self.assertEqual(motor.buscar("Souza").total, 0)
+        self.assertEqual(motor.buscar("Nordeste").totais_por_tipo['producao'], 1)
+    
+    def test_exclusao_e_inativacao(self):
+        """Testa se objetos excluídos ou inativos saem dos resultados"""
+        self.linha.ativa = False
+        self.linha.save()
+        self.assertEqual(motor.buscar("Aplicada").total, 0)
+        
+        self.producao.delete()
+        self.assertFalse(DocumentoBusca.objects.filter(tipo='producao').exists())
+    
+    def test_reconstruir_indice(self):
+        """Testa o comando de reconstrução do índice"""
+        DocumentoBusca.objects.all().delete()
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(DocumentoBusca.objects.count(), 2)
+        self.assertEqual(motor.buscar("ensino").totais_por_tipo['linha_pesquisa'], 1)
+    
+    def test_ordenacao_por_relevancia(self):
+        """Testa se termos no título pesam mais que termos no conteúdo"""
+        LinhaPesquisa.objects.create(
+            titulo="Ensino de Literatura",
+            objetivo="Formação de leitores",
+            palavras_chave="leitura",
+            setores_aplicacao="Escolas"
+        )
+        pagina = motor.buscar("ensino")
+        self.assertEqual(pagina.resultados[0].objeto.titulo, "Ensino de Literatura")
+    
+    def test_paginacao_por_cursor(self):
+        """Testa se o cursor percorre todos os resultados sem repetições"""
+        for numero in range(5):
+            ProducaoBibliografica.objects.create(titulo=f"Corpus oral {numero}", ano_publicacao=2020)
+        
+        vistos = []
+        pagina = motor.buscar("corpus", tamanho_pagina=2)
+        self.assertEqual(pagina.total, 5)
+        while True:
+            vistos.extend(r.objeto.pk for r in pagina)
+            if not pagina.tem_proxima:
+                break
+            pagina = motor.buscar("corpus", cursor=pagina.proximo_cursor, tamanho_pagina=2)
+        
+        self.assertEqual(len(vistos), 5)
+        self.assertEqual(len(set(vistos)), 5)
+    
+    def test_search_view(self):
+        """Testa a página de resultados da busca"""
+        response = self.client.get(reverse('search:search_results'), {'q': 'Nordeste'})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Variação linguística no Nordeste")
@@ -0,0 +1,88 @@
+// Rolagem infinita das fotos de um álbum da galeria
+document.addEventListener('DOMContentLoaded', () => {
+    const grid = document.getElementById('photoGrid');
+    const loadMore = document.getElementById('loadMorePhotos');
+
+    if (!grid || !loadMore) {
+        return;
+    }
+
+    let cursor = loadMore.dataset.cursor;
+    let carregando = false;
+
+    function criarFoto(foto) {
+        const item = document.createElement('div');
+        item.className = 'photo-item animate-fade-in';
+
+        const link = document.createElement('a');
+        link.href = foto.url;
+        link.dataset.lightbox = `album-${grid.dataset.album}`;
+        link.dataset.title = foto.legenda;
+
+        const picture = document.createElement('picture');
+        const sizes = '(max-width: 600px) 100vw, (max-width: 1024px) 50vw, 33vw';
+        foto.fontes.forEach(fonte => {
+            const source = document.createElement('source');
+            source.type = fonte.tipo;
+            source.srcset = fonte.srcset;
+            source.sizes = sizes;
+            picture.appendChild(source);
+        });
+
+        const img = document.createElement('img');
+        img.src = foto.src;
+        if (foto.srcset) {
+            img.srcset = foto.srcset;
+            img.sizes = sizes;
+        }
+        img.alt = foto.legenda || grid.dataset.alt;
+        img.loading = 'lazy';
+        img.decoding = 'async';
+        picture.appendChild(img);
+
+        link.appendChild(picture);
+        item.appendChild(link);
+        return item;
+    }
+
+    function carregarMais() {
+        if (carregando || !cursor) {
+            return;
+        }
+        carregando = true;
+        loadMore.textContent = 'Carregando...';
+
+        fetch(`${grid.dataset.url}?cursor=${encodeURIComponent(cursor)}`)
+            .then(response => response.json())
+            .then(data => {
+                data.fotos.forEach(foto => grid.appendChild(criarFoto(foto)));
+                cursor = data.proximo_cursor;
+                if (!cursor) {
+                    observer.disconnect();
+                    loadMore.parentElement.remove();
+                } else {
+                    loadMore.textContent = 'Carregar mais fotos';
+                }
+            })
+            .catch(error => {
+                console.error('Erro ao carregar fotos:', error);
+                loadMore.textContent = 'Carregar mais fotos';
+            })
+            .finally(() => {
+                carregando = false;
+            });
+    }
+
+    loadMore.addEventListener('click', event => {
+        event.preventDefault();
+        carregarMais();
+    });
+
+    // Carrega o próximo lote quando o link chega perto da área visível
+    const observer = new IntersectionObserver(entries => {
+        if (entries.some(entry => entry.isIntersecting)) {
+            carregarMais();
+        }
+    }, { rootMargin: '600px 0px' });
+    observer.observe(loadMore);
+});